@@ -0,0 +1,143 @@
+import os
+import math
+import time
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager
+from metrics import LatencyTracker
+
+
+class OverloadedError(Exception):
+    """A stage's waiting queue was full, or a request waited longer than the stage allows."""
+
+    def __init__(self, stage: str, retry_after: int):
+        super().__init__(f"{stage} stage overloaded")
+        self.stage = stage
+        self.retry_after = retry_after
+
+
+class StageLimiter:
+    """
+    Concurrency limit for one pipeline stage, with a bounded FIFO queue in front of it.
+    Requests beyond the queue, or that wait past max_wait, fail fast with OverloadedError.
+    """
+
+    def __init__(self, name: str, limit: int, max_queue: int, max_wait: float):
+        self.name = name
+        self.limit = limit
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.in_flight = 0
+        self.peak_queue = 0
+        self.wait_times = LatencyTracker()
+        self.stats = {"admitted": 0, "rejected_queue_full": 0, "rejected_timeout": 0}
+        self._waiters = deque()
+
+    def retry_after(self) -> int:
+        return max(1, math.ceil(self.max_wait))
+
+    def try_acquire(self) -> bool:
+        """Take a slot only if one is free right now (never queues)."""
+        if self.in_flight < self.limit and not self._waiters:
+            self.in_flight += 1
+            self.stats["admitted"] += 1
+            return True
+        return False
+
+    async def acquire(self):
+        if self.try_acquire():
+            self.wait_times.record(0.0)
+            return
+
+        if len(self._waiters) >= self.max_queue:
+            self.stats["rejected_queue_full"] += 1
+            raise OverloadedError(self.name, self.retry_after())
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.peak_queue = max(self.peak_queue, len(self._waiters))
+        started = time.monotonic()
+        try:
+            await asyncio.wait_for(waiter, timeout=self.max_wait)
+        except BaseException as e:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as we gave up: pass it on
+                self.release()
+            else:
+                waiter.cancel()
+                try:
+                    self._waiters.remove(waiter)
+                except ValueError:
+                    pass
+            if isinstance(e, asyncio.TimeoutError):
+                self.stats["rejected_timeout"] += 1
+                raise OverloadedError(self.name, self.retry_after()) from None
+            raise
+
+        self.stats["admitted"] += 1
+        self.wait_times.record(time.monotonic() - started)
+
+    def release(self):
+        # Hand the slot straight to the oldest live waiter, so in_flight never dips below the limit
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+
+    @asynccontextmanager
+    async def slot(self):
+        await self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    def snapshot(self) -> dict:
+        return {
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            "queue_depth": len(self._waiters),
+            "peak_queue_depth": self.peak_queue,
+            "max_queue": self.max_queue,
+            "max_wait_seconds": self.max_wait,
+            "wait_seconds": self.wait_times.snapshot(),
+            **self.stats,
+        }
+
+
+class AdmissionController:
+    """Per-stage limits for the audio pipeline: transcode, speech-to-text, the LLM and live sessions."""
+
+    def __init__(self):
+        max_queue = int(os.getenv("ADMISSION_MAX_QUEUE", "32"))
+        max_wait = float(os.getenv("ADMISSION_MAX_WAIT", "10"))
+        limits = {
+            # Fixed rather than os.cpu_count(), which in a container is the host's CPU count
+            "transcode": int(os.getenv("FFMPEG_MAX_PROCESSES", "4")),
+            "stt": int(os.getenv("SPEECH_MAX_CONCURRENCY", "8")),
+            "llm": int(os.getenv("REFLECT_MAX_CONCURRENCY", "8")),
+            # Recordings in progress: each holds a recognizer and an ffmpeg process for its
+            # whole length, so they get a budget of their own instead of per-request slots
+            "live": int(os.getenv("LIVE_MAX_SESSIONS", "8")),
+        }
+        # The limits are for the whole server: with several worker processes (start_server.py
+        # --production) each one enforces its share, so no per-request coordination is needed
+        self.workers = max(1, int(os.getenv("STILL_WORKERS", "1")))
+        self.stages = {
+            name: StageLimiter(name, self._share(limit), self._share(max_queue), max_wait)
+            for name, limit in limits.items()
+        }
+
+    def _share(self, limit: int) -> int:
+        return max(1, math.ceil(limit / self.workers))
+
+    def stage(self, name: str) -> StageLimiter:
+        return self.stages[name]
+
+    def snapshot(self) -> dict:
+        return {name: stage.snapshot() for name, stage in self.stages.items()}
+
+
+admission = AdmissionController()
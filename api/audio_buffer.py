@@ -0,0 +1,81 @@
+import os
+import tempfile
+
+# Uploads stay in memory up to this size and only spill to an anonymous temp file beyond it
+SPOOL_MAX_BYTES = int(os.getenv("AUDIO_SPOOL_MAX_BYTES", str(8 * 1024 * 1024)))
+READ_CHUNK_BYTES = 64 * 1024
+
+
+class AudioBuffer:
+    """
+    Holds one audio upload for the lifetime of a request.
+
+    Every consumer (Speech push stream, Whisper, fallback sizing) reads from this
+    single buffer, so a normal recording never touches the disk.
+    """
+
+    def __init__(self, filename: str = "recording.webm", content_type: str = "audio/webm"):
+        self.filename = filename
+        self.content_type = content_type
+        self.size = 0
+        self._memory = bytearray()
+        self._spill = None
+
+    @classmethod
+    async def from_upload(cls, upload) -> "AudioBuffer":
+        """Read a FastAPI UploadFile into a new buffer, chunk by chunk."""
+        buffer = cls(
+            filename=upload.filename or "recording.webm",
+            content_type=upload.content_type or "audio/webm",
+        )
+        while True:
+            chunk = await upload.read(READ_CHUNK_BYTES)
+            if not chunk:
+                break
+            buffer.write(chunk)
+        return buffer
+
+    @property
+    def spilled(self) -> bool:
+        return self._spill is not None
+
+    def write(self, data: bytes):
+        if self._spill is None and self.size + len(data) > SPOOL_MAX_BYTES:
+            # Oversized upload: move what we have to disk and keep appending there
+            self._spill = tempfile.TemporaryFile(prefix="still_audio_")
+            self._spill.write(self._memory)
+            self._memory = bytearray()
+
+        if self._spill is not None:
+            self._spill.write(data)
+        else:
+            self._memory += data
+        self.size += len(data)
+
+    def chunks(self, chunk_size: int = READ_CHUNK_BYTES):
+        """Yield the buffered bytes in order without materialising a second copy."""
+        if self._spill is None:
+            view = memoryview(self._memory)
+            for start in range(0, self.size, chunk_size):
+                yield bytes(view[start:start + chunk_size])
+            return
+
+        # pread keeps this independent of the file position, so a concurrent
+        # Whisper upload reading the same spill file is not disturbed
+        self._spill.flush()
+        fd = self._spill.fileno()
+        for start in range(0, self.size, chunk_size):
+            yield os.pread(fd, chunk_size, start)
+
+    def as_upload(self) -> tuple:
+        """(filename, content, content_type) tuple accepted by the OpenAI client for file fields."""
+        if self._spill is None:
+            return (self.filename, bytes(self._memory), self.content_type)
+        self._spill.seek(0)
+        return (self.filename, self._spill, self.content_type)
+
+    def close(self):
+        self._memory = bytearray()
+        if self._spill is not None:
+            self._spill.close()
+            self._spill = None
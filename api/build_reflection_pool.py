@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Build the reflection pool served when the model can't be used (see reflection_pool.py).
+
+For every theme tag and transcript length bucket the model first writes a few short spoken
+monologues in that theme, then each one is reflected with the production prompt. Only the
+reflections are kept; the monologues are thrown away.
+
+    python build_reflection_pool.py --variants 3 --out reflection_pool.json.gz
+"""
+
+import argparse
+import asyncio
+import gzip
+import json
+import time
+from dotenv import load_dotenv
+
+load_dotenv()
+
+import clients
+from reflector import ReflectorService
+from reflection_pool import DEFAULT_POOL_PATH, GENERAL_THEME, LENGTH_BUCKETS
+from theme_tagger import TAGS
+
+# Roughly how long the synthetic monologue for each bucket should be
+BUCKET_WORDS = {"short": 15, "medium": 60, "long": 140}
+
+MONOLOGUE_PROMPT = """Write what a tired adult might say out loud, alone, at the end of a hard year.
+First person, spoken and unpolished, about {words} words.
+{theme}
+Return only the words they say, nothing else."""
+
+
+def theme_line(theme: str) -> str:
+    if theme == GENERAL_THEME:
+        return "No single theme should dominate; keep it vague and quiet."
+    return f"It is mostly about: {theme.replace('_', ' ')}."
+
+
+async def monologue(reflector: ReflectorService, theme: str, bucket: str) -> str | None:
+    response = await reflector.client.chat.completions.create(
+        model=reflector.model,
+        messages=[{
+            "role": "user",
+            "content": MONOLOGUE_PROMPT.format(words=BUCKET_WORDS[bucket], theme=theme_line(theme)),
+        }],
+        max_completion_tokens=400,
+        timeout=60,
+    )
+    if not response.choices or not response.choices[0].message.content:
+        return None
+    return response.choices[0].message.content.strip()
+
+
+async def build(variants: int, concurrency: int) -> list:
+    reflector = ReflectorService()
+    if not reflector.client:
+        raise SystemExit("❌ Azure OpenAI is not configured; see .env.example")
+
+    limit = asyncio.Semaphore(concurrency)
+    entries = []
+
+    async def one(theme: str, bucket: str):
+        async with limit:
+            try:
+                transcript = await monologue(reflector, theme, bucket)
+                result = await reflector._call_model(transcript) if transcript else None
+            except Exception as e:
+                print(f"❌ {theme} / {bucket}: {e}")
+                return
+        if result:
+            entries.append({"theme": theme, "length": bucket, **result})
+            print(f"✅ {theme} / {bucket}")
+        else:
+            print(f"❌ {theme} / {bucket}: no reflection")
+
+    cells = [(theme, bucket) for theme in TAGS + [GENERAL_THEME] for bucket, _ in LENGTH_BUCKETS]
+    try:
+        await asyncio.gather(*(one(theme, bucket) for theme, bucket in cells for _ in range(variants)))
+    finally:
+        await clients.close()
+    return entries
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the offline reflection pool.")
+    parser.add_argument("--variants", type=int, default=3, help="reflections per theme and length bucket")
+    parser.add_argument("--concurrency", type=int, default=4, help="model calls in flight")
+    parser.add_argument("--out", default=DEFAULT_POOL_PATH, help="output file (gzipped JSON)")
+    args = parser.parse_args()
+
+    started = time.monotonic()
+    entries = asyncio.run(build(args.variants, args.concurrency))
+    entries.sort(key=lambda entry: (entry["theme"], entry["length"]))
+
+    with gzip.open(args.out, "wt", encoding="utf-8") as f:
+        json.dump({"version": 1, "built_at": int(time.time()), "entries": entries}, f, separators=(",", ":"))
+
+    print(f"🧺 Wrote {len(entries)} reflections to {args.out} in {time.monotonic() - started:.0f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+import os
+import time
+import random
+from collections import deque
+from contextlib import asynccontextmanager
+
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """The breaker refused the call; the caller should go straight to its fallback."""
+
+    def __init__(self, name: str):
+        super().__init__(f"{name} circuit open")
+        self.name = name
+
+
+class _Call:
+    def __init__(self):
+        self.started = time.monotonic()
+        self.first_response = None
+
+    def responded(self):
+        """Mark the first byte of a streamed response; latency is measured to here."""
+        if self.first_response is None:
+            self.first_response = time.monotonic()
+
+    def latency(self) -> float:
+        return (self.first_response or time.monotonic()) - self.started
+
+
+class CircuitBreaker:
+    """
+    Tracks recent call outcomes and latency. When too many recent calls failed or were
+    slow, the circuit opens and callers fail fast to their fallback. After a cool-down a
+    limited number of half-open trial calls decide whether to close it again.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.window_seconds = float(os.getenv("BREAKER_WINDOW_SECONDS", "60"))
+        self.min_calls = int(os.getenv("BREAKER_MIN_CALLS", "5"))
+        self.failure_rate = float(os.getenv("BREAKER_FAILURE_RATE", "0.5"))
+        self.slow_call_seconds = float(os.getenv("BREAKER_SLOW_CALL_SECONDS", "12"))
+        self.open_seconds = float(os.getenv("BREAKER_OPEN_SECONDS", "20"))
+        self.half_open_max_calls = int(os.getenv("BREAKER_HALF_OPEN_CALLS", "1"))
+
+        self.state = CLOSED
+        self._opened_at = 0.0
+        self._trials = 0
+        self._outcomes = deque()  # (timestamp, bad)
+        self.stats = {"opened": 0, "short_circuited": 0}
+
+    def _trim(self, now: float):
+        while self._outcomes and self._outcomes[0][0] < now - self.window_seconds:
+            self._outcomes.popleft()
+
+    def refuses(self) -> bool:
+        """Cheap check for callers that want to skip queueing when the call would be refused."""
+        if self.state == OPEN and time.monotonic() < self._opened_at + self.open_seconds:
+            self.stats["short_circuited"] += 1
+            return True
+        return False
+
+    def allow(self) -> bool:
+        """Ask to make a call. Every allowed call must be followed by record()."""
+        if self.state == OPEN:
+            if time.monotonic() < self._opened_at + self.open_seconds:
+                self.stats["short_circuited"] += 1
+                return False
+            print(f"🟡 {self.name} circuit half-open, probing")
+            self.state = HALF_OPEN
+            self._trials = 0
+
+        if self.state == HALF_OPEN:
+            if self._trials >= self.half_open_max_calls:
+                self.stats["short_circuited"] += 1
+                return False
+            self._trials += 1
+
+        return True
+
+    def record(self, ok: bool, latency: float):
+        bad = not ok or latency >= self.slow_call_seconds
+        now = time.monotonic()
+
+        if self.state == HALF_OPEN:
+            self._trials = max(self._trials - 1, 0)
+            if bad:
+                self._open(now)
+            else:
+                print(f"🟢 {self.name} circuit closed")
+                self.state = CLOSED
+                self._outcomes.clear()
+            return
+
+        self._outcomes.append((now, bad))
+        self._trim(now)
+        if self.state == CLOSED and len(self._outcomes) >= self.min_calls:
+            bad_calls = sum(1 for _, was_bad in self._outcomes if was_bad)
+            if bad_calls / len(self._outcomes) >= self.failure_rate:
+                self._open(now)
+
+    def _abandon(self):
+        # The call ended without a verdict (the client went away): free its half-open trial
+        if self.state == HALF_OPEN:
+            self._trials = max(self._trials - 1, 0)
+
+    @asynccontextmanager
+    async def guard(self, is_failure=lambda error: True):
+        """
+        Run one call through the breaker. Raises CircuitOpenError if the call is refused;
+        otherwise records the outcome. Errors for which is_failure() is False (bad requests,
+        content filters) count as healthy responses from the provider.
+        """
+        if not self.allow():
+            raise CircuitOpenError(self.name)
+        call = _Call()
+        try:
+            yield call
+        except Exception as e:
+            self.record(not is_failure(e), call.latency())
+            raise
+        except BaseException:
+            self._abandon()
+            raise
+        else:
+            self.record(True, call.latency())
+
+    def _open(self, now: float):
+        print(f"🔴 {self.name} circuit open for {self.open_seconds:.0f}s")
+        self.state = OPEN
+        self._opened_at = now
+        self._trials = 0
+        self.stats["opened"] += 1
+
+    def snapshot(self) -> dict:
+        now = time.monotonic()
+        self._trim(now)
+        bad_calls = sum(1 for _, was_bad in self._outcomes if was_bad)
+        return {
+            "state": self.state,
+            "recent_calls": len(self._outcomes),
+            "recent_bad_calls": bad_calls,
+            **self.stats,
+        }
+
+
+class RetryPolicy:
+    """Jittered exponential backoff for transient 429/5xx/network errors, bounded by a time budget."""
+
+    def __init__(self):
+        self.max_attempts = int(os.getenv("REFLECT_MAX_ATTEMPTS", "3"))
+        self.base_delay = float(os.getenv("REFLECT_RETRY_BASE_DELAY", "0.5"))
+        self.max_delay = float(os.getenv("REFLECT_RETRY_MAX_DELAY", "4"))
+
+    @staticmethod
+    def is_transient(error: Exception) -> bool:
+        import openai  # already loaded by whoever raised the error
+
+        if isinstance(error, (openai.APITimeoutError, openai.APIConnectionError, openai.RateLimitError)):
+            return True
+        return isinstance(error, openai.APIStatusError) and error.status_code >= 500
+
+    def delay(self, error: Exception, attempt: int, remaining: float) -> float | None:
+        """Seconds to wait before the next attempt, or None if we should give up now."""
+        if attempt >= self.max_attempts or not self.is_transient(error):
+            return None
+
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+        # Respect the provider's hint on 429s when it fits in the budget
+        response = getattr(error, "response", None)
+        if response is not None:
+            hint = response.headers.get("retry-after-ms") or response.headers.get("retry-after")
+            try:
+                hinted = float(hint) / (1000 if "retry-after-ms" in response.headers else 1)
+                delay = max(delay, hinted)
+            except (TypeError, ValueError):
+                pass
+
+        # Leave at least a second for the retried call itself
+        if delay + 1.0 > remaining:
+            return None
+        return delay
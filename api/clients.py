@@ -0,0 +1,102 @@
+import os
+import time
+import asyncio
+import threading
+import importlib.util
+
+# One Azure OpenAI client per worker, shared by the reflector, Whisper and the debug endpoints,
+# so they share one keep-alive pool (HTTP/2 when the h2 package is installed)
+_lock = threading.Lock()
+_client = None
+stats = {"http2": False, "warmed_connections": 0, "warm_up_seconds": None}
+
+
+def openai_settings() -> dict | None:
+    """Azure OpenAI endpoint settings from the environment, or None when not configured."""
+    api_key = os.getenv("OPENAI_API_KEY")
+    endpoint = os.getenv("OPENAI_API_BASE") or ""
+    if endpoint and not endpoint.startswith(("http://", "https://")):
+        endpoint = "https://" + endpoint
+    if not api_key or not endpoint:
+        return None
+    return {
+        "api_key": api_key,
+        "azure_endpoint": endpoint,
+        "api_version": os.getenv("OPENAI_API_VERSION", "2024-12-01-preview"),
+    }
+
+
+def openai_client():
+    """The shared AsyncAzureOpenAI client, built on first use. None when not configured."""
+    global _client
+    with _lock:  # services are constructed concurrently on startup threads
+        if _client is not None:
+            return _client
+        settings = openai_settings()
+        if settings is None:
+            return None
+
+        # The SDK takes half a second to import, so it is loaded only once it will be used
+        import httpx
+        from openai import AsyncAzureOpenAI
+
+        http2 = os.getenv("OPENAI_HTTP2", "true").lower() == "true" and importlib.util.find_spec("h2") is not None
+        max_connections = int(os.getenv("OPENAI_MAX_CONNECTIONS", "20"))
+        http_client = httpx.AsyncClient(
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=int(os.getenv("OPENAI_MAX_KEEPALIVE", "10")),
+                keepalive_expiry=float(os.getenv("OPENAI_KEEPALIVE_EXPIRY", "120")),
+            ),
+            timeout=httpx.Timeout(30.0, connect=5.0),
+        )
+        _client = AsyncAzureOpenAI(
+            **settings,
+            http_client=http_client,
+            max_retries=0,  # callers that want SDK retries opt in with with_options()
+        )
+        stats["http2"] = http2
+        print(f"✅ Shared Azure OpenAI client ready ({'HTTP/2' if http2 else 'HTTP/1.1'}, up to {max_connections} connections)")
+        return _client
+
+
+async def warm_up() -> int:
+    """
+    Open connections before the first real request, so DNS, TLS and the HTTP handshake are
+    paid now. Uses the models list, which costs no tokens; any HTTP answer (even an error
+    status) means the connection is up. Returns how many connections were warmed.
+    """
+    client = openai_client()
+    if client is None:
+        return 0
+    import openai
+
+    connections = int(os.getenv("OPENAI_WARM_CONNECTIONS", "1" if stats["http2"] else "2"))
+    timeout = float(os.getenv("OPENAI_WARM_UP_TIMEOUT", "5"))
+    started = time.perf_counter()
+    results = await asyncio.gather(
+        *(client.with_options(timeout=timeout).models.list() for _ in range(connections)),
+        return_exceptions=True,
+    )
+    warmed = sum(1 for r in results if not isinstance(r, Exception) or isinstance(r, openai.APIStatusError))
+
+    stats["warmed_connections"] = warmed
+    stats["warm_up_seconds"] = round(time.perf_counter() - started, 3)
+    if warmed:
+        print(f"🔥 Warmed {warmed} Azure OpenAI connection(s) in {stats['warm_up_seconds']:.2f}s")
+    else:
+        print(f"⚠️ Azure OpenAI warm-up failed: {results[0]}")
+    return warmed
+
+
+async def close():
+    global _client
+    with _lock:
+        client, _client = _client, None
+    if client is not None:
+        await client.close()
+
+
+def snapshot() -> dict:
+    return {**stats, "configured": _client is not None}
@@ -0,0 +1,197 @@
+import os
+import time
+import asyncio
+from admission import OverloadedError
+from single_flight import Flight, replay
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+# A queued or running job holds its idempotency key at most this long
+CLAIM_TTL = 600
+
+
+class Job:
+    """
+    One submitted recording. pipeline() is an async generator of (event, data) pairs, the same
+    events /process-audio/stream sends; it runs as a Flight, so pollers and subscribers that
+    arrive late (or reconnect) still see everything. "done" carries the result, "error" the failure.
+    """
+
+    def __init__(self, job_id: str, key: str, pipeline, discard=None):
+        self.id = job_id
+        self.key = key
+        self.status = QUEUED
+        self.flight = Flight()
+        self.finished_at = None
+        self._pipeline = pipeline
+        self._discard = discard
+        self._done = asyncio.Event()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (DONE, FAILED)
+
+    @property
+    def result(self):
+        return self.flight.result
+
+    @property
+    def error(self):
+        return self.flight.error
+
+    async def _events(self):
+        events = self._pipeline()
+        try:
+            async for event in events:
+                yield event
+        except Exception as e:
+            # The pipeline reports its own errors as events; this is the last resort
+            print(f"❌ Job {self.id} failed: {e}")
+            yield "error", {"detail": "The silence was too heavy."}
+        finally:
+            await events.aclose()
+
+    async def run(self):
+        self.status = RUNNING
+        try:
+            await self.flight.start(self._events())
+        finally:
+            self._finish()
+
+    def drop(self):
+        """Release a job that will never run (shutdown with work still queued)."""
+        if self._discard is not None:
+            self._discard()
+        self.flight.start(replay([("error", {"detail": "The server restarted. Please try again."})]))
+        self._finish()
+
+    def _finish(self):
+        self._pipeline = self._discard = None
+        self.status = DONE if self.result is not None else FAILED
+        self.finished_at = time.monotonic()
+        self._done.set()
+
+    async def wait(self, timeout: float):
+        """Long-poll: return once the job finishes or the timeout passes, whichever is first."""
+        if self.finished or timeout <= 0:
+            return
+        try:
+            await asyncio.wait_for(self._done.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    def follow(self):
+        """Every event so far, then new ones as they arrive, until the job finishes."""
+        return self.flight.follow()
+
+
+class JobQueue:
+    """
+    Background worker pool for submitted recordings. Submitting returns at once; JOB_WORKERS
+    workers run the pipelines and finished jobs stay in memory for JOB_RESULT_TTL seconds.
+    Idempotency keys live in the shared state, so a retried submit joins the existing job,
+    on whichever worker runs it, instead of running the pipeline again.
+    """
+
+    def __init__(self, state):
+        self.state = state
+        self.workers = int(os.getenv("JOB_WORKERS", "4"))
+        self.max_queued = int(os.getenv("JOB_QUEUE_MAX", "32"))
+        self.result_ttl = float(os.getenv("JOB_RESULT_TTL", "300"))
+        self.max_wait = float(os.getenv("JOB_MAX_WAIT", "25"))
+        self._jobs = {}  # job id -> Job
+        self._queue = None
+        self._tasks = []
+        self.stats = {"submitted": 0, "deduplicated": 0, "rejected": 0, "completed": 0, "failed": 0, "expired": 0}
+
+    async def start(self):
+        self._queue = asyncio.Queue()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        print(f"✅ Job queue started with {self.workers} workers")
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._queue is not None:
+            while not self._queue.empty():
+                self._queue.get_nowait().drop()
+
+    async def _worker(self):
+        while True:
+            job = await self._queue.get()
+            try:
+                await job.run()
+            finally:
+                self.stats["completed" if job.status == DONE else "failed"] += 1
+                self._queue.task_done()
+            try:
+                # Finished jobs keep their key for the result TTL; failed ones free it for a retry
+                if job.status == DONE:
+                    await self.state.set(self._key(job.key), job.id, ttl=self.result_ttl)
+                else:
+                    await self.release(job.key, job.id)
+            except Exception as e:
+                print(f"❌ Could not settle job key: {e}")
+
+    def _expire(self):
+        now = time.monotonic()
+        for job_id, job in list(self._jobs.items()):
+            if job.finished and job.finished_at + self.result_ttl <= now:
+                del self._jobs[job_id]
+                self.stats["expired"] += 1
+
+    def get(self, job_id: str) -> Job | None:
+        self._expire()
+        return self._jobs.get(job_id)
+
+    @staticmethod
+    def _key(key: str) -> str:
+        return f"job-key:{key}"
+
+    async def submit(self, key: str, pipeline, discard=None) -> tuple[str, Job | None]:
+        """
+        Queue pipeline() under an idempotency key. Returns (id, job) for a new job, or
+        (id, None) when the key already belongs to a live or finished job, possibly on another
+        worker. discard() releases the job's input if it never runs.
+        """
+        self._expire()
+        # A retry of an accepted job joins it even when the queue is full
+        holder = await self.state.get(self._key(key))
+        if holder is not None:
+            self.stats["deduplicated"] += 1
+            return holder, None
+        if self._queue is None or self._queue.qsize() >= self.max_queued:
+            self.stats["rejected"] += 1
+            raise OverloadedError("jobs", 5)
+
+        job_id = self.state.new_id()
+        holder = await self.state.add(self._key(key), job_id, ttl=CLAIM_TTL)
+        if holder != job_id:
+            self.stats["deduplicated"] += 1
+            return holder, None
+
+        job = Job(job_id, key, pipeline, discard)
+        self._jobs[job.id] = job
+        self._queue.put_nowait(job)
+        self.stats["submitted"] += 1
+        return job.id, job
+
+    async def release(self, key: str, job_id: str):
+        """Free key if it still points at job_id (the job failed, or its worker is gone)."""
+        if await self.state.get(self._key(key)) == job_id:
+            await self.state.delete(self._key(key))
+
+    def snapshot(self) -> dict:
+        statuses = [job.status for job in self._jobs.values()]
+        return {
+            **self.stats,
+            "workers": self.workers,
+            "queued": statuses.count(QUEUED),
+            "running": statuses.count(RUNNING),
+            "stored": len(statuses),
+        }
@@ -1,7 +1,14 @@
+import time
+IMPORT_STARTED = time.perf_counter()
+
 import os
-import shutil
-from fastapi import FastAPI, UploadFile, File, HTTPException
+import json
+import secrets
+import asyncio
+import traceback
+from fastapi import FastAPI, UploadFile, File, HTTPException, WebSocket, WebSocketDisconnect, Request, Header, Depends, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse, JSONResponse
 from pydantic import BaseModel
 from contextlib import asynccontextmanager
 from dotenv import load_dotenv
@@ -12,21 +19,129 @@ load_dotenv()
 from storage import StorageService
 from transcriber import TranscriberService
 from reflector import ReflectorService
+from audio_buffer import AudioBuffer
+from single_flight import SingleFlightCache, audio_digest, replay
+from admission import admission, OverloadedError
+from theme_counters import ThemeCounters
+import theme_tagger
+from uploads import UploadStore, OffsetMismatch
+from jobs import JobQueue
+from shared_state import shared_state, SharedStateError
+import clients
 
 # Globals
 storage_service = None
 transcriber_service = None
 reflector_service = None
 
+# Services are built in the background after startup so /health answers at once; requests
+# that need them wait up to READY_WAIT_SECONDS for the warm-up to finish
+SERVICE_INIT_TIMEOUT = float(os.getenv("SERVICE_INIT_TIMEOUT", "20"))
+READY_WAIT_SECONDS = float(os.getenv("READY_WAIT_SECONDS", "15"))
+warmup_task = None
+container_task = None
+startup_status = {}
+
+# Opt-in: keep a copy of each recording in storage, uploaded while it is transcribed.
+# Off by default: otherwise audio never outlives its request.
+STORE_AUDIO = os.getenv("STORE_AUDIO", "false").lower() == "true"
+
+# Identical uploads (retries, double submits) share one pipeline run; results live briefly in memory only
+pipeline_cache = SingleFlightCache(
+    ttl=float(os.getenv("PIPELINE_CACHE_TTL", "120")),
+    max_entries=int(os.getenv("PIPELINE_CACHE_MAX_ENTRIES", "256")),
+)
+
+# Resumable chunked uploads, transcribed while they arrive
+upload_store = UploadStore(new_id=shared_state.new_id)
+
+# Submit-then-poll processing, run by a background worker pool
+job_queue = JobQueue(shared_state)
+
+# Anonymous theme-tag counts for the collective mirror (tags and counts only, never text)
+theme_counters = ThemeCounters()
+
+async def _init_service(name: str, factory):
+    """Run a (blocking) constructor or setup step off the event loop, bounded by SERVICE_INIT_TIMEOUT."""
+    started = time.perf_counter()
+    startup_status[name] = "starting"
+    try:
+        result = await asyncio.wait_for(asyncio.to_thread(factory), SERVICE_INIT_TIMEOUT)
+    except asyncio.TimeoutError:
+        startup_status[name] = f"timed out after {SERVICE_INIT_TIMEOUT:g}s"
+        print(f"❌ {name} did not start within {SERVICE_INIT_TIMEOUT:g}s")
+        return None
+    except Exception as e:
+        startup_status[name] = f"failed: {e}"
+        print(f"❌ {name} failed to start: {e}")
+        return None
+    startup_status[name] = f"ready in {time.perf_counter() - started:.2f}s"
+    return result
+
+async def _warm_up():
+    global storage_service, transcriber_service, reflector_service, container_task
+    started = time.perf_counter()
+    storage_service, transcriber_service, reflector_service = await asyncio.gather(
+        _init_service("storage", StorageService),
+        _init_service("transcriber", TranscriberService),
+        _init_service("reflector", ReflectorService),
+    )
+    # Pre-connect Speech recognizers in the background; until they're ready requests build their own
+    if transcriber_service is not None:
+        transcriber_service.start_recognizer_pool()
+
+    # Connect to Azure OpenAI now so the first reflection doesn't pay for DNS, TLS and the handshake
+    if reflector_service is not None and reflector_service.client is not None:
+        startup_status["openai_warm_up"] = "starting"
+        warmed = await clients.warm_up()
+        startup_status["openai_warm_up"] = f"{warmed} connection(s) in {clients.stats['warm_up_seconds']:.2f}s"
+
+    # A slow or unreachable storage account must not hold up readiness; audio is never stored on the request path
+    if storage_service is not None and storage_service.service_client is not None:
+        container_task = asyncio.create_task(_init_service("storage_container", storage_service.ensure_container))
+
+    startup_status["import_to_ready_seconds"] = round(time.perf_counter() - IMPORT_STARTED, 2)
+    state = "Ready" if _services_up() else "Started with errors"
+    print(f"⚡ {state} {time.perf_counter() - IMPORT_STARTED:.2f}s after import (services took {time.perf_counter() - started:.2f}s)")
+
+def _services_up() -> bool:
+    return transcriber_service is not None and reflector_service is not None
+
+async def services_ready():
+    """Dependency for routes that use the services: a request during a cold start waits briefly."""
+    if not warmup_task.done():
+        try:
+            await asyncio.wait_for(asyncio.shield(warmup_task), READY_WAIT_SECONDS)
+        except asyncio.TimeoutError:
+            raise OverloadedError("startup", 5)
+    if not _services_up():
+        raise HTTPException(status_code=503, detail="The silence is not ready yet.")
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Startup: Initialize services
-    global storage_service, transcriber_service, reflector_service
-    storage_service = StorageService()
-    transcriber_service = TranscriberService()
-    reflector_service = ReflectorService()
+    # Startup: Initialize services in the background
+    global warmup_task
+    await shared_state.connect()
+    warmup_task = asyncio.create_task(_warm_up())
+    await theme_counters.start()
+    await job_queue.start()
+    await upload_store.start()
     yield
     # Shutdown: Clean up if needed
+    await upload_store.stop()
+    await job_queue.stop()
+    await theme_counters.stop()
+    await asyncio.gather(warmup_task, return_exceptions=True)
+    # Container setup may still be waiting on a slow storage account; don't wait it out
+    if container_task is not None:
+        container_task.cancel()
+        await asyncio.gather(container_task, return_exceptions=True)
+    if transcriber_service is not None:
+        await transcriber_service.close()
+    await clients.close()
+    if storage_service is not None:
+        await storage_service.close()
+    await shared_state.close()
 
 app = FastAPI(
     title="Still API",
@@ -51,14 +166,23 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Retry-After"],
 )
 
-@app.get("/debug-speech")
+@app.exception_handler(OverloadedError)
+async def overloaded_handler(request, exc: OverloadedError):
+    """A full stage queue answers fast with 503 + Retry-After instead of timing out."""
+    print(f"🚦 Shedding request: {exc.stage} stage overloaded")
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Too many moments at once. Please try again shortly."},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+@app.get("/debug-speech", dependencies=[Depends(services_ready)])
 async def debug_speech():
     """Debug endpoint to test Azure Speech Service configuration"""
     try:
-        import azure.cognitiveservices.speech as speechsdk
-        
         speech_key = os.getenv("SPEECH_KEY")
         speech_region = os.getenv("SPEECH_REGION")
         
@@ -70,20 +194,14 @@ async def debug_speech():
         }
         
         if speech_key and speech_region:
-            try:
-                # Test Speech Service configuration
-                speech_config = speechsdk.SpeechConfig(subscription=speech_key, region=speech_region)
-                speech_config.speech_recognition_language = "en-US"
-                
-                # Try to create a recognizer (this validates the config)
-                recognizer = speechsdk.SpeechRecognizer(speech_config=speech_config)
-                
+            # The transcriber validated the config at startup; its pool shows whether connections succeed
+            if transcriber_service.speech_config is not None:
                 result["speech_service_status"] = "initialized_successfully"
                 result["error"] = None
-                
-            except Exception as e:
+                result["recognizer_pool"] = transcriber_service.recognizers.snapshot()
+            else:
                 result["speech_service_status"] = "initialization_failed"
-                result["error"] = str(e)
+                result["error"] = "Speech config could not be created; see the startup log"
         else:
             result["speech_service_status"] = "missing_credentials"
             result["error"] = "Missing SPEECH_KEY or SPEECH_REGION"
@@ -103,16 +221,16 @@ async def test_endpoint():
     print("🔥 Test endpoint called!")
     return {"message": "Backend is working!", "timestamp": "2026-01-04"}
 
-@app.get("/debug-ffmpeg")
+@app.get("/debug-ffmpeg", dependencies=[Depends(services_ready)])
 async def debug_ffmpeg():
     """Debug endpoint to test FFmpeg availability"""
     try:
-        import subprocess
-        result = subprocess.run(["ffmpeg", "-version"], check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        version_info = await transcriber_service.transcoder.version()
         return {
             "status": "success",
             "ffmpeg_available": True,
-            "version_info": result.stdout.split('\n')[0]  # First line has version
+            "version_info": version_info,  # First line has version
+            "max_processes": transcriber_service.transcoder.max_processes
         }
     except FileNotFoundError:
         return {
@@ -127,7 +245,7 @@ async def debug_ffmpeg():
             "error": str(e)
         }
 
-@app.get("/debug-azure")
+@app.get("/debug-azure", dependencies=[Depends(services_ready)])
 async def debug_azure():
     """Debug endpoint to test Azure OpenAI connection"""
     try:
@@ -145,7 +263,7 @@ async def debug_azure():
         
         # Test Azure OpenAI connection
         if reflector_service and reflector_service.client:
-            test_result = reflector_service._call_model("Test message")
+            test_result = await reflector_service._call_model("Test message")
             return {
                 "status": "success",
                 "environment": env_status,
@@ -166,29 +284,61 @@ async def debug_azure():
             "error_type": str(type(e))
         }
 
+@app.get("/debug-stats", dependencies=[Depends(services_ready)])
+async def debug_stats():
+    """Queue depths, wait times, cache counters, breaker state and token usage for tuning the pipeline limits"""
+    return {
+        "admission": admission.snapshot(),
+        "pipeline_cache": pipeline_cache.snapshot(),
+        "transcription": {
+            "hedge": transcriber_service.hedge_stats,
+            "speech_latency_seconds": transcriber_service.speech_latency.snapshot(),
+            "vad": transcriber_service.vad_stats,
+            "segments": transcriber_service.segment_stats,
+            "recognizer_pool": transcriber_service.recognizers.snapshot() if transcriber_service.recognizers else None,
+        },
+        "reflection": {
+            "breaker": reflector_service.breaker.snapshot(),
+            "token_limit": reflector_service.token_limit,
+            "usage": reflector_service.usage.snapshot(),
+            "near_duplicate_cache": reflector_service.cache.snapshot(),
+            "pool": reflector_service.pool.snapshot(),
+            "client": clients.snapshot(),
+        },
+        "uploads": upload_store.snapshot(),
+        "jobs": job_queue.snapshot(),
+        "shared_state": shared_state.snapshot(),
+        "storage": storage_service.snapshot() if storage_service else None,
+        "themes": {
+            **theme_counters.snapshot(),
+            "current_window": await theme_counters.totals(since=theme_counters.window_start()),
+        },
+    }
+
 @app.get("/health")
 async def health_check():
     return {"status": "still", "silence": True}
 
-@app.post("/debug-audio-processing")
+@app.get("/ready")
+async def readiness_check():
+    """503 until the services are up; /health stays a plain liveness check."""
+    ready = warmup_task is not None and warmup_task.done() and _services_up()
+    return JSONResponse(status_code=200 if ready else 503, content={"ready": ready, "startup": startup_status})
+
+@app.post("/debug-audio-processing", dependencies=[Depends(services_ready)])
 async def debug_audio_processing(file: UploadFile = File(...)):
     """Debug endpoint to test the full audio processing pipeline"""
     print(f"🔍 DEBUG: Received file: {file.filename}, size: {file.size}, type: {file.content_type}")
     
-    # Save the file temporarily
-    filename = f"debug_audio_{os.urandom(4).hex()}.webm"
-    temp_path = f"temp_{filename}"
+    # Buffer the upload in memory (spills to disk only when oversized)
+    audio = await AudioBuffer.from_upload(file)
     
     try:
-        # Save file
-        with open(temp_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-        
-        file_size = os.path.getsize(temp_path)
-        print(f"🔍 DEBUG: File saved, size: {file_size} bytes")
+        file_size = audio.size
+        print(f"🔍 DEBUG: File buffered, size: {file_size} bytes, spilled: {audio.spilled}")
         
         # Test transcription
-        transcript = await transcriber_service.transcribe(temp_path)
+        transcript = await transcriber_service.transcribe(audio)
         print(f"🔍 DEBUG: Transcript: {transcript}")
         
         return {
@@ -197,7 +347,8 @@ async def debug_audio_processing(file: UploadFile = File(...)):
                 "filename": file.filename,
                 "size": file.size,
                 "content_type": file.content_type,
-                "saved_size": file_size
+                "saved_size": file_size,
+                "spilled_to_disk": audio.spilled
             },
             "transcript": transcript,
             "transcript_length": len(transcript)
@@ -210,47 +361,450 @@ async def debug_audio_processing(file: UploadFile = File(...)):
             "error": str(e)
         }
     finally:
-        if os.path.exists(temp_path):
-            os.remove(temp_path)
+        audio.close()
 
-@app.post("/process-audio")
+@app.post("/process-audio", dependencies=[Depends(services_ready)])
 async def process_audio(file: UploadFile = File(...)):
     print(f"🎯 Received audio upload: {file.filename}, size: {file.size}, content_type: {file.content_type}")
     
     if not file:
         raise HTTPException(status_code=400, detail="No audio file provided")
 
-    # 1. Save temp file (local or blob)
-    filename = f"audio_{os.urandom(4).hex()}.webm"
-    temp_path = f"temp_{filename}"
+    # 1. Buffer the upload in memory (spills to disk only when oversized)
+    audio = await AudioBuffer.from_upload(file)
+    print(f"✅ Audio buffered, size: {audio.size} bytes, spilled: {audio.spilled}")
     
     try:
-        print(f"💾 Saving audio to: {temp_path}")
-        # Save locally for processing
-        with open(temp_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-            
-        print(f"✅ Audio saved, file size: {os.path.getsize(temp_path)} bytes")
-        
-        # 2. Transcribe
+        return _outcome([event async for event in await _flight(audio, "request")])
+
+    except (OverloadedError, HTTPException):
+        raise
+    except Exception as e:
+        print(f"❌ Processing Error: {e}")
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail="The silence was too heavy.")
+
+def _record_themes(transcript: str):
+    """Tag the transcript locally and count its themes; only the tags are kept."""
+    if not transcript or transcriber_service.is_fallback(transcript):
+        return
+    try:
+        tags = theme_tagger.tag(transcript)
+        if tags:
+            theme_counters.record(tags)
+    except Exception as e:
+        print(f"❌ Theme tagging failed: {e}")
+
+def _archive(filename: str):
+    """
+    With STORE_AUDIO on, a TemporaryRecording to hold the audio in storage while it is
+    processed: written alongside transcription rather than before it, deleted once done.
+    """
+    if not STORE_AUDIO or storage_service is None:
+        return None
+    return storage_service.open_recording(secrets.token_hex(16) + (os.path.splitext(filename)[1] or ".webm"))
+
+async def _start_live(filename: str = "recording.webm", content_type: str = "audio/webm"):
+    """A live transcription whose chunks also stream into storage as they arrive (with STORE_AUDIO on)."""
+    live = await transcriber_service.start_live(filename=filename, content_type=content_type)
+    live.archive = _archive(filename)
+    return live
+
+async def _pipeline(transcribe, label: str):
+    """
+    The pipeline behind every endpoint: transcribe(), tag themes, then the streamed reflection.
+    Yields the (event, data) pairs /process-audio/stream sends, ending with "done" (the result)
+    or "error" ({"detail"}, plus "retry_after" and "stage" when a stage was overloaded).
+    """
+    try:
         print("🎤 Starting transcription...")
-        transcript = await transcriber_service.transcribe(temp_path)
+        transcript = await transcribe()
         print(f"📝 Transcript: {transcript}")
-        
-        # 3. Reflect
-        print("🤔 Starting reflection...")
-        reflection_data = await reflector_service.reflect(transcript)
+        _record_themes(transcript)
+
+        print("🤔 Starting streamed reflection...")
+        async for event, data in reflector_service.stream_reflect(transcript):
+            yield event, data
         print("✅ Reflection complete")
-        
-        return reflection_data
 
+    except OverloadedError as e:
+        print(f"🚦 Shedding {label}: {e.stage} stage overloaded")
+        yield "error", {"detail": "Too many moments at once.", "retry_after": e.retry_after, "stage": e.stage}
     except Exception as e:
-        print(f"❌ Processing Error: {e}")
+        print(f"❌ Processing Error ({label}): {e}")
         traceback.print_exc()
-        raise HTTPException(status_code=500, detail="The silence was too heavy.")
-        
+        yield "error", {"detail": "The silence was too heavy."}
+
+def _outcome(events) -> dict:
+    """The /process-audio answer for a finished pipeline's events: the result, or the error raised."""
+    for event, data in events:
+        if event == "done":
+            return data
+        if event == "error":
+            if "retry_after" in data:
+                raise OverloadedError(data["stage"], data["retry_after"])
+            raise HTTPException(status_code=500, detail=data["detail"])
+    raise HTTPException(status_code=500, detail="The silence was too heavy.")
+
+async def _run_pipeline(audio: AudioBuffer, digest: str, label: str):
+    archive = _archive(audio.filename)
+    if archive is not None:
+        archive.store(audio.chunks())
+    try:
+        async for event, data in _pipeline(lambda: transcriber_service.transcribe(audio), label):
+            if event == "done" and reflector_service.is_cacheable(data):
+                await _share_result(digest, data)
+            yield event, data
     finally:
-        # 4. Cleanup (Crucial)
-        if os.path.exists(temp_path):
-            os.remove(temp_path)
-            print(f"🗑️ Cleaned up: {temp_path}")
+        # Cleanup (Crucial)
+        if archive is not None:
+            await archive.delete()
+        audio.close()
+        print("🗑️ Released audio buffer")
+
+async def _flight(audio: AudioBuffer, label: str, digest: str | None = None):
+    """
+    Pipeline events for a buffered upload, from the first. Identical uploads share one run:
+    one already in flight is joined and replayed, and one answered within the cache TTL
+    (here, or by another worker) replays as just "done". Takes ownership of `audio`.
+    """
+    digest = digest or audio_digest(audio)
+    if pipeline_cache.peek(digest) is None:
+        shared = await _shared_result(digest)
+        if shared is not None:
+            audio.close()
+            return replay([("done", shared)])
+
+    started = False
+
+    def start():
+        nonlocal started
+        started = True
+        return _run_pipeline(audio, digest, label)
+
+    # Fallbacks (static or pooled) and repaired reflections aren't cached, so a retry can still get a real one
+    events = pipeline_cache.follow(digest, start, cacheable=reflector_service.is_cacheable)
+    if not started:
+        # Joined another flight; this copy of the audio is never used
+        audio.close()
+    return events
+
+async def _shared_result(digest: str) -> dict | None:
+    """A reflection another worker produced for the same recording within the cache TTL."""
+    if not shared_state.shared:
+        return None
+    try:
+        return await shared_state.get(f"result:{digest}")
+    except SharedStateError:
+        return None
+
+async def _share_result(digest: str, result: dict):
+    if not shared_state.shared:
+        return
+    try:
+        await shared_state.set(f"result:{digest}", result, ttl=pipeline_cache.ttl)
+    except SharedStateError as e:
+        print(f"⚠️ Could not share result: {e}")
+
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def _event_stream(events) -> StreamingResponse:
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.post("/process-audio/stream", dependencies=[Depends(services_ready)])
+async def process_audio_stream(file: UploadFile = File(...)):
+    """
+    Same pipeline as /process-audio, but the reflection is sent as Server-Sent Events
+    while it is generated: "reflection" deltas, the "flashcard" once complete, then "done".
+    """
+    print(f"🎯 Received audio upload for streaming: {file.filename}, size: {file.size}, content_type: {file.content_type}")
+
+    # Buffer before returning: the upload is closed once the endpoint returns
+    audio = await AudioBuffer.from_upload(file)
+
+    # A retry or double submit joins the run for the same recording, or replays its result.
+    # Headers are already sent once events flow, so a 503 travels as an "error" event
+    events = await _flight(audio, "streamed request")
+    return _event_stream(_sse(event, data) async for event, data in events)
+
+@app.websocket("/ws/process-audio")
+async def process_audio_live(websocket: WebSocket):
+    """
+    Live variant of /process-audio: the client sends audio chunks as binary frames
+    while recording, then the text frame "stop". Recognition runs during the recording,
+    so only the tail and the reflection remain once the user stops speaking.
+    The reflection comes back as {"event", "data"} messages, the same events as
+    /process-audio/stream, ending with "done". A recording over UPLOAD_MAX_BYTES is closed
+    with 1009.
+    """
+    await websocket.accept()
+    try:
+        await services_ready()
+    except (OverloadedError, HTTPException):
+        await websocket.close(code=1013)  # try again later
+        return
+    content_type = websocket.query_params.get("content_type", "audio/webm")
+    print(f"🎯 Live audio session opened, content_type: {content_type}")
+
+    live = await _start_live(content_type=content_type)
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                print("🔌 Live audio session closed before stop")
+                return
+            if message.get("bytes"):
+                # Same cap as a chunked upload: a live session holds a recognizer and its buffer
+                if live.audio.size + len(message["bytes"]) > upload_store.max_bytes:
+                    print("⚠️ Live audio session over UPLOAD_MAX_BYTES, closing")
+                    await websocket.close(code=1009, reason="Recording too large")
+                    return
+                await live.write(message["bytes"])
+            elif message.get("text") == "stop":
+                break
+
+        print(f"✅ Live audio complete, size: {live.audio.size} bytes")
+        async for event, data in _pipeline(live.finish, "live session"):
+            if event == "error":
+                # 1013: overloaded, try again later
+                await websocket.close(code=1013 if "retry_after" in data else 1011, reason=data["detail"])
+                return
+            await websocket.send_json({"event": event, "data": data})
+
+        await websocket.close()
+
+    except WebSocketDisconnect:
+        print("🔌 Live audio client disconnected")
+    except Exception as e:
+        print(f"❌ Live Processing Error: {e}")
+        traceback.print_exc()
+        await websocket.close(code=1011, reason="The silence was too heavy.")
+    finally:
+        live.close()
+        print("🗑️ Released live audio buffer")
+
+class UploadCreate(BaseModel):
+    content_type: str = "audio/webm"
+
+async def _owner_call(object_id: str, method: str, args: dict) -> tuple[int, dict]:
+    """Run an upload or job handler on the worker that holds the object (usually this one)."""
+    try:
+        status, body = await shared_state.call(object_id, method, args)
+    except SharedStateError as e:
+        print(f"⚠️ Forwarded {method} failed: {e}")
+        return 404, {"detail": "Not found or expired"}
+    return status, body
+
+def _reply(status: int, body: dict) -> JSONResponse:
+    headers = {"Retry-After": str(body["retry_after"])} if status == 503 and "retry_after" in body else None
+    return JSONResponse(status_code=status, content=body, headers=headers)
+
+UPLOAD_GONE = (404, {"detail": "Upload not found or expired"})
+JOB_GONE = (404, {"detail": "Job not found or expired"})
+
+@app.post("/uploads", status_code=201, dependencies=[Depends(services_ready)])
+async def create_upload(body: UploadCreate | None = None):
+    """
+    Start a resumable upload. The client PUTs MediaRecorder chunks to /uploads/{id}?offset=N
+    while still recording; they are transcoded and recognized as they arrive, so finalizing
+    only waits for the tail of recognition and the reflection.
+    """
+    content_type = body.content_type if body else "audio/webm"
+    filename = "recording.mp4" if "mp4" in content_type else "recording.webm"
+    session = await upload_store.create(lambda: _start_live(filename=filename, content_type=content_type))
+    print(f"🎯 Chunked upload opened: {content_type}")
+    return {"upload_id": session.id, "offset": 0}
+
+# Upload sessions hold a live recognizer and stay on the worker that created them; requests
+# that reach another worker are forwarded to these handlers through the shared state.
+
+async def _upload_status(args: dict):
+    session = upload_store.get(args["id"])
+    if session is None:
+        return UPLOAD_GONE
+    return 200, {"upload_id": session.id, "offset": session.offset, "finalized": session.task is not None}
+
+async def _upload_append(args: dict):
+    session = upload_store.get(args["id"])
+    if session is None:
+        return UPLOAD_GONE
+    try:
+        received = await session.append(args["offset"], args["chunk"])
+    except OffsetMismatch as e:
+        return 409, {"detail": "Offset does not match the bytes received", "offset": e.offset}
+    except ValueError:
+        return 413, {"detail": "Recording too large"}
+    return 200, {"upload_id": session.id, "offset": received}
+
+def _start_finalize(args: dict):
+    """(session, None) once the reflection is running, or (None, (status, body)) if refused."""
+    session = upload_store.get(args["id"])
+    if session is None:
+        return None, UPLOAD_GONE
+    size = args.get("size")
+    if size is not None and session.task is None and size != session.offset:
+        return None, (409, {"detail": f"Received {session.offset} of {size} bytes"})
+    upload_store.finalize(session, _upload_pipeline)
+    return session, None
+
+async def _upload_finalize(args: dict):
+    """Finalize and wait for the whole run, answering with every event."""
+    session, refusal = _start_finalize(args)
+    if refusal:
+        return refusal
+    return 200, {"events": [list(event) async for event in session.follow()]}
+
+shared_state.handle("upload.status", _upload_status)
+shared_state.handle("upload.append", _upload_append)
+shared_state.handle("upload.finalize", _upload_finalize)
+
+@app.get("/uploads/{upload_id}")
+async def upload_status(upload_id: str):
+    """Bytes received so far: where a client resumes after a dropped request."""
+    return _reply(*await _owner_call(upload_id, "upload.status", {"id": upload_id}))
+
+async def _read_chunk(request: Request, limit: int) -> bytes | None:
+    """The request body, or None as soon as it is known to exceed limit bytes."""
+    try:
+        declared = int(request.headers.get("content-length") or 0)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid Content-Length")
+    if declared > limit:
+        return None
+    chunk = bytearray()
+    async for part in request.stream():
+        chunk += part
+        if len(chunk) > limit:
+            return None
+    return bytes(chunk)
+
+@app.put("/uploads/{upload_id}")
+async def append_upload(upload_id: str, request: Request, offset: int = Query(ge=0)):
+    """
+    Append the raw request body at `offset`. Bytes already received are ignored; a gap is a 409.
+    A body over UPLOAD_MAX_CHUNK_BYTES is a 413: send the recording in smaller pieces.
+    """
+    chunk = await _read_chunk(request, upload_store.max_chunk_bytes)
+    if chunk is None:
+        return _reply(413, {"detail": "Chunk too large", "max_chunk_bytes": upload_store.max_chunk_bytes})
+    return _reply(*await _owner_call(upload_id, "upload.append", {"id": upload_id, "offset": offset, "chunk": chunk}))
+
+async def _upload_pipeline(session):
+    print(f"✅ Chunked upload complete, size: {session.offset} bytes")
+    async for event in _pipeline(session.live.finish, "chunked upload"):
+        yield event
+
+@app.post("/uploads/{upload_id}/finalize")
+async def finalize_upload(upload_id: str, size: int | None = None):
+    """
+    Finish the upload and return the reflection (same body as /process-audio). Pass the total
+    `size` to have a short upload rejected instead of reflected. Safe to retry: a repeated
+    finalize joins the run already in progress or returns its result.
+    """
+    status, body = await _owner_call(upload_id, "upload.finalize", {"id": upload_id, "size": size})
+    if status != 200:
+        return _reply(status, body)
+    return _outcome(body["events"])
+
+@app.post("/uploads/{upload_id}/finalize/stream")
+async def finalize_upload_stream(upload_id: str, size: int | None = None):
+    """finalize, with the reflection sent as the same Server-Sent Events as /process-audio/stream."""
+    args = {"id": upload_id, "size": size}
+    if shared_state.is_local(upload_id):
+        session, refusal = _start_finalize(args)
+        if refusal:
+            return _reply(*refusal)
+        return _event_stream(_sse(event, data) async for event, data in session.follow())
+
+    # Held by another worker: its events arrive all at once when the run is over
+    status, body = await _owner_call(upload_id, "upload.finalize", args)
+    if status != 200:
+        return _reply(status, body)
+    return _event_stream(_sse(event, data) for event, data in body["events"])
+
+async def _job_pipeline(audio: AudioBuffer, digest: str):
+    # Shares the run (and cached result) with any endpoint handling the same recording
+    async for event in await _flight(audio, "job", digest):
+        yield event
+
+def _job_body(job) -> dict:
+    body = {"job_id": job.id, "status": job.status}
+    if job.result is not None:
+        body["result"] = job.result
+    elif job.error is not None:
+        body["error"] = job.error
+    return body
+
+async def _job_status(args: dict):
+    job = job_queue.get(args["id"])
+    if job is None:
+        return JOB_GONE
+    await job.wait(min(args.get("wait", 0), job_queue.max_wait))
+    return 200, _job_body(job)
+
+async def _job_events(args: dict):
+    job = job_queue.get(args["id"])
+    if job is None:
+        return JOB_GONE
+    return 200, {"events": [list(event) async for event in job.follow()]}
+
+shared_state.handle("job.status", _job_status)
+shared_state.handle("job.events", _job_events)
+
+@app.post("/jobs", status_code=202, dependencies=[Depends(services_ready)])
+async def submit_job(file: UploadFile = File(...), idempotency_key: str | None = Header(None)):
+    """
+    Queue a recording and return its job id at once, instead of holding the connection for
+    the whole pipeline like /process-audio. Poll GET /jobs/{id}?wait=N or subscribe to
+    /jobs/{id}/events. A retried submit (same Idempotency-Key header, or the same audio when
+    there is none) returns the existing job rather than running the pipeline again.
+    """
+    audio = await AudioBuffer.from_upload(file)
+    digest = audio_digest(audio)
+    key = f"key:{idempotency_key}" if idempotency_key else f"audio:{digest}"
+
+    for _ in range(2):
+        try:
+            job_id, job = await job_queue.submit(key, lambda: _job_pipeline(audio, digest), discard=audio.close)
+        except OverloadedError:
+            audio.close()
+            raise
+        if job is not None:
+            print(f"🎯 Queued job {job.id}: {file.filename}, size: {audio.size} bytes")
+            return _job_body(job)
+
+        status, body = await _owner_call(job_id, "job.status", {"id": job_id})
+        if status == 200:
+            audio.close()
+            print(f"♻️ Repeated job submit, joining job {job_id} ({body['status']})")
+            return body
+        # The job holding the key went away with its worker: free the key and queue this one
+        await job_queue.release(key, job_id)
+
+    audio.close()
+    raise HTTPException(status_code=500, detail="The silence was too heavy.")
+
+@app.get("/jobs/{job_id}")
+async def job_status(job_id: str, wait: float = 0):
+    """Job status, with the result once done. wait=N long-polls up to N seconds for it to finish."""
+    return _reply(*await _owner_call(job_id, "job.status", {"id": job_id, "wait": wait}))
+
+@app.get("/jobs/{job_id}/events")
+async def job_events(job_id: str):
+    """The job's reflection as the same Server-Sent Events as /process-audio/stream, replayed from the start."""
+    if shared_state.is_local(job_id):
+        job = job_queue.get(job_id)
+        if job is None:
+            return _reply(*JOB_GONE)
+        return _event_stream(_sse(event, data) async for event, data in job.follow())
+
+    # Run by another worker: its events arrive all at once when the job is over
+    status, body = await _owner_call(job_id, "job.events", {"id": job_id})
+    if status != 200:
+        return _reply(status, body)
+    return _event_stream(_sse(event, data) for event, data in body["events"])
@@ -0,0 +1,73 @@
+from collections import deque
+
+
+class LatencyTracker:
+    """Rolling window of recent latencies (seconds) with cheap percentile lookups."""
+
+    def __init__(self, window: int = 200):
+        self._samples = deque(maxlen=window)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def record(self, seconds: float):
+        self._samples.append(seconds)
+
+    def percentile(self, q: float) -> float | None:
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        index = min(int(q * len(ordered)), len(ordered) - 1)
+        return ordered[index]
+
+    def snapshot(self) -> dict:
+        return {
+            "samples": len(self._samples),
+            "p50": self.percentile(0.50),
+            "p95": self.percentile(0.95),
+            "max": max(self._samples) if self._samples else None,
+        }
+
+
+class UsageTracker:
+    """Token usage per completion: running totals plus rolling windows for tuning token limits."""
+
+    def __init__(self, window: int = 200):
+        self.totals = {
+            "requests": 0,
+            "prompt_tokens": 0,
+            "cached_tokens": 0,
+            "completion_tokens": 0,
+            "truncated": 0,
+        }
+        self.completion_tokens = LatencyTracker(window)  # same rolling-percentile window, counting tokens
+        self.latency = LatencyTracker(window)
+
+    def record(self, usage, seconds: float, finish_reason: str | None = None):
+        """usage is the provider's CompletionUsage (or None when it wasn't reported)."""
+        self.latency.record(seconds)
+        if finish_reason == "length":
+            self.totals["truncated"] += 1
+        if usage is None:
+            return
+
+        details = getattr(usage, "prompt_tokens_details", None)
+        cached = (getattr(details, "cached_tokens", None) or 0) if details else 0
+        self.totals["requests"] += 1
+        self.totals["prompt_tokens"] += usage.prompt_tokens or 0
+        self.totals["cached_tokens"] += cached
+        self.totals["completion_tokens"] += usage.completion_tokens or 0
+        self.completion_tokens.record(usage.completion_tokens or 0)
+        print(
+            f"📊 Tokens: prompt {usage.prompt_tokens} (cached {cached}), "
+            f"completion {usage.completion_tokens}, {seconds:.2f}s"
+        )
+
+    def snapshot(self) -> dict:
+        prompt = self.totals["prompt_tokens"]
+        return {
+            **self.totals,
+            "prompt_cache_hit_rate": round(self.totals["cached_tokens"] / prompt, 3) if prompt else None,
+            "completion_tokens_window": self.completion_tokens.snapshot(),
+            "latency_seconds": self.latency.snapshot(),
+        }
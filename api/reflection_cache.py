@@ -0,0 +1,160 @@
+import os
+import re
+import time
+import hashlib
+from collections import OrderedDict
+import numpy as np
+
+NUM_PERM = 128  # the estimate's error is about 0.03 around the 0.8 threshold
+BANDS = 32  # 32 bands x 4 rows: pairs above ~0.5 Jaccard almost always share a band
+ROWS = NUM_PERM // BANDS
+SHINGLE_WORDS = 2
+# Small enough that a * x wraps many times (a larger prime leaves a * x + b ordered like x
+# for most permutations, which makes their minimums agree) and the product fits in 64 bits
+_PRIME = (1 << 31) - 1
+
+# Per-process random permutations, like the pipeline digest key: signatures only mean
+# anything inside this process
+_rng = np.random.default_rng(int.from_bytes(os.urandom(8), "little"))
+_A = _rng.integers(1, _PRIME, size=NUM_PERM, dtype=np.uint64)
+_B = _rng.integers(0, _PRIME, size=NUM_PERM, dtype=np.uint64)
+
+_NON_WORD = re.compile(r"[^a-z0-9' ]+")
+
+# Hesitations that speech-to-text transcribes on one take and not the next
+_FILLERS = {"um", "umm", "uh", "uhh", "erm", "hmm", "mm"}
+
+# Words that flip what a sentence means. "I want to keep going" and "I don't want to keep
+# going" are nearly the same text, so two transcripts must agree on these exactly to match
+_NEGATIONS = {
+    "not", "no", "never", "nothing", "nobody", "none", "nowhere", "neither", "nor",
+    "without", "cannot", "cant", "dont", "wont", "isnt", "arent", "wasnt", "werent",
+    "didnt", "doesnt", "havent", "hasnt", "hadnt", "couldnt", "shouldnt", "wouldnt",
+    "aint", "hardly", "barely",
+}
+
+
+def normalize(transcript: str) -> str:
+    """
+    Lowercase, drop punctuation, filler words and extra whitespace, so "Um, I just need a
+    moment." == "i just need a moment".
+    """
+    text = transcript.lower().replace("’", "'")
+    return " ".join(w for w in _NON_WORD.sub(" ", text).split() if w not in _FILLERS)
+
+
+def polarity(text: str) -> bytes:
+    """Digest of the negation words in normalized text, in order. Equal only if both texts negate alike."""
+    flips = [w.replace("'", "") for w in text.split() if w.endswith("n't") or w.replace("'", "") in _NEGATIONS]
+    return hashlib.blake2b(" ".join(flips).encode(), digest_size=8).digest()
+
+
+def signature(text: str) -> np.ndarray:
+    """MinHash signature over the word shingles (pairs of words) of normalized text."""
+    words = ["^", *text.split(), "$"]
+    shingles = {" ".join(words[i:i + SHINGLE_WORDS]) for i in range(len(words) - SHINGLE_WORDS + 1)}
+    hashes = np.fromiter((hash(s) % _PRIME for s in shingles), dtype=np.uint64, count=len(shingles))
+    return ((hashes[:, None] * _A + _B) % _PRIME).min(axis=0)
+
+
+class ReflectionCache:
+    """
+    Bounded near-duplicate cache for reflections of short transcripts. Lookups go through
+    MinHash LSH bands, and a candidate is served only if its estimated Jaccard similarity
+    over word pairs clears the threshold and it has the same negation words. Only
+    signatures and a digest of those words are kept, never the transcript text.
+    """
+
+    def __init__(self):
+        self.max_words = int(os.getenv("REFLECT_CACHE_MAX_WORDS", "40"))
+        # One changed word in a ~40-word transcript leaves about 0.87-0.95 of the word pairs
+        # shared; differing negations never match whatever the score
+        self.similarity = float(os.getenv("REFLECT_CACHE_SIMILARITY", "0.8"))
+        self.ttl = float(os.getenv("REFLECT_CACHE_TTL", "600"))
+        self.max_entries = int(os.getenv("REFLECT_CACHE_MAX_ENTRIES", "1024"))
+
+        self._entries = OrderedDict()  # entry id -> (expires_at, signature, polarity, result)
+        self._bands = [{} for _ in range(BANDS)]  # band key -> set of entry ids
+        self._next_id = 0
+        self.stats = {"hits": 0, "misses": 0, "skipped_long": 0, "stores": 0, "evictions": 0}
+
+    def _key(self, transcript: str) -> tuple | None:
+        text = normalize(transcript)
+        if not text or text.count(" ") + 1 > self.max_words:
+            return None
+        return signature(text), polarity(text)
+
+    def _band_keys(self, sig: np.ndarray):
+        for band in range(BANDS):
+            yield band, sig[band * ROWS:(band + 1) * ROWS].tobytes()
+
+    def get(self, transcript: str) -> dict | None:
+        key = self._key(transcript)
+        if key is None:
+            self.stats["skipped_long"] += 1
+            return None
+        sig, flips = key
+
+        now = time.monotonic()
+        candidates = set()
+        for band, key in self._band_keys(sig):
+            candidates.update(self._bands[band].get(key, ()))
+
+        best, best_score = None, self.similarity
+        for entry_id in candidates:
+            expires_at, cached_sig, cached_flips, result = self._entries[entry_id]
+            if expires_at <= now:
+                self._remove(entry_id)
+                continue
+            if cached_flips != flips:
+                continue
+            score = float(np.count_nonzero(cached_sig == sig)) / NUM_PERM
+            if score >= best_score:
+                best, best_score = entry_id, score
+
+        if best is None:
+            self.stats["misses"] += 1
+            return None
+
+        self._entries.move_to_end(best)
+        self.stats["hits"] += 1
+        print(f"♻️ Near-duplicate transcript (similarity {best_score:.2f}), serving cached reflection")
+        return self._entries[best][3]
+
+    def put(self, transcript: str, result: dict):
+        key = self._key(transcript)
+        if key is None:
+            return
+        sig, flips = key
+
+        entry_id = self._next_id
+        self._next_id += 1
+        self._entries[entry_id] = (time.monotonic() + self.ttl, sig, flips, result)
+        for band, key in self._band_keys(sig):
+            self._bands[band].setdefault(key, set()).add(entry_id)
+        self.stats["stores"] += 1
+
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+            self.stats["evictions"] += 1
+
+    def _remove(self, entry_id: int):
+        sig = self._entries.pop(entry_id)[1]
+        for band, key in self._band_keys(sig):
+            ids = self._bands[band].get(key)
+            if ids is not None:
+                ids.discard(entry_id)
+                if not ids:
+                    del self._bands[band][key]
+
+    def snapshot(self) -> dict:
+        eligible = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "hit_rate": round(self.stats["hits"] / eligible, 3) if eligible else None,
+            "entries": len(self._entries),
+            "max_words": self.max_words,
+            "similarity": self.similarity,
+            "ttl_seconds": self.ttl,
+            "max_entries": self.max_entries,
+        }
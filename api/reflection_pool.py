@@ -0,0 +1,93 @@
+import os
+import gzip
+import json
+from itertools import count
+from pydantic import ValidationError
+import theme_tagger
+from reflection_schema import Reflection
+
+GENERAL_THEME = "general"  # pooled reflections written for transcripts with no strong theme
+
+# Transcript length buckets, in words: (name, upper bound)
+LENGTH_BUCKETS = [("short", 25), ("medium", 90), ("long", None)]
+
+DEFAULT_POOL_PATH = os.path.join(os.path.dirname(__file__), "reflection_pool.json.gz")
+
+
+def length_bucket(word_count: int) -> str:
+    for name, limit in LENGTH_BUCKETS:
+        if limit is None or word_count <= limit:
+            return name
+    return LENGTH_BUCKETS[-1][0]
+
+
+class ReflectionPool:
+    """
+    Pre-generated reflections, built offline by build_reflection_pool.py, for when the model
+    can't be used: circuit open, LLM stage overloaded, or a failed call. Entries are indexed
+    by theme and length bucket; pick() finds the closest cell and rotates through it so
+    concurrent users don't all get the same text.
+    """
+
+    def __init__(self, path: str | None = None):
+        self.path = path or os.getenv("REFLECTION_POOL_PATH", DEFAULT_POOL_PATH)
+        self._cells = {}  # (theme, bucket) / (theme, None) / (None, bucket) / (None, None) -> [entries]
+        self._ids = set()
+        self._turn = count()
+        self.stats = {"served": 0, "misses": 0}
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            print(f"WARNING: No reflection pool at {self.path}. Degraded mode will use the silence fallback.")
+            return
+
+        try:
+            with gzip.open(self.path, "rt", encoding="utf-8") as f:
+                entries = json.load(f)["entries"]
+        except Exception as e:
+            print(f"❌ Reflection pool could not be loaded: {e}")
+            return
+
+        for entry in entries:
+            try:
+                result = Reflection.model_validate(entry).model_dump()
+            except ValidationError:
+                continue
+            theme = entry.get("theme") or GENERAL_THEME
+            bucket = entry.get("length")
+            for cell in ((theme, bucket), (theme, None), (None, bucket), (None, None)):
+                self._cells.setdefault(cell, []).append(result)
+            self._ids.add(id(result))
+
+        print(f"✅ Reflection pool loaded: {len(self._ids)} reflections")
+
+    def is_pooled(self, result: dict) -> bool:
+        return id(result) in self._ids
+
+    def pick(self, transcript: str) -> dict | None:
+        """Best-matching pooled reflection for the transcript, or None if the pool is empty."""
+        if not self._ids:
+            return None
+
+        tags = theme_tagger.tag(transcript) if transcript else []
+        bucket = length_bucket(len(transcript.split()) if transcript else 0)
+        themes = tags or [GENERAL_THEME]
+        cells = [(theme, bucket) for theme in themes] + [(theme, None) for theme in themes]
+        cells += [(GENERAL_THEME, bucket), (None, bucket), (None, None)]
+
+        for cell in cells:
+            candidates = self._cells.get(cell)
+            if candidates:
+                self.stats["served"] += 1
+                print(f"🧺 Serving pooled reflection ({cell[0] or 'any'} / {cell[1] or 'any'})")
+                return candidates[next(self._turn) % len(candidates)]
+
+        self.stats["misses"] += 1
+        return None
+
+    def snapshot(self) -> dict:
+        return {**self.stats, "entries": len(self._ids)}
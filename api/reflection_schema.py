@@ -0,0 +1,161 @@
+import re
+import json
+from pydantic import BaseModel, Field, ValidationError, field_validator
+
+
+class Flashcard(BaseModel):
+    title: str = Field(min_length=1)
+    bullets: list[str]
+
+    @field_validator("title")
+    @classmethod
+    def _strip_title(cls, value: str) -> str:
+        return value.strip()
+
+    @field_validator("bullets")
+    @classmethod
+    def _clean_bullets(cls, value: list[str]) -> list[str]:
+        return [bullet.strip() for bullet in value if bullet and bullet.strip()][:3]
+
+
+class Reflection(BaseModel):
+    reflection: str = Field(min_length=1)
+    flashcard: Flashcard
+    confidence: float = 0.0
+
+    @field_validator("confidence", mode="before")
+    @classmethod
+    def _clamp_confidence(cls, value) -> float:
+        try:
+            return min(max(float(value), 0.0), 1.0)
+        except (TypeError, ValueError):
+            return 0.0
+
+
+# Strict JSON-schema response format: the provider constrains decoding to this shape.
+# Property order matches STRICT_PROMPT so the reflection text still streams first.
+REFLECTION_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "reflection",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "reflection": {"type": "string"},
+                "flashcard": {
+                    "type": "object",
+                    "properties": {
+                        "title": {"type": "string"},
+                        "bullets": {"type": "array", "items": {"type": "string"}},
+                    },
+                    "required": ["title", "bullets"],
+                    "additionalProperties": False,
+                },
+                "confidence": {"type": "number"},
+            },
+            "required": ["reflection", "flashcard", "confidence"],
+            "additionalProperties": False,
+        },
+    },
+}
+
+# Used when a completion has a usable reflection but the flashcard was lost (e.g. truncated)
+DEFAULT_FLASHCARD = {"title": "Held", "bullets": ["Spoken", "Received", "Released"]}
+
+
+class Repaired(dict):
+    """A reflection recovered by local repair rather than parsed as sent: served once, never cached."""
+
+_TRAILING_COMMA = re.compile(r",\s*([}\]])")
+_CLOSERS = {"{": "}", "[": "]"}
+
+
+def parse_reflection(content: str) -> dict | None:
+    """
+    Validate a completion into the reflection shape. The fast path is a single typed parse
+    of the raw content; anything else goes through local repair before giving up.
+    """
+    try:
+        return Reflection.model_validate_json(content).model_dump()
+    except ValidationError:
+        pass
+
+    for candidate in _repair_candidates(content):
+        try:
+            data = json.loads(candidate)
+        except json.JSONDecodeError:
+            continue
+        result = _coerce(data)
+        if result:
+            print("✅ Reflection recovered by local repair")
+            return Repaired(result)
+
+    print("❌ No valid reflection JSON found in response")
+    print(f"❌ Raw content: {content[:200]}...")
+    return None
+
+
+def _coerce(data) -> dict | None:
+    if not isinstance(data, dict) or not isinstance(data.get("reflection"), str):
+        return None
+    flashcard = data.get("flashcard")
+    if not isinstance(flashcard, dict) or not flashcard.get("title"):
+        data["flashcard"] = DEFAULT_FLASHCARD
+    elif not isinstance(flashcard.get("bullets"), list):
+        flashcard["bullets"] = []
+    try:
+        return Reflection.model_validate(data).model_dump()
+    except ValidationError:
+        return None
+
+
+def _repair_candidates(content: str):
+    """
+    Yield progressively more aggressive fixes: fences and prose stripped, trailing commas
+    removed, then a truncated object closed at the end or at each earlier member boundary.
+    A string cut off mid-way is never closed: a reflection that stops mid-sentence is a
+    failure, not a result, so only members that arrived whole are kept.
+    """
+    start = content.find("{")
+    if start < 0:
+        return
+    text = content[start:]
+
+    stack = []
+    in_string = False
+    escaped = False
+    cuts = []  # (position, open containers) at each top-level-or-deeper comma
+    for pos, ch in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+            continue
+        if ch == '"':
+            in_string = True
+        elif ch in "{[":
+            stack.append(ch)
+        elif ch in "}]":
+            if stack:
+                stack.pop()
+            if not stack:
+                # The first complete object; anything after it (a closing fence, prose) is noise
+                yield _TRAILING_COMMA.sub(r"\1", text[:pos + 1])
+                return
+        elif ch == ",":
+            cuts.append((pos, list(stack)))
+
+    # Truncated: close whatever is still open, unless that would mean finishing a string
+    if not in_string:
+        yield _close(text, stack)
+    for pos, open_containers in reversed(cuts):
+        yield _close(text[:pos], open_containers)
+
+
+def _close(text: str, stack: list) -> str:
+    text = _TRAILING_COMMA.sub(r"\1", text).rstrip().rstrip(",")
+    return text + "".join(_CLOSERS[ch] for ch in reversed(stack))
@@ -0,0 +1,160 @@
+import json
+from reflection_schema import Repaired
+
+_ESCAPES = {
+    '"': '"',
+    "\\": "\\",
+    "/": "/",
+    "b": "\b",
+    "f": "\f",
+    "n": "\n",
+    "r": "\r",
+    "t": "\t",
+}
+
+
+class ReflectionStreamParser:
+    """
+    Incremental parser for the STRICT_PROMPT JSON as it streams out of the model.
+
+    feed() takes raw completion deltas and returns the events that became available:
+    ("reflection", text) for each newly decoded piece of the reflection string, and
+    ("flashcard", dict) once the flashcard object has closed. Anything before the first
+    "{" (such as a ```json fence) is ignored.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self.reflection = ""
+        self.reflection_complete = False
+        self.flashcard = None
+        self._pos = 0
+        self._containers = []  # stack of "{" / "["
+        self._in_string = False
+        self._escape = None  # None, "" after a backslash, or the hex digits of a \u escape
+        self._pending_surrogate = ""
+        self._key = None
+        self._string_chars = []
+        self._string_is_key = False
+        self._expect_key = False
+        self._streaming_reflection = False
+        self._flashcard_start = None
+
+    def feed(self, delta: str) -> list:
+        self.text += delta
+        events = []
+        reflection_piece = []
+
+        while self._pos < len(self.text):
+            ch = self.text[self._pos]
+            self._pos += 1
+
+            if self._in_string:
+                decoded = self._decode_string_char(ch)
+                if decoded is None:
+                    continue
+                if decoded is _END_OF_STRING:
+                    self._close_string()
+                    continue
+                if self._streaming_reflection:
+                    self.reflection += decoded
+                    reflection_piece.append(decoded)
+                elif self._string_is_key:
+                    self._string_chars.append(decoded)
+                continue
+
+            if ch == '"':
+                self._open_string()
+            elif ch in "{[":
+                self._containers.append(ch)
+                self._expect_key = ch == "{"
+                if ch == "{" and len(self._containers) == 2 and self._key == "flashcard" and self._flashcard_start is None:
+                    self._flashcard_start = self._pos - 1
+            elif ch in "}]":
+                if ch == "}" and len(self._containers) == 2 and self._flashcard_start is not None and self.flashcard is None:
+                    if reflection_piece:
+                        events.append(("reflection", "".join(reflection_piece)))
+                        reflection_piece = []
+                    self._emit_flashcard(events)
+                if self._containers:
+                    self._containers.pop()
+                self._expect_key = False
+            elif ch == ",":
+                self._expect_key = bool(self._containers) and self._containers[-1] == "{"
+            elif ch == ":":
+                self._expect_key = False
+
+        if reflection_piece:
+            events.append(("reflection", "".join(reflection_piece)))
+        return events
+
+    def result(self) -> dict | None:
+        """
+        Best-effort result from what has streamed so far (used when the final parse fails).
+        Only a reflection string that closed counts: a completion cut off mid-reflection has none.
+        """
+        if not self.reflection_complete or not self.reflection or not self.flashcard:
+            return None
+        return Repaired({"reflection": self.reflection, "flashcard": self.flashcard, "confidence": 0.0})
+
+    def _open_string(self):
+        self._in_string = True
+        self._string_chars = []
+        top_level = len(self._containers) == 1
+        self._string_is_key = self._expect_key and top_level
+        self._streaming_reflection = not self._string_is_key and top_level and self._key == "reflection"
+
+    def _close_string(self):
+        self._in_string = False
+        if self._streaming_reflection:
+            self.reflection_complete = True
+        if self._string_is_key:
+            self._key = "".join(self._string_chars)
+        self._string_is_key = False
+        self._streaming_reflection = False
+
+    def _decode_string_char(self, ch: str):
+        if self._escape is None:
+            if ch == "\\":
+                self._escape = ""
+                return None
+            if ch == '"':
+                return _END_OF_STRING
+            return ch
+
+        if self._escape == "":
+            if ch == "u":
+                self._escape = "u"
+                return None
+            self._escape = None
+            return _ESCAPES.get(ch, ch)
+
+        # Inside a \uXXXX escape
+        self._escape += ch
+        if len(self._escape) < 5:
+            return None
+        digits = self._escape[1:]
+        self._escape = None
+        try:
+            code = int(digits, 16)
+        except ValueError:
+            return ""
+        if 0xD800 <= code <= 0xDBFF:
+            self._pending_surrogate = chr(code)
+            return None
+        if self._pending_surrogate and 0xDC00 <= code <= 0xDFFF:
+            pair = self._pending_surrogate + chr(code)
+            self._pending_surrogate = ""
+            return pair.encode("utf-16", "surrogatepass").decode("utf-16")
+        return chr(code)
+
+    def _emit_flashcard(self, events: list):
+        try:
+            self.flashcard = json.loads(self.text[self._flashcard_start:self._pos])
+            events.append(("flashcard", self.flashcard))
+        except json.JSONDecodeError as e:
+            print(f"❌ Streamed flashcard parse failed: {e}")
+            self._flashcard_start = None
+
+
+_END_OF_STRING = object()
@@ -1,9 +1,16 @@
 import os
-import json
-import re
+import time
+import asyncio
 import traceback
 from dotenv import load_dotenv
-from openai import AzureOpenAI
+import clients
+from reflection_stream import ReflectionStreamParser
+from reflection_schema import REFLECTION_RESPONSE_FORMAT, Repaired, parse_reflection
+from admission import admission, OverloadedError
+from circuit_breaker import CircuitBreaker, CircuitOpenError, RetryPolicy
+from metrics import UsageTracker
+from reflection_cache import ReflectionCache
+from reflection_pool import ReflectionPool
 
 STRICT_PROMPT = """
 You are not a therapist.
@@ -73,6 +80,9 @@ Return ONLY JSON in this exact structure:
 The confidence score represents how closely the reflection matched the emotional tone and content of the user's transcript.
 """
 
+# Built once and reused so every request starts with a byte-identical prefix the provider can cache
+SYSTEM_MESSAGE = {"role": "system", "content": STRICT_PROMPT}
+
 SILENCE_FALLBACK = {
     "reflection": (
         "You spoke about something that has been sitting with you, and for now it does not need to be "
@@ -104,10 +114,6 @@ class ReflectorService:
         print(f"DEBUG - API Version: {api_version}")
         print(f"DEBUG - Deployment: {deployment_name}")
 
-        # Ensure endpoint includes protocol
-        if endpoint and not endpoint.startswith(("http://", "https://")):
-            endpoint = "https://" + endpoint
-
         try:
             if not api_key or not endpoint:
                 print("ERROR: OPENAI_API_KEY and OPENAI_API_BASE must be set in environment")
@@ -117,11 +123,9 @@ class ReflectorService:
                 print("ERROR: OPENAI_DEPLOYMENT_NAME must be set in environment")
                 raise ValueError("OPENAI_DEPLOYMENT_NAME must be set in environment")
 
-            self.client = AzureOpenAI(
-                api_key=api_key,
-                azure_endpoint=endpoint,
-                api_version=api_version,
-            )
+            # The worker's shared client and keep-alive pool (clients.py). It makes no retries of
+            # its own: ours are jittered, budgeted, and visible to the breaker
+            self.client = clients.openai_client()
             
             print(f"✅ Azure OpenAI initialized successfully with deployment: {deployment_name}")
         except Exception as e:
@@ -129,80 +133,228 @@ class ReflectorService:
             self.client = None
 
         self.model = deployment_name  # Use deployment name, not model name
-        self.token_limit = 800
-
-    def _call_model(self, transcript: str) -> dict | None:
-        try:
-            print(f"🔄 Making API call with model/deployment: {self.model}")
-            print(f"🔄 Transcript length: {len(transcript)} characters")
-            
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": STRICT_PROMPT},
-                    {"role": "user", "content": transcript},
-                ],
-                max_completion_tokens=self.token_limit,
-                timeout=30
-            )
-
-            print(f"✅ Got response from Azure OpenAI")
-
-            # Azure safety: choices can exist but be empty
-            if not response.choices:
-                print("❌ No choices in response")
+        self.token_limit = int(os.getenv("REFLECT_TOKEN_LIMIT", "800"))
+
+        # Ask the provider to constrain output to the reflection schema, and to report usage on
+        # streamed completions; each is switched off automatically if the API version rejects it
+        self.structured_output = os.getenv("REFLECT_STRUCTURED_OUTPUT", "true").lower() == "true"
+        self.stream_usage = os.getenv("REFLECT_STREAM_USAGE", "true").lower() == "true"
+        self.usage = UsageTracker()
+
+        # Caps completions in flight so a burst queues here (the "llm" admission stage) instead of at the provider
+        self._inflight = admission.stage("llm")
+        self.max_concurrent_completions = self._inflight.limit
+
+        # Fail fast to the fallback while the provider is degraded, retry transient errors otherwise
+        self.breaker = CircuitBreaker("llm")
+        self.retry = RetryPolicy()
+        self.budget = float(os.getenv("REFLECT_BUDGET_SECONDS", "25"))
+        self.attempt_timeout = float(os.getenv("REFLECT_ATTEMPT_TIMEOUT", "15"))
+
+        # Short, formulaic transcripts that nearly match a recent one reuse its reflection
+        self.cache = ReflectionCache()
+
+        # Pre-generated reflections served instead of the single static fallback when the model can't be used
+        self.pool = ReflectionPool()
+
+    def _messages(self, transcript: str) -> list:
+        # Only the user turn varies; it always comes last so it never breaks the cached prefix
+        return [SYSTEM_MESSAGE, {"role": "user", "content": transcript}]
+
+    def _timeout(self, deadline: float) -> float:
+        return max(min(self.attempt_timeout, deadline - time.monotonic()), 1.0)
+
+    def _request(self, transcript: str, deadline: float, stream: bool = False) -> dict:
+        request = {
+            "model": self.model,
+            "messages": self._messages(transcript),
+            "max_completion_tokens": self.token_limit,
+            "timeout": self._timeout(deadline),
+        }
+        if self.structured_output:
+            request["response_format"] = REFLECTION_RESPONSE_FORMAT
+        if stream:
+            request["stream"] = True
+            if self.stream_usage:
+                request["stream_options"] = {"include_usage": True}
+        return request
+
+    def _downgrade_request(self, error: Exception) -> bool:
+        """Drop an optional parameter the provider refused. Returns True if the call should be retried."""
+        import openai
+
+        if not isinstance(error, openai.BadRequestError):
+            return False
+        message = str(error)
+        if self.structured_output and ("response_format" in message or "json_schema" in message):
+            print("⚠️ Deployment rejected structured output, falling back to prompt-only JSON")
+            self.structured_output = False
+            return True
+        if self.stream_usage and "stream_options" in message:
+            print("⚠️ Deployment rejected stream_options, streamed usage will not be recorded")
+            self.stream_usage = False
+            return True
+        return False
+
+    async def _backoff(self, error: Exception, attempt: int, deadline: float) -> bool:
+        """Sleep before retrying a transient error. Returns False when it's time to give up."""
+        delay = self.retry.delay(error, attempt, deadline - time.monotonic())
+        if delay is None:
+            return False
+        print(f"⚠️ Model call attempt {attempt} failed ({type(error).__name__}), retrying in {delay:.2f}s")
+        await asyncio.sleep(delay)
+        return True
+
+    async def _call_model(self, transcript: str) -> dict | None:
+        deadline = time.monotonic() + self.budget
+        attempt = 0
+        while True:
+            attempt += 1
+            # Don't queue for a slot we'd only be refused
+            if self.breaker.refuses():
+                print("⚡ LLM circuit open, skipping model call")
                 return None
 
-            message = response.choices[0].message
-            if not message or not message.content:
-                print("❌ No message content in response")
-                return None
-
-            content = message.content.strip()
-            print(f"✅ Raw response content length: {len(content)}")
-
-            # Remove markdown if present
-            cleaned = content.replace("```json", "").replace("```", "").strip()
-
-            # Try direct JSON parse
             try:
-                result = json.loads(cleaned)
-                print("✅ Successfully parsed JSON response")
-                return result
-            except json.JSONDecodeError as e:
-                print(f"❌ Direct JSON parse failed: {e}")
-
-            # Try extracting JSON block
-            match = re.search(r"\{[\s\S]*\}", cleaned)
-            if match:
-                try:
-                    result = json.loads(match.group(0))
-                    print("✅ Successfully parsed extracted JSON")
-                    return result
-                except json.JSONDecodeError as e:
-                    print(f"❌ Extracted JSON parse failed: {e}")
+                print(f"🔄 Making API call with model/deployment: {self.model} (attempt {attempt})")
+                print(f"🔄 Transcript length: {len(transcript)} characters")
+
+                # The slot is held for the attempt only, never across a backoff sleep
+                async with self._inflight.slot():
+                    async with self.breaker.guard(self.retry.is_transient) as call:
+                        response = await self.client.chat.completions.create(
+                            **self._request(transcript, deadline)
+                        )
+
+                print(f"✅ Got response from Azure OpenAI")
+
+                # Azure safety: choices can exist but be empty
+                finish_reason = response.choices[0].finish_reason if response.choices else None
+                self.usage.record(getattr(response, "usage", None), time.monotonic() - call.started, finish_reason)
+                if not response.choices:
+                    print("❌ No choices in response")
                     return None
 
-            print("❌ No valid JSON found in response")
-            print(f"❌ Raw content: {content[:200]}...")
-            return None
+                message = response.choices[0].message
+                if not message or not message.content:
+                    print("❌ No message content in response")
+                    return None
 
-        except Exception as e:
-            print(f"❌ Model call failed: {e}")
-            print(f"❌ Exception type: {type(e)}")
-            traceback.print_exc()
-            return None
+                return parse_reflection(message.content)
+
+            except OverloadedError:
+                raise
+            except CircuitOpenError:
+                print("⚡ LLM circuit open, skipping model call")
+                return None
+            except Exception as e:
+                if self._downgrade_request(e) or await self._backoff(e, attempt, deadline):
+                    continue
+                print(f"❌ Model call failed: {e}")
+                print(f"❌ Exception type: {type(e)}")
+                traceback.print_exc()
+                return None
+
+    def is_fallback(self, result: dict) -> bool:
+        """True for the static fallback and pooled reflections, i.e. anything the model didn't write for this transcript."""
+        return result is SILENCE_FALLBACK or self.pool.is_pooled(result)
+
+    def is_cacheable(self, result: dict) -> bool:
+        """Only a reflection the model wrote for this transcript, and that parsed as sent, may be reused."""
+        return not self.is_fallback(result) and not isinstance(result, Repaired)
+
+    def _degraded(self, transcript: str) -> dict:
+        return self.pool.pick(transcript) or SILENCE_FALLBACK
+
+    async def stream_reflect(self, transcript: str):
+        """
+        Reflect on a transcript, yielding (event, data) pairs as the completion arrives:
+        ("reflection", {"text": delta}) while the reflection string is generated,
+        ("flashcard", {...}) once the flashcard object is complete, and finally
+        ("done", result) with the fully parsed reflection (or the fallback).
+        """
+        if not transcript.strip():
+            print("🤫 Silent recording, returning the silence fallback")
+            yield "done", SILENCE_FALLBACK
+            return
 
-    async def reflect(self, transcript: str) -> dict:
         if not self.client:
             print("❌ No Azure OpenAI client available")
-            return SILENCE_FALLBACK
+            yield "done", self._degraded(transcript)
+            return
+
+        cached = self.cache.get(transcript)
+        if cached:
+            yield "reflection", {"text": cached["reflection"]}
+            yield "flashcard", cached["flashcard"]
+            yield "done", cached
+            return
+
+        parser = ReflectionStreamParser()
+        deadline = time.monotonic() + self.budget
+        attempt = 0
+        while True:
+            attempt += 1
+            if self.breaker.refuses():
+                print("⚡ LLM circuit open, skipping streaming model call")
+                break
 
-        result = self._call_model(transcript)
+            try:
+                print(f"🔄 Streaming API call with model/deployment: {self.model} (attempt {attempt})")
+                async with self._inflight.slot():
+                    async with self.breaker.guard(self.retry.is_transient) as call:
+                        stream = await self.client.chat.completions.create(
+                            **self._request(transcript, deadline, stream=True)
+                        )
+                        usage, finish_reason = None, None
+                        async for chunk in stream:
+                            # With include_usage the last chunk carries usage and no choices
+                            usage = getattr(chunk, "usage", None) or usage
+                            if chunk.choices and chunk.choices[0].finish_reason:
+                                finish_reason = chunk.choices[0].finish_reason
+                            # Azure sends a prompt-filter chunk with no choices first
+                            if not chunk.choices or not chunk.choices[0].delta.content:
+                                continue
+                            call.responded()
+                            for event, data in parser.feed(chunk.choices[0].delta.content):
+                                if event == "reflection":
+                                    yield "reflection", {"text": data}
+                                else:
+                                    yield event, data
+                        self.usage.record(usage, time.monotonic() - call.started, finish_reason)
+                break
+            except OverloadedError:
+                if not self.pool:
+                    raise
+                print("🚦 LLM stage overloaded, serving from the reflection pool")
+                break
+            except CircuitOpenError:
+                print("⚡ LLM circuit open, skipping streaming model call")
+                break
+            except Exception as e:
+                # Once text has reached the client a retry would repeat it
+                if not parser.text and (
+                    self._downgrade_request(e) or await self._backoff(e, attempt, deadline)
+                ):
+                    continue
+                print(f"❌ Streaming model call failed: {e}")
+                traceback.print_exc()
+                break
+
+        result = parse_reflection(parser.text) if parser.text else None
+        if not result:
+            result = parser.result()
 
         if result:
-            print("✅ Returning successful reflection")
-            return result
-
-        print("❌ Model call failed, returning fallback")
-        return SILENCE_FALLBACK
\ No newline at end of file
+            print("✅ Returning successful streamed reflection")
+            if self.is_cacheable(result):
+                self.cache.put(transcript, result)
+            yield "done", result
+            return
+
+        print("❌ Streamed model call failed, returning fallback")
+        fallback = self._degraded(transcript)
+        if fallback is not SILENCE_FALLBACK and not parser.text:
+            yield "reflection", {"text": fallback["reflection"]}
+            yield "flashcard", fallback["flashcard"]
+        yield "done", fallback
@@ -0,0 +1,386 @@
+import os
+import json
+import time
+import base64
+import asyncio
+import secrets
+import threading
+from itertools import count
+
+# Set by start_server.py --production for the workers it launches
+SOCKET_ENV = "STILL_STATE_SOCKET"
+
+# Longest line either side accepts: forwarded upload chunks travel base64-encoded, so
+# UPLOAD_MAX_CHUNK_BYTES must stay well below this. A longer line costs the connection
+MESSAGE_LIMIT = 64 * 1024 * 1024
+CALL_TIMEOUT = float(os.getenv("SHARED_STATE_CALL_TIMEOUT", "60"))
+SWEEP_EVERY = 256
+
+# A worker that loses its connection reconnects (backing off up to RECONNECT_MAX_SECONDS);
+# requests made meanwhile wait up to RECONNECT_WAIT seconds for it
+RECONNECT_SECONDS = 0.5
+RECONNECT_MAX_SECONDS = 10.0
+RECONNECT_WAIT = float(os.getenv("SHARED_STATE_RECONNECT_WAIT", "5"))
+
+
+class SharedStateError(Exception):
+    """The state server is unreachable, the owning worker is gone, or a forwarded call failed."""
+
+
+def _send(writer, message: dict):
+    writer.write(json.dumps(message, separators=(",", ":")).encode() + b"\n")
+
+
+def _encode_args(args: dict) -> dict:
+    return {k: {"b64": base64.b64encode(v).decode()} if isinstance(v, bytes) else v for k, v in args.items()}
+
+
+def _decode_args(args: dict) -> dict:
+    return {k: base64.b64decode(v["b64"]) if isinstance(v, dict) and set(v) == {"b64"} else v for k, v in args.items()}
+
+
+class _Store:
+    """Values with an optional TTL, plus integer counters. JSON-serializable values only."""
+
+    def __init__(self):
+        self._values = {}  # key -> (expires_at or None, value)
+        self._writes = 0
+
+    def _entry(self, key):
+        entry = self._values.get(key)
+        if entry is not None and entry[0] is not None and entry[0] <= time.monotonic():
+            del self._values[key]
+            return None
+        return entry
+
+    def _put(self, key, value, expires_at):
+        self._values[key] = (expires_at, value)
+        self._writes += 1
+        if self._writes % SWEEP_EVERY == 0:
+            now = time.monotonic()
+            for k in [k for k, (exp, _) in self._values.items() if exp is not None and exp <= now]:
+                del self._values[k]
+
+    def get(self, key):
+        entry = self._entry(key)
+        return None if entry is None else entry[1]
+
+    def set(self, key, value, ttl=None):
+        self._put(key, value, time.monotonic() + ttl if ttl else None)
+
+    def add(self, key, value, ttl=None):
+        """Store value only if key is absent; returns whatever the key holds afterwards."""
+        entry = self._entry(key)
+        if entry is not None:
+            return entry[1]
+        self.set(key, value, ttl)
+        return value
+
+    def incr(self, key, amount=1, ttl=None):
+        entry = self._entry(key)
+        if entry is None:
+            entry = (time.monotonic() + ttl if ttl else None, 0)
+        value = entry[1] + amount
+        self._put(key, value, entry[0])
+        return value
+
+    def delete(self, key):
+        self._values.pop(key, None)
+
+    def __len__(self):
+        return len(self._values)
+
+
+class StateServer:
+    """
+    Runs inside the launcher process, on its own thread, and serves every worker over a Unix
+    socket: a shared store (op get/set/add/incr/delete) and "call", which forwards a request
+    to the worker that owns an object (an upload session or a job) and relays the answer.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.store = _Store()
+        self._workers = {}  # worker id -> writer
+        self._pending = {}  # forwarded call id -> (worker id, future)
+        self._call_ids = count(1)
+        self._worker_ids = count(1)
+
+    def start_in_thread(self):
+        ready = threading.Event()
+
+        def run():
+            loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(loop)
+            loop.run_until_complete(self._listen())
+            ready.set()
+            loop.run_forever()
+
+        threading.Thread(target=run, name="shared-state", daemon=True).start()
+        if not ready.wait(5):
+            raise RuntimeError("shared state server did not start")
+        print(f"✅ Shared state server listening on {self.path}")
+
+    async def _listen(self):
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        await asyncio.start_unix_server(self._serve, path=self.path, limit=MESSAGE_LIMIT)
+        os.chmod(self.path, 0o600)
+
+    async def _serve(self, reader, writer):
+        worker = f"w{next(self._worker_ids)}"
+        self._workers[worker] = writer
+        try:
+            while line := await reader.readline():
+                message = json.loads(line)
+                if "reply" in message:
+                    _, future = self._pending.pop(message["reply"], (None, None))
+                    if future is not None and not future.done():
+                        future.set_result(message)
+                elif message.get("op") == "hello":
+                    # Answered in line, so the id is settled before anything else on this connection
+                    worker = self._claim(worker, message.get("worker"), writer)
+                    _send(writer, {"id": message["id"], "ok": True, "value": worker})
+                else:
+                    asyncio.create_task(self._answer(worker, writer, message))
+        except (ConnectionError, ValueError) as e:
+            print(f"⚠️ Shared state dropped worker {worker}: {e}")
+        finally:
+            del self._workers[worker]
+            for call_id, (target, future) in list(self._pending.items()):
+                if target == worker and not future.done():
+                    future.set_exception(SharedStateError(f"worker {worker} is gone"))
+            writer.close()
+
+    def _claim(self, worker: str, wanted: str | None, writer) -> str:
+        """A reconnecting worker gets its old id back, so the objects it owns stay reachable."""
+        if not wanted or wanted in self._workers:
+            return worker
+        del self._workers[worker]
+        self._workers[wanted] = writer
+        return wanted
+
+    async def _answer(self, worker: str, writer, message: dict):
+        try:
+            reply = {"id": message["id"], "ok": True, "value": await self._apply(worker, message)}
+        except Exception as e:
+            reply = {"id": message["id"], "ok": False, "error": str(e)}
+        if not writer.is_closing():
+            _send(writer, reply)
+
+    async def _apply(self, worker: str, message: dict):
+        op = message["op"]
+        if op == "get":
+            return self.store.get(message["key"])
+        if op == "set":
+            return self.store.set(message["key"], message["value"], message.get("ttl"))
+        if op == "add":
+            return self.store.add(message["key"], message["value"], message.get("ttl"))
+        if op == "incr":
+            return self.store.incr(message["key"], message.get("amount", 1), message.get("ttl"))
+        if op == "delete":
+            return self.store.delete(message["key"])
+        if op == "call":
+            return await self._forward(message["worker"], message["method"], message["args"])
+        raise SharedStateError(f"unknown op {op}")
+
+    async def _forward(self, target: str, method: str, args: dict):
+        writer = self._workers.get(target)
+        if writer is None:
+            raise SharedStateError(f"worker {target} is gone")
+        call_id = next(self._call_ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[call_id] = (target, future)
+        try:
+            _send(writer, {"call": call_id, "method": method, "args": args})
+            answer = await asyncio.wait_for(future, CALL_TIMEOUT)
+        finally:
+            self._pending.pop(call_id, None)
+        if not answer["ok"]:
+            raise SharedStateError(answer["error"])
+        return answer["value"]
+
+
+class SharedState:
+    """
+    A worker's handle on state shared with the other workers. Launched by start_server.py
+    --production it talks to the launcher's StateServer; otherwise (development, a single
+    worker, or the server unreachable at startup) the same calls are answered inside this
+    process. A lost connection is re-established under the same worker id.
+
+    Objects that can't leave their process (a live upload session, a running job) get ids
+    prefixed with the owning worker; call() runs a registered handler on that worker.
+    """
+
+    def __init__(self):
+        self.path = os.getenv(SOCKET_ENV)
+        self.worker = "w0"
+        self._local = _Store()
+        self._handlers = {}
+        self._pending = {}  # request id -> future
+        self._request_ids = count(1)
+        self._writer = None
+        self._reader_task = None
+        self._reconnect_task = None
+        self._shared = False
+        self._closing = False
+        self._connected = asyncio.Event()
+        self.stats = {"requests": 0, "forwarded_out": 0, "forwarded_in": 0, "errors": 0, "reconnects": 0}
+
+    @property
+    def shared(self) -> bool:
+        """True once connected to the state server (even while reconnecting to it)."""
+        return self._shared
+
+    async def connect(self):
+        if not self.path:
+            return
+        try:
+            await self._open(None)
+        except (OSError, SharedStateError) as e:
+            print(f"⚠️ Shared state unavailable ({e}), keeping state in this worker")
+            return
+        self._shared = True
+        print(f"✅ Connected to shared state as worker {self.worker}")
+
+    async def _open(self, worker: str | None):
+        reader, self._writer = await asyncio.open_unix_connection(self.path, limit=MESSAGE_LIMIT)
+        self._reader_task = asyncio.create_task(self._read(reader))
+        self.worker = await self._request({"op": "hello", "worker": worker}, wait=False)
+        self._connected.set()
+
+    async def _reconnect(self):
+        delay = RECONNECT_SECONDS
+        while not self._closing:
+            await asyncio.sleep(delay)
+            try:
+                await self._open(self.worker)
+            except (OSError, SharedStateError) as e:
+                print(f"⚠️ Shared state reconnect failed: {e}")
+                delay = min(delay * 2, RECONNECT_MAX_SECONDS)
+                continue
+            self.stats["reconnects"] += 1
+            print(f"✅ Reconnected to shared state as worker {self.worker}")
+            return
+
+    async def close(self):
+        self._closing = True
+        for task in (self._reconnect_task, self._reader_task):
+            if task is not None:
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+        self._reconnect_task = self._reader_task = None
+
+    async def _read(self, reader):
+        try:
+            while line := await reader.readline():
+                message = json.loads(line)
+                if "call" in message:
+                    asyncio.create_task(self._serve_call(message))
+                else:
+                    future = self._pending.pop(message["id"], None)
+                    if future is not None and not future.done():
+                        future.set_result(message)
+        except (ConnectionError, ValueError) as e:
+            print(f"❌ Shared state connection failed: {e}")
+        finally:
+            self._connected.clear()
+            writer, self._writer = self._writer, None
+            if writer is not None:
+                writer.close()
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(SharedStateError("shared state connection lost"))
+            self._pending.clear()
+            reconnecting = self._reconnect_task is not None and not self._reconnect_task.done()
+            if self._shared and not self._closing and not reconnecting:
+                self._reconnect_task = asyncio.create_task(self._reconnect())
+
+    async def _request(self, message: dict, wait: bool = True):
+        if self._writer is None and wait and self._shared and not self._closing:
+            try:
+                await asyncio.wait_for(self._connected.wait(), RECONNECT_WAIT)
+            except asyncio.TimeoutError:
+                pass
+        if self._writer is None:
+            raise SharedStateError("shared state connection lost")
+        request_id = next(self._request_ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        self.stats["requests"] += 1
+        _send(self._writer, {**message, "id": request_id})
+        answer = await future
+        if not answer["ok"]:
+            self.stats["errors"] += 1
+            raise SharedStateError(answer["error"])
+        return answer["value"]
+
+    async def get(self, key: str):
+        if not self.shared:
+            return self._local.get(key)
+        return await self._request({"op": "get", "key": key})
+
+    async def set(self, key: str, value, ttl: float | None = None):
+        if not self.shared:
+            return self._local.set(key, value, ttl)
+        await self._request({"op": "set", "key": key, "value": value, "ttl": ttl})
+
+    async def add(self, key: str, value, ttl: float | None = None):
+        """Set key only if absent, atomically across workers; returns the value it now holds."""
+        if not self.shared:
+            return self._local.add(key, value, ttl)
+        return await self._request({"op": "add", "key": key, "value": value, "ttl": ttl})
+
+    async def incr(self, key: str, amount: int = 1, ttl: float | None = None) -> int:
+        if not self.shared:
+            return self._local.incr(key, amount, ttl)
+        return await self._request({"op": "incr", "key": key, "amount": amount, "ttl": ttl})
+
+    async def delete(self, key: str):
+        if not self.shared:
+            return self._local.delete(key)
+        await self._request({"op": "delete", "key": key})
+
+    def new_id(self) -> str:
+        """Id for an object owned by this worker."""
+        return f"{self.worker}.{secrets.token_urlsafe(16)}"
+
+    def is_local(self, object_id: str) -> bool:
+        return not self.shared or object_id.split(".", 1)[0] == self.worker
+
+    def handle(self, method: str, handler):
+        """Register an async handler(args) that other workers can reach through call()."""
+        self._handlers[method] = handler
+
+    async def call(self, object_id: str, method: str, args: dict):
+        """Run method for object_id on the worker that owns it (here, if that's this worker)."""
+        if self.is_local(object_id):
+            return await self._handlers[method](args)
+        self.stats["forwarded_out"] += 1
+        return await self._request({
+            "op": "call",
+            "worker": object_id.split(".", 1)[0],
+            "method": method,
+            "args": _encode_args(args),
+        })
+
+    async def _serve_call(self, message: dict):
+        self.stats["forwarded_in"] += 1
+        try:
+            reply = {"reply": message["call"], "ok": True,
+                     "value": await self._handlers[message["method"]](_decode_args(message["args"]))}
+        except Exception as e:
+            reply = {"reply": message["call"], "ok": False, "error": f"{type(e).__name__}: {e}"}
+        if self._writer is not None:
+            _send(self._writer, reply)
+
+    def snapshot(self) -> dict:
+        return {
+            **self.stats,
+            "mode": "shared" if self.shared else "local",
+            "connected": self._writer is not None,
+            "worker": self.worker,
+        }
+
+
+shared_state = SharedState()
@@ -0,0 +1,151 @@
+import os
+import time
+import asyncio
+import hashlib
+from collections import OrderedDict
+from audio_buffer import AudioBuffer
+
+# Random key per server run: digests identify repeats inside this server only and cannot be
+# matched against a recording anywhere else. start_server.py --production hands its workers
+# one key (STILL_DIGEST_KEY) so a repeat is recognized whichever worker it reaches.
+_DIGEST_KEY = bytes.fromhex(os.getenv("STILL_DIGEST_KEY", "")) or os.urandom(32)
+
+
+def audio_digest(audio: AudioBuffer) -> str:
+    """Keyed BLAKE2b digest of the audio content."""
+    digest = hashlib.blake2b(key=_DIGEST_KEY, digest_size=32)
+    for chunk in audio.chunks():
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+class Flight:
+    """
+    One run of an event pipeline: an async generator of (event, data) pairs ending in "done"
+    (the result) or "error". It runs as its own task, so a caller that disconnects does not
+    cancel the work other callers are following, and every event is kept so a caller that
+    joins late, or before the run has started, replays it from the start. Shared by the
+    single-flight cache, jobs and chunked uploads.
+    """
+
+    def __init__(self, pipeline=None):
+        self.events = []
+        self.result = None
+        self.error = None
+        self.task = None
+        self._changed = asyncio.Event()
+        if pipeline is not None:
+            self.start(pipeline)
+
+    def start(self, pipeline) -> asyncio.Task:
+        """Run pipeline as this flight's task. Only the first call starts anything."""
+        if self.task is None:
+            self.task = asyncio.create_task(self._run(pipeline))
+            self._changed.set()
+        return self.task
+
+    @property
+    def finished(self) -> bool:
+        return self.task is not None and self.task.done()
+
+    async def _run(self, pipeline):
+        try:
+            async for event, data in pipeline:
+                self.events.append((event, data))
+                if event == "done":
+                    self.result = data
+                elif event == "error":
+                    self.error = data
+                self._changed.set()
+        finally:
+            # Cancelled mid-run: let the pipeline's own cleanup run now, not at garbage collection
+            await pipeline.aclose()
+            self._changed.set()
+
+    async def follow(self):
+        """Every event so far, then new ones as they arrive, until the run ends."""
+        index = 0
+        while True:
+            while index < len(self.events):
+                yield self.events[index]
+                index += 1
+            if self.finished:
+                return
+            self._changed.clear()
+            if index == len(self.events) and not self.finished:
+                await self._changed.wait()
+
+
+async def replay(events):
+    for event in events:
+        yield event
+
+
+class SingleFlightCache:
+    """
+    Collapses concurrent identical work into one Flight and keeps finished results in
+    memory for a short TTL, bounded LRU. Nothing is ever written to disk.
+    """
+
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._results = OrderedDict()  # key -> (expires_at, value)
+        self._inflight = {}  # key -> Flight
+        self.stats = {"hits": 0, "joined": 0, "misses": 0, "evictions": 0}
+
+    def peek(self, key: str):
+        """Finished result for key, or None."""
+        entry = self._results.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._results[key]
+            return None
+        self._results.move_to_end(key)
+        return value
+
+    def follow(self, key: str, factory, cacheable=lambda value: True):
+        """
+        Events for key, from the first: a cached result replays as a lone ("done", result);
+        otherwise join the flight already running for key, or start one on factory(), an
+        async generator of (event, data) pairs. A flight's "done" result is cached.
+        """
+        value = self.peek(key)
+        if value is not None:
+            self.stats["hits"] += 1
+            return replay([("done", value)])
+
+        flight = self._inflight.get(key)
+        if flight is None:
+            self.stats["misses"] += 1
+            flight = Flight(factory())
+            self._inflight[key] = flight
+            flight.task.add_done_callback(lambda done: self._settle(key, flight, cacheable))
+        else:
+            self.stats["joined"] += 1
+        return flight.follow()
+
+    def _settle(self, key: str, flight: Flight, cacheable):
+        self._inflight.pop(key, None)
+        if not flight.task.cancelled() and flight.task.exception() is not None:
+            print(f"❌ Pipeline flight failed: {flight.task.exception()}")
+        value = flight.result
+        if value is None or not cacheable(value):
+            return
+
+        self._results[key] = (time.monotonic() + self.ttl, value)
+        self._results.move_to_end(key)
+        while len(self._results) > self.max_entries:
+            self._results.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def snapshot(self) -> dict:
+        return {
+            **self.stats,
+            "inflight": len(self._inflight),
+            "entries": len(self._results),
+            "ttl_seconds": self.ttl,
+            "max_entries": self.max_entries,
+        }
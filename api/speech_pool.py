@@ -0,0 +1,140 @@
+import os
+import time
+import asyncio
+
+# How many connected recognizers to keep ready, and how long one may wait before it is replaced.
+# Each is an open Speech connection: keep this within the resource's concurrent-connection quota
+POOL_SIZE = int(os.getenv("SPEECH_POOL_SIZE", "1"))
+IDLE_SECONDS = float(os.getenv("SPEECH_POOL_IDLE_SECONDS", "60"))
+RETRY_SECONDS = 5.0
+
+
+class _Pooled:
+    __slots__ = ("recognizer", "stream", "connection", "created", "broken")
+
+    def __init__(self, recognizer, stream, connection):
+        self.recognizer = recognizer
+        self.stream = stream
+        self.connection = connection
+        self.created = time.monotonic()
+        self.broken = False
+
+    def discard(self):
+        if self.connection is not None:
+            try:
+                self.connection.close()
+            except Exception:
+                pass
+
+
+class SpeechRecognizerPool:
+    """
+    Single-shot recognizers for 16 kHz PCM, built and connected to the Speech service ahead of
+    time. A recognizer's audio input is fixed when it is built, so each one serves a single
+    recording: the pool hands out the freshest, then builds a replacement in the background.
+    Recognizers whose connection drops, or that sit unused for SPEECH_POOL_IDLE_SECONDS, are
+    closed. They are replaced only while the pool is in use: after SPEECH_POOL_IDLE_SECONDS
+    without a lease it holds no connections until the next one.
+    """
+
+    def __init__(self, speechsdk, speech_config, executor, size: int = POOL_SIZE, idle_seconds: float = IDLE_SECONDS):
+        self.sdk = speechsdk
+        self.speech_config = speech_config
+        self.executor = executor
+        self.size = size
+        self.idle_seconds = idle_seconds
+        self._ready = []  # oldest first
+        self._wake = asyncio.Event()
+        self._task = None
+        self._closed = False
+        self._last_used = time.monotonic()
+        self.stats = {"leased": 0, "built_on_demand": 0, "expired": 0, "disconnected": 0, "build_failures": 0}
+
+    def _build(self, connect: bool) -> _Pooled:
+        """Recognizer on a fresh push stream, optionally with its service connection opened. Blocking."""
+        stream = self.sdk.audio.PushAudioInputStream()
+        audio_config = self.sdk.audio.AudioConfig(stream=stream)
+        recognizer = self.sdk.SpeechRecognizer(speech_config=self.speech_config, audio_config=audio_config)
+        if not connect:
+            return _Pooled(recognizer, stream, None)
+
+        connection = self.sdk.Connection.from_recognizer(recognizer)
+        entry = _Pooled(recognizer, stream, connection)
+
+        def on_disconnected(evt):
+            entry.broken = True  # SDK thread; the maintenance loop drops it
+
+        connection.disconnected.connect(on_disconnected)
+        connection.open(False)
+        return entry
+
+    def start(self):
+        """Fill the pool and keep it filled. Call from the event loop."""
+        if self._task is None and self.size > 0:
+            self._task = asyncio.create_task(self._maintain())
+            print(f"✅ Speech recognizer pool filling to {self.size}")
+
+    def _prune(self):
+        now = time.monotonic()
+        keep = []
+        for entry in self._ready:
+            if entry.broken:
+                self.stats["disconnected"] += 1
+                entry.discard()
+            elif entry.created + self.idle_seconds <= now:
+                self.stats["expired"] += 1
+                entry.discard()
+            else:
+                keep.append(entry)
+        self._ready = keep
+
+    def _wanted(self) -> int:
+        return self.size if time.monotonic() - self._last_used < self.idle_seconds else 0
+
+    async def _maintain(self):
+        loop = asyncio.get_running_loop()
+        while not self._closed:
+            self._prune()
+            while len(self._ready) < self._wanted() and not self._closed:
+                try:
+                    entry = await loop.run_in_executor(self.executor, self._build, True)
+                except Exception as e:
+                    self.stats["build_failures"] += 1
+                    print(f"❌ Could not pre-connect a Speech recognizer: {e}")
+                    await asyncio.sleep(RETRY_SECONDS)
+                    break
+                self._ready.append(entry)
+
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.idle_seconds / 2)
+            except asyncio.TimeoutError:
+                pass
+
+    async def lease(self):
+        """(recognizer, push stream) for one recording: pre-connected if one is ready, else built now on the executor."""
+        self._prune()
+        self._last_used = time.monotonic()
+        self._wake.set()
+        if self._ready:
+            entry = self._ready.pop()
+            self.stats["leased"] += 1
+        else:
+            entry = await asyncio.get_running_loop().run_in_executor(self.executor, self._build, False)
+            self.stats["built_on_demand"] += 1
+        return entry.recognizer, entry.stream
+
+    async def close(self):
+        # wait_for can swallow a cancel that lands as the wake fires, so the loop also checks the flag
+        self._closed = True
+        self._wake.set()
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        for entry in self._ready:
+            entry.discard()
+        self._ready = []
+
+    def snapshot(self) -> dict:
+        return {**self.stats, "ready": len(self._ready), "size": self.size, "idle_seconds": self.idle_seconds}
@@ -1,15 +1,66 @@
 #!/usr/bin/env python3
 """
 Start the Still API server.
+
+    python start_server.py                  # development: one process, auto-reload, localhost
+    python start_server.py --production     # several workers on 0.0.0.0:$PORT
+
+Production mode runs WEB_CONCURRENCY worker processes (default: 2) behind one listening
+socket. The default is deliberately small: in a container os.cpu_count() is the host's CPU
+count, and every worker loads the SDKs and holds its own Speech and OpenAI connections.
+The launcher also hosts the shared state server (shared_state.py), so caches, idempotency
+keys and upload sessions work the same whichever worker a request hits.
 """
 
-import uvicorn
+import argparse
+import importlib.util
 import os
+import tempfile
+import uvicorn
 
-if __name__ == "__main__":
+DEFAULT_WORKERS = 2
+
+
+def _available(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+def production(host: str, port: int, workers: int):
+    from shared_state import SOCKET_ENV, StateServer
+
+    # Workers inherit these: where the shared state lives, one digest key for all of them,
+    # and how many there are (admission limits are split between them)
+    os.environ.setdefault("STILL_DIGEST_KEY", os.urandom(32).hex())
+    os.environ["STILL_WORKERS"] = str(workers)
+    if workers > 1:
+        os.environ[SOCKET_ENV] = os.path.join(tempfile.mkdtemp(prefix="still_"), "state.sock")
+        StateServer(os.environ[SOCKET_ENV]).start_in_thread()
+
+    loop = "uvloop" if _available("uvloop") else "asyncio"
+    http = "httptools" if _available("httptools") else "h11"
+    print(f"🕯️  Starting Still API: {workers} workers on {host}:{port} ({loop}, {http})")
+
+    uvicorn.run(
+        "main:app",
+        host=host,
+        port=port,
+        workers=workers,
+        loop=loop,
+        http=http,
+        # Outlive the platform proxy's idle timeout so it, not us, closes idle connections
+        timeout_keep_alive=int(os.getenv("KEEP_ALIVE_SECONDS", "75")),
+        backlog=int(os.getenv("LISTEN_BACKLOG", "2048")),
+        timeout_graceful_shutdown=int(os.getenv("GRACEFUL_SHUTDOWN_SECONDS", "20")),
+        proxy_headers=True,
+        forwarded_allow_ips="*",
+        log_level="info",
+    )
+
+
+def development():
     print("🕯️  Starting Still API server...")
     print("The ritual backend is awakening...")
-    
+
     # Start the server
     uvicorn.run(
         "main:app",
@@ -17,4 +68,18 @@ if __name__ == "__main__":
         port=8000,
         reload=True,
         log_level="info"
-    )
\ No newline at end of file
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Start the Still API server.")
+    parser.add_argument("--production", action="store_true", help="multi-worker production mode")
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY") or DEFAULT_WORKERS))
+    args = parser.parse_args()
+
+    if args.production:
+        production(args.host, args.port, max(1, args.workers))
+    else:
+        development()
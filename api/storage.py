@@ -1,22 +1,231 @@
 import os
-from azure.storage.blob import BlobServiceClient
+import base64
+import asyncio
+from abc import ABC, abstractmethod
 from datetime import datetime, timedelta
 
 # Initialize only if connection string is present
 CONNECTION_STRING = os.getenv("AZURE_STORAGE_CONNECTION_STRING")
 
+# Uploads are cut into blocks of this size, and up to UPLOAD_CONCURRENCY are staged at once
+BLOCK_BYTES = int(os.getenv("STORAGE_BLOCK_BYTES", str(4 * 1024 * 1024)))
+UPLOAD_CONCURRENCY = int(os.getenv("STORAGE_UPLOAD_CONCURRENCY", "4"))
+MOCK_DIR = "tmp"
+
+
+class BlockUpload(ABC):
+    """
+    One blob written while its data is still arriving. write() cuts the stream into blocks
+    and stages them in parallel, at most `concurrency` at a time; commit() waits for the rest
+    and publishes the blob. write() waits while every slot is busy, so an upload holds about
+    `concurrency` blocks in memory however large it is.
+    """
+
+    def __init__(self, block_bytes: int = BLOCK_BYTES, concurrency: int = UPLOAD_CONCURRENCY):
+        self.block_bytes = block_bytes
+        self.size = 0
+        self._pending = bytearray()
+        self._block_ids = []
+        self._tasks = []
+        self._slots = asyncio.Semaphore(concurrency)
+
+    async def write(self, data: bytes):
+        self._pending += data
+        while len(self._pending) >= self.block_bytes:
+            block = bytes(self._pending[:self.block_bytes])
+            del self._pending[:self.block_bytes]
+            await self._stage(block)
+
+    async def _stage(self, block: bytes):
+        # A failed block fails the upload now rather than after the whole stream is read
+        for task in self._tasks:
+            if task.done() and not task.cancelled() and task.exception() is not None:
+                raise task.exception()
+        await self._slots.acquire()
+        # Block ids must all have the same length within a blob
+        block_id = base64.b64encode(f"{len(self._block_ids):08d}".encode()).decode()
+        self._block_ids.append(block_id)
+        offset, self.size = self.size, self.size + len(block)
+        self._tasks.append(asyncio.create_task(self._run_stage(block_id, offset, block)))
+
+    async def _run_stage(self, block_id: str, offset: int, block: bytes):
+        try:
+            await self.stage_block(block_id, offset, block)
+        finally:
+            self._slots.release()
+
+    async def commit(self) -> str:
+        """Stage what is left, wait for every block, then publish. Returns the blob's URL or path."""
+        if self._pending:
+            block, self._pending = bytes(self._pending), bytearray()
+            await self._stage(block)
+        await asyncio.gather(*self._tasks)
+        return await self.commit_blocks(self._block_ids)
+
+    async def abort(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        await self.discard()
+
+    @abstractmethod
+    async def stage_block(self, block_id: str, offset: int, block: bytes):
+        """Store one block; blocks may arrive in any order and in parallel."""
+
+    @abstractmethod
+    async def commit_blocks(self, block_ids: list) -> str:
+        """Publish the blob from its blocks, in order. Returns its URL or path."""
+
+    async def discard(self):
+        pass
+
+
+class _AzureBlockUpload(BlockUpload):
+    def __init__(self, blob_client):
+        super().__init__()
+        self.blob = blob_client
+
+    async def stage_block(self, block_id, offset, block):
+        await self.blob.stage_block(block_id, block, length=len(block))
+
+    async def commit_blocks(self, block_ids):
+        from azure.storage.blob import BlobBlock
+        await self.blob.commit_block_list([BlobBlock(block_id=block_id) for block_id in block_ids])
+        return self.blob.url
+
+    # An aborted upload needs no cleanup: the service drops uncommitted blocks after a week
+
+
+class _FileBlockUpload(BlockUpload):
+    """Mock backend: blocks are written in parallel at their offsets in a .part file, renamed into place on commit."""
+
+    def __init__(self, path: str):
+        super().__init__()
+        self.path = path
+        self._part = path + ".part"
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._fd = os.open(self._part, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+
+    async def stage_block(self, block_id, offset, block):
+        await asyncio.to_thread(os.pwrite, self._fd, block, offset)
+
+    async def commit_blocks(self, block_ids):
+        os.close(self._fd)
+        self._fd = None
+        os.replace(self._part, self.path)
+        return self.path
+
+    async def discard(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+            os.remove(self._part)
+
+
+class TemporaryRecording:
+    """
+    A recording held in storage only while it is processed (context.txt §4.3/4.4). Chunks are
+    written as they arrive, finish() publishes the blob once the recording is complete, and
+    delete() removes it, or drops the uncommitted blocks, when processing is over; the
+    container's lifecycle rule expires anything a crash leaves behind. Storage errors are
+    logged, never raised: keeping the audio must not fail a reflection.
+    """
+
+    def __init__(self, service: "StorageService", filename: str):
+        self.service = service
+        self.filename = filename
+        self.location = None
+        self._upload = service.open_upload(filename)
+        self._storing = None
+        self._closed = False
+
+    async def write(self, chunk: bytes):
+        if self._closed or self._storing is not None:
+            return
+        try:
+            await self._upload.write(chunk)
+        except Exception as e:
+            await self._fail(e)
+
+    def store(self, chunks):
+        """Write an already buffered recording in the background, then publish it."""
+        self._storing = asyncio.create_task(self._store(chunks))
+
+    def finish(self):
+        """The recording is complete: publish it in the background."""
+        if self._storing is None:
+            self._storing = asyncio.create_task(self._commit())
+
+    async def _store(self, chunks):
+        for chunk in chunks:
+            if self._closed:
+                return
+            try:
+                await self._upload.write(chunk)
+            except Exception as e:
+                await self._fail(e)
+                return
+            await asyncio.sleep(0)  # let other requests run between chunks
+        await self._commit()
+
+    async def _commit(self):
+        if self._closed:
+            return
+        try:
+            self.location = await self._upload.commit()
+        except Exception as e:
+            await self._fail(e)
+            return
+        self.service.stats["uploaded"] += 1
+        self.service.stats["bytes"] += self._upload.size
+        print(f"☁️ Recording stored: {self.location}")
+
+    async def _fail(self, error: Exception):
+        print(f"❌ Recording upload failed: {error}")
+        self.service.stats["failed"] += 1
+        self._closed = True
+        await self._upload.abort()
+
+    async def delete(self):
+        """Remove the recording, waiting for a publish still in progress. Safe to call twice."""
+        if self._storing is not None:
+            await asyncio.gather(self._storing, return_exceptions=True)
+        if self.location is not None:
+            location, self.location = self.location, None
+            await self.service.delete_audio(self.filename)
+            self.service.stats["deleted"] += 1
+            print(f"🗑️ Stored recording deleted: {location}")
+        elif not self._closed:
+            self._closed = True
+            await self._upload.abort()
+        self._closed = True
+
+    def delete_later(self):
+        """delete() from synchronous cleanup code, such as an abandoned upload being swept."""
+        task = asyncio.create_task(self.delete())
+        self.service._deleting.add(task)
+        task.add_done_callback(self.service._deleting.discard)
+
+
 class StorageService:
     def __init__(self):
+        self._async_client = None
+        self._deleting = set()  # background delete() tasks, kept referenced until they finish
+        self.stats = {"uploaded": 0, "bytes": 0, "failed": 0, "deleted": 0}
         if not CONNECTION_STRING:
             print("WARNING: Storage connection string missing. Using mock storage.")
             self.service_client = None
             self.container_name = "still-temp-audio"
         else:
+            # Imported here: the SDK is slow to load and only needed with a connection string
+            from azure.storage.blob import BlobServiceClient
             self.service_client = BlobServiceClient.from_connection_string(CONNECTION_STRING)
             self.container_name = "still-temp-audio"
-            self._ensure_container()
 
-    def _ensure_container(self):
+    def ensure_container(self):
+        """Create the container if needed. A blocking network call, run once in the background at startup."""
+        if not self.service_client:
+            return
         try:
             container_client = self.service_client.get_container_client(self.container_name)
             if not container_client.exists():
@@ -24,30 +233,71 @@ class StorageService:
         except Exception as e:
             print(f"Container setup error: {e}")
 
-    async def upload_audio(self, file_data: bytes, filename: str) -> str:
-        """Uploads audio and returns a temporary SAS URL or Path."""
+    def _async_blob(self, filename: str):
+        """Blob client for the async SDK (needs aiohttp), whose session is opened on first use."""
+        if self._async_client is None:
+            from azure.storage.blob.aio import BlobServiceClient as AsyncBlobServiceClient
+            self._async_client = AsyncBlobServiceClient.from_connection_string(CONNECTION_STRING)
+        return self._async_client.get_blob_client(container=self.container_name, blob=filename)
+
+    def open_upload(self, filename: str) -> BlockUpload:
+        """A BlockUpload to write() into as data arrives, then commit() (or abort())."""
         if not self.service_client:
-            # Mock behavior meant for local usage if keys aren't set
-            mock_path = f"tmp/{filename}"
-            os.makedirs("tmp", exist_ok=True)
-            with open(mock_path, "wb") as f:
-                f.write(file_data)
-            return mock_path
+            return _FileBlockUpload(os.path.join(MOCK_DIR, filename))
+        return _AzureBlockUpload(self._async_blob(filename))
 
-        blob_client = self.service_client.get_blob_client(container=self.container_name, blob=filename)
-        blob_client.upload_blob(file_data, overwrite=True)
-        return blob_client.url
+    async def upload_stream(self, chunks, filename: str) -> str:
+        """Upload from an iterable or async iterable of bytes without collecting it first. Returns the URL or path."""
+        upload = self.open_upload(filename)
+        try:
+            if hasattr(chunks, "__aiter__"):
+                async for chunk in chunks:
+                    await upload.write(chunk)
+            else:
+                for chunk in chunks:
+                    await upload.write(chunk)
+                    await asyncio.sleep(0)  # let other requests run between chunks
+            location = await upload.commit()
+        except BaseException:
+            self.stats["failed"] += 1
+            await upload.abort()
+            raise
+        self.stats["uploaded"] += 1
+        self.stats["bytes"] += upload.size
+        return location
+
+    def open_recording(self, filename: str) -> TemporaryRecording:
+        """A TemporaryRecording to write() into as the audio arrives (or store() if already buffered)."""
+        return TemporaryRecording(self, filename)
+
+    async def upload_audio(self, file_data: bytes, filename: str) -> str:
+        """Uploads audio and returns a temporary SAS URL or Path."""
+        return await self.upload_stream([file_data], filename)
 
     async def delete_audio(self, filename: str):
         """Immediately delete the audio blob."""
         if not self.service_client:
-            mock_path = f"tmp/{filename}"
+            mock_path = os.path.join(MOCK_DIR, filename)
             if os.path.exists(mock_path):
                 os.remove(mock_path)
             return
 
         try:
-            blob_client = self.service_client.get_blob_client(container=self.container_name, blob=filename)
-            blob_client.delete_blob()
+            await self._async_blob(filename).delete_blob()
         except Exception as e:
             print(f"Deletion error for {filename}: {e}")
+
+    async def close(self):
+        if self._deleting:
+            await asyncio.gather(*self._deleting, return_exceptions=True)
+        if self._async_client is not None:
+            await self._async_client.close()
+            self._async_client = None
+
+    def snapshot(self) -> dict:
+        return {
+            **self.stats,
+            "backend": "azure" if self.service_client else "mock",
+            "block_bytes": BLOCK_BYTES,
+            "concurrency": UPLOAD_CONCURRENCY,
+        }
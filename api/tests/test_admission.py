@@ -0,0 +1,110 @@
+import asyncio
+import pytest
+from admission import AdmissionController, OverloadedError, StageLimiter
+
+
+def test_waiters_are_admitted_in_order_as_slots_are_released():
+    async def scenario():
+        limiter = StageLimiter("stt", limit=1, max_queue=2, max_wait=5)
+        await limiter.acquire()
+        order = []
+
+        async def wait(name):
+            await limiter.acquire()
+            order.append(name)
+
+        waiters = [asyncio.create_task(wait(name)) for name in ("first", "second")]
+        await asyncio.sleep(0)
+        assert limiter.snapshot()["queue_depth"] == 2
+
+        limiter.release()
+        await asyncio.sleep(0.01)
+        assert order == ["first"]
+        # Handed over: the slot never went back to the pool
+        assert limiter.in_flight == 1
+        assert not limiter.try_acquire()
+
+        limiter.release()
+        await asyncio.gather(*waiters)
+        assert order == ["first", "second"]
+        limiter.release()
+        assert limiter.in_flight == 0
+
+    asyncio.run(scenario())
+
+
+def test_full_queue_is_rejected_at_once():
+    async def scenario():
+        limiter = StageLimiter("llm", limit=1, max_queue=1, max_wait=5)
+        await limiter.acquire()
+        waiter = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        with pytest.raises(OverloadedError) as rejected:
+            await limiter.acquire()
+        assert rejected.value.stage == "llm" and rejected.value.retry_after == 5
+        assert limiter.stats["rejected_queue_full"] == 1
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+
+    asyncio.run(scenario())
+
+
+def test_waiting_past_max_wait_is_overloaded_and_leaves_the_queue():
+    async def scenario():
+        limiter = StageLimiter("transcode", limit=1, max_queue=4, max_wait=0.05)
+        await limiter.acquire()
+        with pytest.raises(OverloadedError):
+            await limiter.acquire()
+        assert limiter.stats["rejected_timeout"] == 1
+        assert limiter.snapshot()["queue_depth"] == 0
+        limiter.release()
+        assert limiter.in_flight == 0
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_waiter_never_leaks_a_handed_over_slot():
+    async def scenario():
+        limiter = StageLimiter("stt", limit=1, max_queue=4, max_wait=5)
+        await limiter.acquire()
+        first = asyncio.create_task(limiter.acquire())
+        second = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+
+        limiter.release()  # hands the slot to first...
+        first.cancel()  # ...which gives up before it runs
+        [outcome] = await asyncio.gather(first, return_exceptions=True)
+        if outcome is None:
+            # Admitted before the cancellation landed: the slot is first's to release
+            limiter.release()
+        await asyncio.wait_for(second, 1)
+        assert limiter.in_flight == 1
+
+    asyncio.run(scenario())
+
+
+def test_try_acquire_never_jumps_the_queue():
+    async def scenario():
+        limiter = StageLimiter("live", limit=2, max_queue=4, max_wait=5)
+        assert limiter.try_acquire() and limiter.try_acquire()
+        assert not limiter.try_acquire()
+        limiter.release()
+        assert limiter.try_acquire()
+
+    asyncio.run(scenario())
+
+
+def test_limits_are_split_across_workers(monkeypatch):
+    monkeypatch.delenv("FFMPEG_MAX_PROCESSES", raising=False)
+    monkeypatch.setenv("STILL_WORKERS", "2")
+    monkeypatch.setattr("os.cpu_count", lambda: 64)
+    stages = AdmissionController().stages
+    # The ffmpeg cap doesn't follow the host's CPU count
+    assert stages["transcode"].limit == 2
+    assert stages["stt"].limit == 4
+
+
+def test_a_share_is_never_zero(monkeypatch):
+    monkeypatch.setenv("FFMPEG_MAX_PROCESSES", "1")
+    monkeypatch.setenv("STILL_WORKERS", "4")
+    assert AdmissionController().stages["transcode"].limit == 1
@@ -0,0 +1,105 @@
+import asyncio
+import pytest
+import circuit_breaker
+from circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(circuit_breaker.time, "monotonic", clock.monotonic)
+    return clock
+
+
+def breaker(monkeypatch) -> CircuitBreaker:
+    monkeypatch.setenv("BREAKER_MIN_CALLS", "4")
+    monkeypatch.setenv("BREAKER_FAILURE_RATE", "0.5")
+    monkeypatch.setenv("BREAKER_OPEN_SECONDS", "20")
+    monkeypatch.setenv("BREAKER_SLOW_CALL_SECONDS", "5")
+    return CircuitBreaker("llm")
+
+
+def test_opens_once_enough_recent_calls_are_bad(monkeypatch, clock):
+    cb = breaker(monkeypatch)
+    for ok in (True, False, True):
+        cb.record(ok, 0.1)
+    assert cb.state == CLOSED  # too few calls to judge
+    cb.record(True, 6.0)  # slow counts as bad: 2 of 4
+    assert cb.state == OPEN
+    assert not cb.allow() and cb.refuses()
+
+
+def test_old_failures_leave_the_window(monkeypatch, clock):
+    cb = breaker(monkeypatch)
+    for _ in range(3):
+        cb.record(False, 0.1)
+    clock.now += cb.window_seconds + 1
+    cb.record(False, 0.1)
+    assert cb.state == CLOSED
+
+
+def test_half_open_trial_closes_or_reopens(monkeypatch, clock):
+    cb = breaker(monkeypatch)
+    for _ in range(4):
+        cb.record(False, 0.1)
+    assert cb.state == OPEN
+
+    clock.now += 21
+    assert cb.allow()
+    assert cb.state == HALF_OPEN
+    assert not cb.allow()  # one trial at a time
+    cb.record(False, 0.1)
+    assert cb.state == OPEN and cb.stats["opened"] == 2
+
+    clock.now += 21
+    assert cb.allow()
+    cb.record(True, 0.1)
+    assert cb.state == CLOSED
+    assert cb.snapshot()["recent_calls"] == 0
+
+
+def test_guard_records_failures_and_refuses_when_open(monkeypatch, clock):
+    cb = breaker(monkeypatch)
+
+    async def call(error=None):
+        async with cb.guard(is_failure=lambda e: not isinstance(e, ValueError)):
+            if error:
+                raise error
+
+    async def scenario():
+        for _ in range(4):
+            with pytest.raises(ValueError):
+                await call(ValueError("bad request"))
+        assert cb.state == CLOSED  # the provider answered: not its failure
+        for _ in range(4):
+            with pytest.raises(RuntimeError):
+                await call(RuntimeError("503"))
+        assert cb.state == OPEN
+        with pytest.raises(CircuitOpenError):
+            await call()
+
+    asyncio.run(scenario())
+
+
+def test_abandoned_trial_frees_the_half_open_slot(monkeypatch, clock):
+    cb = breaker(monkeypatch)
+    for _ in range(4):
+        cb.record(False, 0.1)
+    clock.now += 21
+
+    async def abandoned():
+        async with cb.guard():
+            raise asyncio.CancelledError
+
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(abandoned())
+    assert cb.state == HALF_OPEN
+    assert cb.allow()
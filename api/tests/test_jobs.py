@@ -0,0 +1,84 @@
+import asyncio
+import pytest
+from admission import OverloadedError
+from jobs import DONE, FAILED, QUEUED, JobQueue
+from shared_state import SharedState
+
+
+async def reflection():
+    await asyncio.sleep(0.01)
+    yield "reflection", {"text": "Still."}
+    yield "done", {"reflection": "Still."}
+
+
+async def failure():
+    yield "error", {"detail": "The silence was too heavy."}
+
+
+def queue(monkeypatch, **env) -> JobQueue:
+    for name, value in env.items():
+        monkeypatch.setenv(name, value)
+    return JobQueue(SharedState())  # not connected: a single worker's local state
+
+
+def test_job_runs_and_keeps_its_events(monkeypatch):
+    async def scenario():
+        jobs = queue(monkeypatch, JOB_WORKERS="1")
+        await jobs.start()
+        job_id, job = await jobs.submit("key:a", reflection)
+        events = [event async for event in job.follow()]
+        await jobs.stop()
+        return job, events
+
+    job, events = asyncio.run(scenario())
+    assert job.status == DONE and job.result == {"reflection": "Still."}
+    assert [event for event, _ in events] == ["reflection", "done"]
+
+
+def test_failed_job_frees_its_key(monkeypatch):
+    async def scenario():
+        jobs = queue(monkeypatch, JOB_WORKERS="1")
+        await jobs.start()
+        _, job = await jobs.submit("key:a", failure)
+        await job.wait(1)
+        await asyncio.sleep(0.01)  # the worker settles the key after the run
+        retry_id, retry = await jobs.submit("key:a", reflection)
+        await jobs.stop()
+        return job, retry
+
+    job, retry = asyncio.run(scenario())
+    assert job.status == FAILED and job.error == {"detail": "The silence was too heavy."}
+    assert retry is not None and retry.id != job.id
+
+
+def test_retry_joins_the_accepted_job_even_when_the_queue_is_full(monkeypatch):
+    async def scenario():
+        jobs = queue(monkeypatch, JOB_WORKERS="0", JOB_QUEUE_MAX="1")  # everything stays queued
+        await jobs.start()
+        job_id, job = await jobs.submit("key:a", reflection)
+        assert job.status == QUEUED
+
+        retry_id, retry = await jobs.submit("key:a", reflection)
+        assert (retry_id, retry) == (job_id, None)
+        with pytest.raises(OverloadedError):
+            await jobs.submit("key:b", reflection)
+        return jobs
+
+    jobs = asyncio.run(scenario())
+    assert jobs.stats["deduplicated"] == 1 and jobs.stats["rejected"] == 1
+
+
+def test_queued_job_dropped_at_shutdown(monkeypatch):
+    discarded = []
+
+    async def scenario():
+        jobs = queue(monkeypatch, JOB_WORKERS="0")
+        await jobs.start()
+        _, job = await jobs.submit("key:a", reflection, discard=lambda: discarded.append(True))
+        await jobs.stop()
+        return job, [event async for event in job.follow()]
+
+    job, events = asyncio.run(scenario())
+    assert discarded == [True]
+    assert job.status == FAILED
+    assert events == [("error", {"detail": "The server restarted. Please try again."})]
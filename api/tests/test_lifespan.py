@@ -0,0 +1,21 @@
+import asyncio
+from fastapi.testclient import TestClient
+
+import main
+
+
+def test_shutdown_cancels_a_pending_container_setup(monkeypatch, tmp_path):
+    monkeypatch.setattr(main.theme_counters, "path", str(tmp_path / "theme_counts.sqlite3"))
+    started = []
+
+    async def slow_warm_up():
+        main.container_task = asyncio.create_task(asyncio.sleep(60))
+        started.append(main.container_task)
+
+    monkeypatch.setattr(main, "_warm_up", slow_warm_up)
+    monkeypatch.setattr(main, "container_task", None)
+    with TestClient(main.app):
+        pass
+
+    [task] = started
+    assert task.cancelled()
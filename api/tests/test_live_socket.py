@@ -0,0 +1,51 @@
+import pytest
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+import main
+from audio_buffer import AudioBuffer
+
+
+class FakeLive:
+    def __init__(self):
+        self.audio = AudioBuffer()
+        self.archive = None
+        self.closed = False
+
+    async def write(self, chunk: bytes):
+        self.audio.write(chunk)
+
+    def close(self):
+        self.closed = True
+        self.audio.close()
+
+
+class FakeTranscriber:
+    def __init__(self):
+        self.sessions = []
+
+    async def start_live(self, filename: str, content_type: str):
+        self.sessions.append(FakeLive())
+        return self.sessions[-1]
+
+
+async def ready():
+    pass
+
+
+def test_recording_over_the_cap_is_closed_with_1009(monkeypatch):
+    transcriber = FakeTranscriber()
+    monkeypatch.setattr(main, "services_ready", ready)
+    monkeypatch.setattr(main, "transcriber_service", transcriber)
+    monkeypatch.setattr(main.upload_store, "max_bytes", 10)
+
+    with TestClient(main.app).websocket_connect("/ws/process-audio") as ws:
+        ws.send_bytes(b"x" * 6)
+        ws.send_bytes(b"x" * 6)
+        with pytest.raises(WebSocketDisconnect) as closed:
+            ws.receive_json()
+    assert closed.value.code == 1009
+
+    [live] = transcriber.sessions
+    assert live.audio.size == 6  # the frame over the cap was never buffered
+    assert live.closed
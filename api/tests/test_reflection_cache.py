@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+import reflection_cache
+from reflection_cache import NUM_PERM, ReflectionCache
+
+RESULT = {"reflection": "A quiet moment.", "flashcard": "Breathe."}
+
+
+def test_same_words_hit_despite_punctuation_and_case():
+    cache = ReflectionCache()
+    cache.put("I just need a moment to breathe.", RESULT)
+    assert cache.get("i just need a moment to breathe") == RESULT
+    assert cache.stats["hits"] == 1
+
+
+def test_negation_never_served_the_positive_reflection():
+    cache = ReflectionCache()
+    cache.put("I want to keep going with my life", RESULT)
+    assert cache.get("I don't want to keep going with my life") is None
+    assert cache.get("I do not want to keep going with my life") is None
+    assert cache.get("I never want to keep going with my life") is None
+
+
+def test_positive_never_served_the_negated_reflection():
+    cache = ReflectionCache()
+    cache.put("I don't want to keep going with my life", RESULT)
+    assert cache.get("I want to keep going with my life") is None
+    assert cache.get("I don't want to keep going with my life") == RESULT
+
+
+SPOKEN = (
+    "Something's been on my mind today and I just need a moment to breathe. I keep thinking "
+    "about work and whether I am doing enough, and I feel tired but I also feel a little "
+    "hopeful about tomorrow"
+)
+
+
+@pytest.fixture
+def fixed_permutations(monkeypatch):
+    # The permutations are random per process; fix them so the estimates are repeatable
+    rng = np.random.default_rng(0)
+    monkeypatch.setattr(reflection_cache, "_A", rng.integers(1, reflection_cache._PRIME, size=NUM_PERM, dtype=np.uint64))
+    monkeypatch.setattr(reflection_cache, "_B", rng.integers(0, reflection_cache._PRIME, size=NUM_PERM, dtype=np.uint64))
+
+
+@pytest.mark.parametrize("variant", [
+    SPOKEN.replace("moment", "minute"),
+    "Um, " + SPOKEN,
+    SPOKEN + " now",
+    SPOKEN.replace("Something's", "Something has"),
+    SPOKEN.replace("I am", "I'm"),
+    SPOKEN.replace("I feel tired", "I feel so tired"),
+])
+def test_speech_to_text_variants_hit(fixed_permutations, variant):
+    cache = ReflectionCache()
+    cache.put(SPOKEN, RESULT)
+    assert cache.get(variant) == RESULT
+
+
+def test_different_transcript_is_a_miss(fixed_permutations):
+    cache = ReflectionCache()
+    cache.put(SPOKEN, RESULT)
+    assert cache.get("I had a long week at work and I am angry at how my manager spoke to me today") is None
+    assert cache.get("I feel tired after a long day at work") is None
+
+
+def test_long_transcripts_are_not_cached(monkeypatch):
+    monkeypatch.setenv("REFLECT_CACHE_MAX_WORDS", "5")
+    cache = ReflectionCache()
+    text = "one two three four five six"
+    cache.put(text, RESULT)
+    assert cache.get(text) is None
+    assert cache.stats["skipped_long"] == 1
+
+
+def test_expired_entries_are_dropped(monkeypatch):
+    monkeypatch.setenv("REFLECT_CACHE_TTL", "-1")
+    cache = ReflectionCache()
+    cache.put("I just need a moment", RESULT)
+    assert cache.get("I just need a moment") is None
+    assert cache.snapshot()["entries"] == 0
@@ -0,0 +1,62 @@
+import gzip
+import json
+from reflection_pool import GENERAL_THEME, ReflectionPool, length_bucket
+
+
+def entry(text: str, theme: str | None, length: str) -> dict:
+    return {
+        "reflection": text,
+        "flashcard": {"title": text, "bullets": ["One", "Two", "Three"]},
+        "confidence": 0.5,
+        "theme": theme,
+        "length": length,
+    }
+
+
+def pool(tmp_path, entries: list) -> ReflectionPool:
+    path = tmp_path / "pool.json.gz"
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        json.dump({"entries": entries}, f)
+    return ReflectionPool(str(path))
+
+
+def test_length_buckets():
+    assert [length_bucket(n) for n in (0, 25, 26, 90, 91, 1000)] == [
+        "short", "short", "medium", "medium", "long", "long",
+    ]
+
+
+def test_pick_prefers_the_matching_theme_and_length(tmp_path):
+    reflections = pool(tmp_path, [
+        entry("Tired, short.", "exhaustion", "short"),
+        entry("Tired, long.", "exhaustion", "long"),
+        entry("Quiet.", GENERAL_THEME, "short"),
+    ])
+    picked = reflections.pick("I am so tired and exhausted")
+    assert picked["reflection"] == "Tired, short."
+    assert reflections.is_pooled(picked)
+    assert "theme" not in picked  # only the reflection itself is served
+
+
+def test_pick_falls_back_to_general_then_anything(tmp_path):
+    reflections = pool(tmp_path, [entry("Quiet.", GENERAL_THEME, "short"), entry("Lonely.", "loneliness", "long")])
+    assert reflections.pick("The weather is nice")["reflection"] == "Quiet."
+    assert reflections.pick("")["reflection"] == "Quiet."
+
+    only_theme = pool(tmp_path, [entry("Lonely.", "loneliness", "long")])
+    assert only_theme.pick("I have been so busy with my exams")["reflection"] == "Lonely."
+
+
+def test_pick_rotates_through_a_cell(tmp_path):
+    reflections = pool(tmp_path, [entry("A.", GENERAL_THEME, "short"), entry("B.", GENERAL_THEME, "short")])
+    picks = {reflections.pick("Nothing much")["reflection"] for _ in range(4)}
+    assert picks == {"A.", "B."}
+
+
+def test_invalid_entries_and_missing_file_are_skipped(tmp_path):
+    reflections = pool(tmp_path, [entry("", "loss", "short"), {"reflection": "No card"}, entry("Ok.", "loss", "short")])
+    assert len(reflections) == 1
+
+    missing = ReflectionPool(str(tmp_path / "missing.json.gz"))
+    assert len(missing) == 0 and missing.pick("anything") is None
+    assert not missing.is_pooled({"reflection": "Ok."})
@@ -0,0 +1,46 @@
+import json
+from reflection_schema import DEFAULT_FLASHCARD, Repaired, parse_reflection
+
+VALID = {
+    "reflection": "You have carried this for a long time. It is heavy. You are still here.",
+    "flashcard": {"title": "Carried", "bullets": ["Heavy", "Long", "Still here"]},
+    "confidence": 0.8,
+}
+
+
+def test_valid_json_parses_as_sent():
+    result = parse_reflection(json.dumps(VALID))
+    assert result == VALID
+    assert not isinstance(result, Repaired)
+
+
+def test_fenced_json_with_trailing_comma_is_repaired():
+    content = "```json\n" + json.dumps(VALID)[:-1] + ",}\n```"
+    result = parse_reflection(content)
+    assert isinstance(result, Repaired)
+    assert result["reflection"] == VALID["reflection"]
+
+
+def test_missing_flashcard_gets_default_and_confidence_is_clamped():
+    result = parse_reflection('{"reflection": "Heard.", "confidence": 7}')
+    assert result["flashcard"] == DEFAULT_FLASHCARD
+    assert result["confidence"] == 1.0
+
+
+def test_truncated_inside_flashcard_keeps_the_complete_reflection():
+    content = json.dumps(VALID)
+    cut = content[:content.index('"Long"') + 3]  # mid-way through a bullet
+    result = parse_reflection(cut)
+    assert isinstance(result, Repaired)
+    assert result["reflection"] == VALID["reflection"]
+    assert result["flashcard"]["title"] == "Carried"
+
+
+def test_truncated_inside_reflection_is_a_failure():
+    content = json.dumps(VALID)
+    assert parse_reflection(content[:content.index("It is heavy")]) is None
+    assert parse_reflection('{"reflection": "You have carried this\\') is None
+
+
+def test_no_json_at_all_is_a_failure():
+    assert parse_reflection("I'm sorry, I can't help with that.") is None
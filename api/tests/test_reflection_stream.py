@@ -0,0 +1,54 @@
+import json
+import pytest
+from reflection_schema import Repaired
+from reflection_stream import ReflectionStreamParser
+
+REFLECTION = 'She said "stay".\nTab\there, a slash / and \\ backslash, café, and a smile 😊 at the end.'
+FLASHCARD = {"title": "Stay", "bullets": ["Heard", "Held", "Here"]}
+
+
+def feed(content: str, size: int) -> tuple[ReflectionStreamParser, list]:
+    parser = ReflectionStreamParser()
+    events = []
+    for start in range(0, len(content), size):
+        events += parser.feed(content[start:start + size])
+    return parser, events
+
+
+def streamed(events: list) -> str:
+    return "".join(data for event, data in events if event == "reflection")
+
+
+@pytest.mark.parametrize("size", [1, 3, 7, 10_000])
+def test_reflection_and_flashcard_at_any_chunk_size(size):
+    # ensure_ascii turns é into é and the emoji into a surrogate pair
+    content = json.dumps({"reflection": REFLECTION, "flashcard": FLASHCARD, "confidence": 0.9})
+    parser, events = feed(content, size)
+    assert streamed(events) == REFLECTION
+    assert [data for event, data in events if event == "flashcard"] == [FLASHCARD]
+    assert parser.reflection_complete
+
+
+@pytest.mark.parametrize("size", [1, 5, 10_000])
+def test_flashcard_first_and_fenced(size):
+    body = json.dumps({"confidence": 0.5, "flashcard": FLASHCARD, "reflection": REFLECTION}, ensure_ascii=False)
+    parser, events = feed("```json\n" + body + "\n```", size)
+    assert [event for event, _ in events][0] == "flashcard"
+    assert streamed(events) == REFLECTION
+
+
+def test_keys_inside_the_flashcard_are_not_the_reflection():
+    content = json.dumps({"flashcard": {"reflection": "not this", "title": "T", "bullets": []}, "reflection": "This."})
+    _, events = feed(content, 2)
+    assert streamed(events) == "This."
+
+
+def test_result_needs_a_closed_reflection():
+    content = json.dumps({"flashcard": FLASHCARD, "reflection": REFLECTION})
+    parser, _ = feed(content[:content.index("backslash")], 4)
+    assert parser.result() is None
+
+    parser, _ = feed(content[:-1], 4)  # cut before the final brace
+    result = parser.result()
+    assert isinstance(result, Repaired)
+    assert result["reflection"] == REFLECTION and result["flashcard"] == FLASHCARD
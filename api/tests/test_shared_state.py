@@ -0,0 +1,88 @@
+import asyncio
+import pytest
+
+import shared_state
+from shared_state import SOCKET_ENV, SharedState, SharedStateError, StateServer
+
+
+def test_local_store_without_a_server(monkeypatch):
+    monkeypatch.delenv(SOCKET_ENV, raising=False)
+
+    async def scenario():
+        state = SharedState()
+        await state.connect()
+        assert await state.add("job:k", "first") == "first"
+        assert await state.add("job:k", "second") == "first"
+        assert await state.incr("n") == 1 and await state.incr("n", 2) == 3
+        await state.set("short", 1, ttl=0.01)
+        await asyncio.sleep(0.02)
+        assert await state.get("short") is None
+        await state.delete("job:k")
+        assert await state.get("job:k") is None
+        return state
+
+    state = asyncio.run(scenario())
+    assert not state.shared and state.snapshot()["mode"] == "local"
+
+
+def workers(monkeypatch, tmp_path):
+    path = str(tmp_path / "state.sock")
+    monkeypatch.setenv(SOCKET_ENV, path)
+    return StateServer(path)
+
+
+def test_workers_share_the_store_and_reach_each_others_objects(monkeypatch, tmp_path):
+    server = workers(monkeypatch, tmp_path)
+
+    async def scenario():
+        await server._listen()
+        a, b = SharedState(), SharedState()
+        await a.connect()
+        await b.connect()
+        assert a.shared and b.shared and a.worker != b.worker
+
+        # Only one worker wins an idempotency key
+        winners = await asyncio.gather(a.add("job:k", a.worker), b.add("job:k", b.worker))
+        assert winners[0] == winners[1]
+
+        async def append(args):
+            return {"size": len(args["chunk"])}
+
+        a.handle("append", append)
+        upload_id = a.new_id()
+        assert not b.is_local(upload_id)
+        assert await b.call(upload_id, "append", {"chunk": b"\x00\xff" * 10}) == {"size": 20}
+        with pytest.raises(SharedStateError):
+            await b.call("w99.gone", "append", {"chunk": b""})
+
+        for state in (a, b):
+            await state.close()
+        return a, b
+
+    a, b = asyncio.run(scenario())
+    assert a.stats["forwarded_in"] == 1 and b.stats["forwarded_out"] == 2
+
+
+def test_lost_connection_reconnects_under_the_same_worker_id(monkeypatch, tmp_path):
+    monkeypatch.setattr(shared_state, "RECONNECT_SECONDS", 0.01)
+    server = workers(monkeypatch, tmp_path)
+
+    async def scenario():
+        await server._listen()
+        state = SharedState()
+        await state.connect()
+        worker = state.worker
+        await state.set("k", "v")
+
+        server._workers[worker].close()
+        for _ in range(100):
+            if state.stats["reconnects"]:
+                break
+            await asyncio.sleep(0.01)
+        value = await state.get("k")
+        await state.close()
+        return state, worker, value
+
+    state, worker, value = asyncio.run(scenario())
+    assert state.stats["reconnects"] == 1
+    assert state.worker == worker and value == "v"
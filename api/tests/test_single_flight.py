@@ -0,0 +1,103 @@
+import asyncio
+from single_flight import Flight, SingleFlightCache
+
+
+async def collect(events):
+    return [event async for event in events]
+
+
+def test_concurrent_followers_share_one_run_and_replay_every_event():
+    runs = []
+
+    async def pipeline():
+        runs.append(1)
+        yield "reflection", {"text": "A quiet"}
+        await asyncio.sleep(0.01)
+        yield "reflection", {"text": " moment."}
+        yield "done", {"reflection": "A quiet moment."}
+
+    async def main():
+        cache = SingleFlightCache(ttl=60, max_entries=8)
+        first = cache.follow("k", pipeline)
+        await asyncio.sleep(0.005)  # the second caller joins mid-run
+        second = cache.follow("k", pipeline)
+        a, b = await asyncio.gather(collect(first), collect(second))
+        return cache, a, b
+
+    cache, a, b = asyncio.run(main())
+    assert runs == [1]
+    assert a == b and len(a) == 3 and a[-1][0] == "done"
+    assert cache.stats["joined"] == 1
+
+
+def test_done_result_is_cached_and_replayed_alone():
+    async def pipeline():
+        yield "reflection", {"text": "Hi"}
+        yield "done", {"reflection": "Hi"}
+
+    async def main():
+        cache = SingleFlightCache(ttl=60, max_entries=8)
+        await collect(cache.follow("k", pipeline))
+        await asyncio.sleep(0)  # the flight settles in a done callback
+        return await collect(cache.follow("k", pipeline)), cache
+
+    events, cache = asyncio.run(main())
+    assert events == [("done", {"reflection": "Hi"})]
+    assert cache.stats["hits"] == 1
+
+
+def test_errors_and_uncacheable_results_are_not_kept():
+    async def failing():
+        yield "error", {"detail": "The silence was too heavy."}
+
+    async def fallback():
+        yield "done", {"reflection": "fallback"}
+
+    async def main():
+        cache = SingleFlightCache(ttl=60, max_entries=8)
+        await collect(cache.follow("a", failing))
+        await collect(cache.follow("b", fallback, cacheable=lambda result: False))
+        return cache
+
+    cache = asyncio.run(main())
+    assert cache.peek("a") is None and cache.peek("b") is None
+
+
+def test_followers_before_start_see_the_whole_run():
+    async def pipeline():
+        yield "done", {"reflection": "Late"}
+
+    async def main():
+        flight = Flight()
+        early = asyncio.create_task(collect(flight.follow()))
+        await asyncio.sleep(0.01)
+        assert not early.done()  # nothing to replay until the run starts
+        flight.start(pipeline())
+        flight.start(pipeline())  # only the first start runs
+        return await asyncio.wait_for(early, 1), flight
+
+    events, flight = asyncio.run(main())
+    assert events == [("done", {"reflection": "Late"})]
+    assert flight.result == {"reflection": "Late"} and flight.error is None
+
+
+def test_cancelled_flight_runs_the_pipeline_cleanup():
+    closed = []
+
+    async def pipeline():
+        try:
+            yield "reflection", {"text": "A"}
+            await asyncio.sleep(10)
+        finally:
+            closed.append(True)
+
+    async def main():
+        flight = Flight(pipeline())
+        await asyncio.sleep(0.01)
+        flight.task.cancel()
+        await asyncio.gather(flight.task, return_exceptions=True)
+        return await asyncio.wait_for(collect(flight.follow()), 1)
+
+    events = asyncio.run(main())
+    assert closed == [True]
+    assert events == [("reflection", {"text": "A"})]
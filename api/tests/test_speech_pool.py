@@ -0,0 +1,127 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from speech_pool import SpeechRecognizerPool
+
+
+class Signal:
+    def __init__(self):
+        self.handlers = []
+
+    def connect(self, handler):
+        self.handlers.append(handler)
+
+
+class FakeConnection:
+    opened = []
+
+    def __init__(self, recognizer):
+        self.recognizer = recognizer
+        self.disconnected = Signal()
+        self.closed = False
+
+    @classmethod
+    def from_recognizer(cls, recognizer):
+        return cls(recognizer)
+
+    def open(self, for_continuous_recognition):
+        FakeConnection.opened.append(self)
+
+    def close(self):
+        self.closed = True
+
+    def drop(self):
+        for handler in self.disconnected.handlers:
+            handler(None)
+
+
+def fake_sdk():
+    FakeConnection.opened = []
+    return SimpleNamespace(
+        audio=SimpleNamespace(PushAudioInputStream=object, AudioConfig=lambda stream: stream),
+        SpeechRecognizer=lambda speech_config, audio_config: SimpleNamespace(stream=audio_config),
+        Connection=FakeConnection,
+    )
+
+
+def run(scenario, **pool_args):
+    async def main():
+        with ThreadPoolExecutor(2) as executor:
+            pool = SpeechRecognizerPool(fake_sdk(), object(), executor, **pool_args)
+            try:
+                return await scenario(pool)
+            finally:
+                await pool.close()
+
+    return asyncio.run(main())
+
+
+async def until(condition, timeout: float = 1.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline
+        await asyncio.sleep(0.005)
+
+
+def test_empty_pool_builds_on_demand():
+    async def scenario(pool):
+        recognizer, stream = await pool.lease()
+        assert recognizer.stream is stream
+        return pool.stats
+
+    stats = run(scenario, size=0)
+    assert stats["built_on_demand"] == 1 and stats["leased"] == 0
+    assert FakeConnection.opened == []
+
+
+def test_leases_a_pre_connected_recognizer_and_refills():
+    async def scenario(pool):
+        pool.start()
+        await until(lambda: pool.snapshot()["ready"] == 2)
+        recognizer, _ = await pool.lease()
+        assert recognizer in [connection.recognizer for connection in FakeConnection.opened]
+        await until(lambda: pool.snapshot()["ready"] == 2)
+        return pool.stats
+
+    stats = run(scenario, size=2, idle_seconds=60)
+    assert stats["leased"] == 1 and stats["built_on_demand"] == 0
+    assert len(FakeConnection.opened) == 3
+
+
+def test_dropped_connection_is_replaced():
+    async def scenario(pool):
+        pool.start()
+        await until(lambda: pool.snapshot()["ready"] == 1)
+        first = FakeConnection.opened[0]
+        first.drop()
+        recognizer, _ = await pool.lease()  # prunes the broken one first
+        assert recognizer is not first.recognizer
+        assert first.closed
+        return pool.stats
+
+    stats = run(scenario, size=1, idle_seconds=60)
+    assert stats["disconnected"] == 1
+
+
+def test_idle_pool_lets_its_connections_go():
+    async def scenario(pool):
+        pool.start()
+        await until(lambda: pool.snapshot()["ready"] == 1)
+        await until(lambda: pool.stats["expired"] == 1)
+        await asyncio.sleep(0.1)
+        return pool.snapshot()
+
+    snapshot = run(scenario, size=1, idle_seconds=0.05)
+    assert snapshot["ready"] == 0  # not refilled until the next lease
+    assert all(connection.closed for connection in FakeConnection.opened)
+
+
+def test_close_discards_ready_recognizers():
+    async def scenario(pool):
+        pool.start()
+        await until(lambda: pool.snapshot()["ready"] == 2)
+        await pool.close()
+        return pool.snapshot()
+
+    assert run(scenario, size=2, idle_seconds=60)["ready"] == 0
+    assert all(connection.closed for connection in FakeConnection.opened)
@@ -0,0 +1,89 @@
+import os
+import asyncio
+import pytest
+import storage
+from storage import BlockUpload, StorageService
+
+
+@pytest.fixture
+def service(monkeypatch, tmp_path):
+    # Mock backend: blobs are files under ./tmp
+    monkeypatch.setattr(storage, "CONNECTION_STRING", None)
+    monkeypatch.chdir(tmp_path)
+    return StorageService()
+
+
+def test_incomplete_backend_fails_when_created():
+    class NoCommit(BlockUpload):
+        async def stage_block(self, block_id, offset, block):
+            pass
+
+    with pytest.raises(TypeError):
+        NoCommit()
+
+
+def test_stream_is_staged_in_blocks_and_reassembled_in_order(service):
+    data = bytes(range(256)) * 40
+
+    async def scenario():
+        upload = service.open_upload("a.webm")
+        upload.block_bytes = 1000  # 11 blocks, several staged at once
+        for start in range(0, len(data), 333):
+            await upload.write(data[start:start + 333])
+        return await upload.commit()
+
+    path = asyncio.run(scenario())
+    with open(path, "rb") as f:
+        assert f.read() == data
+    assert not os.path.exists(path + ".part")
+
+
+def test_failed_stream_leaves_nothing_behind(service):
+    def chunks():
+        yield b"abc"
+        raise RuntimeError("client went away")
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(service.upload_stream(chunks(), "b.webm"))
+    assert os.listdir(storage.MOCK_DIR) == []
+    assert service.stats["failed"] == 1
+
+
+def test_live_recording_is_published_then_deleted(service):
+    async def scenario():
+        recording = service.open_recording("c.webm")
+        await recording.write(b"abc")
+        await recording.write(b"def")
+        recording.finish()
+        await asyncio.sleep(0.05)
+        with open(os.path.join(storage.MOCK_DIR, "c.webm"), "rb") as f:
+            assert f.read() == b"abcdef"
+        await recording.delete()
+        await recording.delete()  # safe to repeat
+
+    asyncio.run(scenario())
+    assert os.listdir(storage.MOCK_DIR) == []
+    assert service.stats["uploaded"] == 1 and service.stats["deleted"] == 1
+
+
+def test_buffered_recording_deleted_even_while_still_storing(service):
+    async def scenario():
+        recording = service.open_recording("d.webm")
+        recording.store([b"x" * 100] * 10)
+        await recording.delete()  # waits for the store, then removes the blob
+
+    asyncio.run(scenario())
+    assert os.listdir(storage.MOCK_DIR) == []
+    assert service.stats["deleted"] == 1
+
+
+def test_abandoned_recording_drops_its_blocks(service):
+    async def scenario():
+        recording = service.open_recording("e.webm")
+        await recording.write(b"abc")
+        recording.delete_later()
+        await service.close()
+
+    asyncio.run(scenario())
+    assert os.listdir(storage.MOCK_DIR) == []
+    assert service.stats["uploaded"] == 0
@@ -0,0 +1,78 @@
+import asyncio
+import sqlite3
+from theme_counters import ThemeCounters
+
+
+def counters(monkeypatch, tmp_path) -> ThemeCounters:
+    monkeypatch.setenv("THEME_COUNTS_DB", str(tmp_path / "themes.sqlite3"))
+    monkeypatch.setenv("THEME_FLUSH_SECONDS", "60")
+    return ThemeCounters()
+
+
+def test_totals_include_flushed_and_pending_counts(monkeypatch, tmp_path):
+    async def scenario():
+        themes = counters(monkeypatch, tmp_path)
+        await themes.start()
+        themes.record(["grief", "work"])
+        await themes.flush()
+        themes.record(["work"])
+        totals = await themes.totals()
+        await themes.stop()
+        return themes, totals
+
+    themes, totals = asyncio.run(scenario())
+    assert totals == {"work": 2, "grief": 1}
+    # Two rows in the first flush, the pending one when stop() flushes the rest
+    assert themes.stats["flushes"] == 2 and themes.stats["rows_written"] == 3
+
+
+def test_worker_shards_add_up_and_survive_restarts(monkeypatch, tmp_path):
+    async def scenario():
+        first, second = counters(monkeypatch, tmp_path), counters(monkeypatch, tmp_path)
+        await first.start()
+        await second.start()
+        first.record(["rest"])
+        second.record(["rest", "hope"])
+        await first.stop()  # stop() flushes what is left
+        await second.stop()
+
+        restarted = counters(monkeypatch, tmp_path)
+        await restarted.start()
+        totals = await restarted.totals()
+        await restarted.stop()
+        return totals
+
+    assert asyncio.run(scenario()) == {"rest": 2, "hope": 1}
+    rows = sqlite3.connect(tmp_path / "themes.sqlite3").execute("SELECT * FROM theme_counts").fetchall()
+    assert {tag for _, tag, _ in rows} == {"rest", "hope"}  # only window, tag and count are kept
+
+
+def test_failed_flush_keeps_the_counts(monkeypatch, tmp_path):
+    async def scenario():
+        themes = counters(monkeypatch, tmp_path)
+        await themes.start()
+        themes.record(["work"])
+
+        def broken(batch):
+            raise sqlite3.OperationalError("disk I/O error")
+
+        monkeypatch.setattr(themes, "_write", broken)
+        await themes.flush()
+        monkeypatch.undo()
+        totals = await themes.totals()
+        await themes.stop()
+        return themes, totals
+
+    themes, totals = asyncio.run(scenario())
+    assert themes.stats["flush_errors"] == 1
+    assert totals == {"work": 1}
+
+
+def test_old_windows_are_left_out(monkeypatch, tmp_path):
+    async def scenario():
+        themes = counters(monkeypatch, tmp_path)
+        themes.record(["work"])
+        since = themes.window_start() + themes.window_seconds
+        return await themes.totals(since=since)
+
+    assert asyncio.run(scenario()) == {}
@@ -0,0 +1,32 @@
+import theme_tagger
+from theme_tagger import MAX_TAGS, tag
+
+
+def test_strongest_themes_first():
+    assert tag("I am so tired and exhausted, burnt out at work with my boss and deadlines") == [
+        "exhaustion", "work_pressure",
+    ]
+
+
+def test_multi_word_cues_and_curly_apostrophes():
+    assert tag("I can’t rest, I’m burnt out") == ["exhaustion"]
+    assert tag("I feel like I'm in limbo") == ["in_between"]
+
+
+def test_weak_or_missing_cues_give_no_tags():
+    assert tag("") == []
+    assert tag("The weather is nice today") == []
+    assert tag("I had a job interview") == []  # one weak cue is below MIN_SCORE
+
+
+def test_repeating_one_cue_is_damped():
+    assert tag("I feel lonely") == ["loneliness"]
+    # Saying "work" ten times doesn't outweigh a strong theme mentioned twice
+    assert tag("work " * 10 + "grief, so much grief")[0] == "loss"
+
+
+def test_at_most_max_tags():
+    transcript = " ".join(cue for cues in theme_tagger.THEME_LEXICON.values() for cue in cues)
+    tags = tag(transcript)
+    assert len(tags) == MAX_TAGS
+    assert set(tags) <= set(theme_tagger.TAGS)
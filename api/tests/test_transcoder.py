@@ -0,0 +1,58 @@
+import asyncio
+import shutil
+import numpy as np
+import pytest
+
+from audio_buffer import AudioBuffer
+from transcoder import SAMPLE_RATE, TranscoderService, pcm_to_wav
+
+needs_ffmpeg = pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg not installed")
+
+
+def tone(seconds: float) -> bytes:
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    return (np.sin(2 * np.pi * 440 * t) * 8000).astype("<i2").tobytes()
+
+
+def buffered(data: bytes) -> AudioBuffer:
+    audio = AudioBuffer("recording.wav", "audio/wav")
+    audio.write(data)
+    return audio
+
+
+def test_missing_ffmpeg_leaves_audio_alone(monkeypatch):
+    monkeypatch.setattr(shutil, "which", lambda name: None)
+    service = TranscoderService()
+
+    async def scenario():
+        return await service.to_pcm(buffered(pcm_to_wav(tone(1)))), await service.open_stream(print)
+
+    assert asyncio.run(scenario()) == (None, None)
+
+
+@needs_ffmpeg
+def test_upload_is_decoded_to_pcm():
+    pcm = tone(1)
+    assert asyncio.run(TranscoderService().to_pcm(buffered(pcm_to_wav(pcm)))) == pcm
+
+
+@needs_ffmpeg
+def test_undecodable_upload_returns_none():
+    assert asyncio.run(TranscoderService().to_pcm(buffered(b"not audio at all" * 64))) is None
+
+
+@needs_ffmpeg
+def test_live_stream_delivers_pcm_as_chunks_arrive():
+    pcm = tone(2)
+    wav = pcm_to_wav(pcm)
+    received = []
+
+    async def scenario():
+        stream = await TranscoderService().open_stream(received.append)
+        for start in range(0, len(wav), 4096):
+            assert await stream.write(wav[start:start + 4096])
+        return await stream.finish(), stream.pcm_bytes
+
+    ok, pcm_bytes = asyncio.run(scenario())
+    assert ok and pcm_bytes == len(pcm)
+    assert b"".join(received) == pcm
@@ -0,0 +1,129 @@
+import asyncio
+import pytest
+from audio_buffer import AudioBuffer
+from uploads import OffsetMismatch, UploadSession, UploadStore
+
+
+class FakeLive:
+    def __init__(self):
+        self.audio = AudioBuffer()
+        self.closed = False
+
+    async def write(self, chunk: bytes):
+        self.audio.write(chunk)
+
+    def close(self):
+        self.closed = True
+        self.audio.close()
+
+
+def received(session: UploadSession) -> bytes:
+    return b"".join(session.live.audio.chunks())
+
+
+def test_chunks_append_in_order():
+    async def scenario():
+        session = UploadSession("u", FakeLive(), max_bytes=100)
+        assert await session.append(0, b"abc") == 3
+        assert await session.append(3, b"def") == 6
+        assert received(session) == b"abcdef"
+
+    asyncio.run(scenario())
+
+
+def test_resent_bytes_are_skipped():
+    async def scenario():
+        session = UploadSession("u", FakeLive(), max_bytes=100)
+        await session.append(0, b"abcd")
+        # A retried request that overlaps what already arrived, then an exact repeat
+        assert await session.append(2, b"cdef") == 6
+        assert await session.append(0, b"abcdef") == 6
+        assert received(session) == b"abcdef"
+
+    asyncio.run(scenario())
+
+
+def test_gap_reports_where_to_resume():
+    async def scenario():
+        session = UploadSession("u", FakeLive(), max_bytes=100)
+        await session.append(0, b"abc")
+        with pytest.raises(OffsetMismatch) as gap:
+            await session.append(5, b"xyz")
+        assert gap.value.offset == 3
+        assert received(session) == b"abc"
+
+    asyncio.run(scenario())
+
+
+def test_too_large_is_refused_without_writing():
+    async def scenario():
+        session = UploadSession("u", FakeLive(), max_bytes=5)
+        await session.append(0, b"abc")
+        with pytest.raises(ValueError):
+            await session.append(3, b"def")
+        assert session.offset == 3
+
+    asyncio.run(scenario())
+
+
+def test_finalized_session_takes_no_more_chunks():
+    async def scenario():
+        session = UploadSession("u", FakeLive(), max_bytes=100)
+        await session.append(0, b"abc")
+
+        async def pipeline(session):
+            yield "done", {"size": session.offset}
+
+        await session.start(pipeline)
+        assert [event async for event in session.follow()] == [("done", {"size": 3})]
+        with pytest.raises(OffsetMismatch):
+            await session.append(3, b"def")
+
+    asyncio.run(scenario())
+
+
+def test_negative_offset_is_refused():
+    async def scenario():
+        session = UploadSession("u", FakeLive(), max_bytes=100)
+        with pytest.raises(OffsetMismatch) as refused:
+            await session.append(-3, b"abcdef")
+        assert refused.value.offset == 0
+        assert session.offset == 0
+
+    asyncio.run(scenario())
+
+
+def test_put_rejects_a_negative_offset_and_a_bad_content_length():
+    from fastapi.testclient import TestClient
+    import main
+
+    client = TestClient(main.app)
+    assert client.put("/uploads/u?offset=-1", content=b"abc").status_code == 422
+    response = client.put("/uploads/u?offset=0", content=b"abc", headers={"content-length": "three"})
+    assert response.status_code == 400
+
+
+def test_idle_sessions_are_swept_without_further_requests():
+    async def scenario():
+        store = UploadStore()
+        store.idle_ttl, store.sweep_interval = 0.02, 0.01
+        session = await store.create(lambda: asyncio.sleep(0, FakeLive()))
+        await store.start()
+        await asyncio.sleep(0.1)
+        assert store.stats["expired"] == 1
+        assert session.live.closed
+        await store.stop()
+
+    asyncio.run(scenario())
+
+
+def test_stop_closes_open_sessions():
+    async def scenario():
+        store = UploadStore()
+        await store.start()
+        session = await store.create(lambda: asyncio.sleep(0, FakeLive()))
+        await store.stop()
+        assert session.live.closed
+        assert store.snapshot()["open"] == 0
+
+    asyncio.run(scenario())
@@ -0,0 +1,69 @@
+import numpy as np
+
+import vad
+from transcoder import SAMPLE_RATE
+
+
+def noise(seconds: float, dbfs: float, seed: int = 0) -> np.ndarray:
+    """White noise at the given RMS level: a stand-in for voice without pauses."""
+    rng = np.random.default_rng(seed)
+    samples = rng.standard_normal(int(seconds * SAMPLE_RATE))
+    return samples * (32768 * 10 ** (dbfs / 20))
+
+
+def pcm(*parts: np.ndarray) -> bytes:
+    return np.clip(np.concatenate(parts), -32768, 32767).astype("<i2").tobytes()
+
+
+def test_digital_silence_has_no_regions():
+    assert vad.speech_regions(pcm(np.zeros(3 * SAMPLE_RATE))) == []
+    assert vad.trim_silence(pcm(np.zeros(3 * SAMPLE_RATE))) == b""
+
+
+def test_noise_below_the_floor_is_silent():
+    assert vad.speech_regions(pcm(noise(3, -70))) == []
+
+
+def test_steady_quiet_voice_is_sent_whole():
+    audio = pcm(noise(3, -47))
+    assert vad.speech_regions(audio) == [(0, 3 * SAMPLE_RATE)]
+    assert vad.trim_silence(audio) == audio
+
+
+def test_speech_between_silences_is_trimmed_with_padding():
+    audio = pcm(np.zeros(SAMPLE_RATE), noise(1, -20), np.zeros(SAMPLE_RATE))
+    [(start, end)] = vad.speech_regions(audio)
+    pad = vad.PAD_MS * SAMPLE_RATE // 1000
+    assert SAMPLE_RATE - pad - vad.FRAME_SAMPLES <= start < SAMPLE_RATE
+    assert 2 * SAMPLE_RATE < end <= 2 * SAMPLE_RATE + pad + vad.FRAME_SAMPLES
+
+
+def test_long_pause_is_shortened():
+    audio = pcm(noise(1, -20), np.zeros(3 * SAMPLE_RATE), noise(1, -20, seed=1))
+    regions = vad.speech_regions(audio)
+    assert len(regions) == 2
+    trimmed = vad.trim_silence(audio, regions)
+    voiced = sum(end - start for start, end in regions)
+    assert len(trimmed) == 2 * (voiced + vad.MAX_PAUSE_MS * SAMPLE_RATE // 1000)
+
+
+def test_split_segments_cuts_at_pauses():
+    gap = np.zeros(SAMPLE_RATE)
+    audio = pcm(*[part for seed in range(3) for part in (noise(2, -20, seed), gap)])
+    regions = vad.speech_regions(audio)
+    assert len(regions) == 3
+    segments = vad.split_segments(audio, regions, max_seconds=5)
+    # Two utterances and a shortened pause fit in 5 s, the third starts a new segment
+    assert len(segments) == 2
+    assert all(len(segment) <= 2 * 5 * SAMPLE_RATE for segment in segments)
+    assert segments[1] == audio[regions[2][0] * 2:regions[2][1] * 2]
+
+
+def test_split_segments_cuts_a_long_stretch_at_its_quietest_frame():
+    quiet_at = 4 * SAMPLE_RATE // vad.FRAME_SAMPLES * vad.FRAME_SAMPLES
+    samples = noise(8, -20)
+    samples[quiet_at:quiet_at + vad.FRAME_SAMPLES] *= 0.01
+    audio = pcm(samples)
+    segments = vad.split_segments(audio, [(0, len(samples))], max_seconds=5)
+    assert [len(segment) // 2 for segment in segments] == [quiet_at, len(samples) - quiet_at]
+    assert b"".join(segments) == audio
@@ -0,0 +1,131 @@
+import os
+import time
+import asyncio
+import sqlite3
+from collections import Counter
+
+
+class ThemeCounters:
+    """
+    Anonymous theme-tag counts for the collective mirror, bucketed by time window.
+
+    record() only bumps an in-memory Counter on the event loop, so a request never waits on
+    storage. A background task swaps the pending counter out and merges it into SQLite in one
+    transaction per flush. Each worker process holds its own shard; the UPSERT adds shards
+    together, so totals are correct however many workers there are, and survive restarts.
+    Only (window, tag, count) is ever stored.
+    """
+
+    def __init__(self):
+        self.path = os.getenv("THEME_COUNTS_DB", os.path.join(os.path.dirname(__file__), "data", "theme_counts.sqlite3"))
+        self.window_seconds = int(os.getenv("THEME_WINDOW_SECONDS", "86400"))
+        self.flush_interval = float(os.getenv("THEME_FLUSH_SECONDS", "5"))
+
+        self._pending = Counter()  # (window_start, tag) -> count
+        self._conn = None
+        self._task = None
+        self.stats = {"recorded": 0, "flushes": 0, "rows_written": 0, "flush_errors": 0}
+        self.last_flush_seconds = None
+
+    def window_start(self, now: float | None = None) -> int:
+        now = time.time() if now is None else now
+        return int(now // self.window_seconds) * self.window_seconds
+
+    def record(self, tags):
+        """Count one occurrence of each tag in the current window. Never blocks."""
+        window = self.window_start()
+        for tag in tags:
+            self._pending[(window, tag)] += 1
+            self.stats["recorded"] += 1
+
+    async def start(self):
+        try:
+            await asyncio.to_thread(self._open)
+            self._task = asyncio.create_task(self._flush_loop())
+            print(f"✅ Theme counters persisted to {self.path} every {self.flush_interval:g}s")
+        except Exception as e:
+            print(f"❌ Theme counter store unavailable, counts will stay in memory: {e}")
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+        if self._conn:
+            self._conn.close()
+            self._conn = None
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        # Used from whichever thread to_thread picks; the sqlite3 module serializes access
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS theme_counts ("
+            " window_start INTEGER NOT NULL,"
+            " tag TEXT NOT NULL,"
+            " count INTEGER NOT NULL,"
+            " PRIMARY KEY (window_start, tag))"
+        )
+        self._conn.commit()
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    async def flush(self):
+        if not self._pending or not self._conn:
+            return
+
+        batch, self._pending = self._pending, Counter()
+        started = time.monotonic()
+        try:
+            await asyncio.to_thread(self._write, batch)
+        except Exception as e:
+            print(f"❌ Theme counter flush failed, keeping {len(batch)} counts for the next one: {e}")
+            self.stats["flush_errors"] += 1
+            self._pending.update(batch)
+            return
+
+        self.stats["flushes"] += 1
+        self.stats["rows_written"] += len(batch)
+        self.last_flush_seconds = time.monotonic() - started
+
+    def _write(self, batch: Counter):
+        with self._conn:
+            self._conn.executemany(
+                "INSERT INTO theme_counts (window_start, tag, count) VALUES (?, ?, ?) "
+                "ON CONFLICT (window_start, tag) DO UPDATE SET count = count + excluded.count",
+                [(window, tag, count) for (window, tag), count in batch.items()],
+            )
+
+    def _read(self, since: int) -> list:
+        return self._conn.execute(
+            "SELECT tag, SUM(count) FROM theme_counts WHERE window_start >= ? GROUP BY tag",
+            (since,),
+        ).fetchall()
+
+    async def totals(self, since: int = 0) -> dict:
+        """Tag counts for all windows starting at or after `since`, including unflushed counts."""
+        totals = Counter()
+        if self._conn:
+            totals.update(dict(await asyncio.to_thread(self._read, since)))
+        for (window, tag), count in self._pending.items():
+            if window >= since:
+                totals[tag] += count
+        return dict(totals.most_common())
+
+    def snapshot(self) -> dict:
+        return {
+            **self.stats,
+            "pending": len(self._pending),
+            "persistent": self._conn is not None,
+            "window_seconds": self.window_seconds,
+            "last_flush_seconds": self.last_flush_seconds,
+        }
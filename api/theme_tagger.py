@@ -0,0 +1,118 @@
+import re
+import numpy as np
+
+# Fixed tag vocabulary for the collective mirror. Each cue is a word or short phrase with a
+# weight; a tag's score is the weighted count of its cues in the transcript.
+THEME_LEXICON = {
+    "effort_without_reward": {
+        "tried": 1.0, "trying": 1.0, "so hard": 1.5, "worked hard": 2.0, "working hard": 2.0,
+        "nothing changed": 2.0, "no progress": 2.0, "for nothing": 2.0, "not enough": 1.0,
+        "never enough": 2.0, "unnoticed": 1.5, "unappreciated": 2.0, "no recognition": 2.0,
+        "still nothing": 2.0, "kept going": 1.0, "all that effort": 2.0, "wasted": 1.0,
+    },
+    "exhaustion": {
+        "tired": 1.5, "exhausted": 2.0, "exhausting": 2.0, "drained": 2.0, "worn": 1.0,
+        "burnt out": 2.0, "burned out": 2.0, "burnout": 2.0, "no energy": 2.0, "fatigue": 1.5,
+        "sleep": 0.5, "weary": 1.5, "running on": 1.0, "can't rest": 2.0,
+    },
+    "uncertainty": {
+        "uncertain": 2.0, "uncertainty": 2.0, "not knowing": 2.0, "don't know": 1.0,
+        "unsure": 1.5, "unclear": 1.5, "what comes": 1.0, "next": 0.5, "figured out": 1.0,
+        "lost": 1.0, "direction": 1.0, "confused": 1.5, "questioning": 1.5,
+    },
+    "carrying_weight": {
+        "weight": 1.5, "heavy": 1.5, "heavier": 1.5, "carrying": 1.5, "burden": 2.0,
+        "overwhelmed": 2.0, "overwhelming": 2.0, "too much": 1.5, "pressure": 1.0,
+        "holding": 0.5, "crushing": 2.0,
+    },
+    "loneliness": {
+        "alone": 2.0, "lonely": 2.0, "loneliness": 2.0, "isolated": 2.0, "nobody": 1.5,
+        "no one": 1.5, "by myself": 1.5, "disconnected": 1.5, "left out": 1.5,
+        "no friends": 2.0, "miss people": 1.5,
+    },
+    "loss": {
+        "lost someone": 2.5, "passed away": 2.5, "died": 2.0, "death": 2.0, "grief": 2.5,
+        "grieving": 2.5, "miss her": 2.0, "miss him": 2.0, "gone": 1.0, "funeral": 2.0,
+        "breakup": 2.0, "broke up": 2.0, "divorce": 2.0, "ended": 0.5,
+    },
+    "self_doubt": {
+        "not good": 1.5, "failure": 2.0, "failed": 1.5, "failing": 1.5, "my fault": 2.0,
+        "doubt": 1.5, "doubting": 1.5, "worthless": 2.5, "inadequate": 2.0, "disappointed": 1.0,
+        "ashamed": 2.0, "behind": 1.0, "compare": 1.0, "comparing": 1.5, "imposter": 2.0,
+    },
+    "work_pressure": {
+        "work": 1.0, "job": 1.0, "boss": 1.5, "deadline": 1.5, "deadlines": 1.5,
+        "career": 1.5, "office": 1.0, "laid off": 2.5, "fired": 2.0, "promotion": 1.5,
+        "workload": 2.0, "overtime": 2.0, "exams": 1.5, "studies": 1.0, "grades": 1.5,
+    },
+    "strained_relationships": {
+        "family": 1.0, "parents": 1.0, "partner": 1.0, "argument": 1.5, "arguing": 1.5,
+        "fight": 1.0, "fighting": 1.5, "distance": 1.0, "don't understand": 1.5,
+        "misunderstood": 2.0, "betrayed": 2.5, "trust": 1.0, "relationship": 1.0,
+    },
+    "in_between": {
+        "stuck": 2.0, "between": 1.0, "transition": 2.0, "changing": 1.0, "change": 0.5,
+        "becoming": 1.5, "who i": 0.5, "version of": 1.5, "in limbo": 2.5, "waiting": 1.5,
+        "on hold": 2.0, "same place": 2.0,
+    },
+    "holding_it_together": {
+        "pretend": 1.5, "pretending": 2.0, "mask": 1.5, "keep it together": 2.5,
+        "holding it": 1.5, "going through": 1.0, "the motions": 1.5, "fine": 0.5,
+        "strong": 1.0, "smile": 1.0, "hide": 1.5, "hiding": 1.5,
+    },
+    "quiet_relief": {
+        "breathe": 1.5, "exhale": 2.0, "lighter": 2.0, "relief": 2.0, "calm": 1.0,
+        "peace": 1.5, "let go": 2.0, "letting go": 2.0, "okay": 0.5, "enough": 0.5,
+    },
+}
+
+TAGS = list(THEME_LEXICON)
+MIN_SCORE = 2.0
+MAX_TAGS = 3
+
+_WORD = re.compile(r"[a-z']+")
+
+
+def _build_index():
+    terms = sorted({cue for cues in THEME_LEXICON.values() for cue in cues})
+    index = {term: i for i, term in enumerate(terms)}
+    weights = np.zeros((len(terms), len(TAGS)), dtype=np.float32)
+    for col, tag in enumerate(TAGS):
+        for cue, weight in THEME_LEXICON[tag].items():
+            weights[index[cue], col] = weight
+
+    # Multi-word cues keyed by their first word, so most words cost a single dict lookup
+    phrases = {}
+    for term in terms:
+        first, _, rest = term.partition(" ")
+        if rest:
+            phrases.setdefault(first, []).append((term, rest.count(" ") + 2))
+    return index, weights, phrases
+
+
+_INDEX, _WEIGHTS, _PHRASES = _build_index()
+
+
+def tag(transcript: str) -> list[str]:
+    """
+    Dominant theme tags for a transcript (at most MAX_TAGS, strongest first). Cues are found
+    in one pass over the words, counted with bincount, and scored against every tag at once
+    with one matrix-vector product. Runs in well under a millisecond.
+    """
+    words = _WORD.findall(transcript.lower().replace("’", "'"))
+    hits = [_INDEX[word] for word in words if word in _INDEX]
+    if not _PHRASES.keys().isdisjoint(words):
+        for i, word in enumerate(words):
+            for phrase, length in _PHRASES.get(word, ()):
+                if " ".join(words[i:i + length]) == phrase:
+                    hits.append(_INDEX[phrase])
+    if not hits:
+        return []
+
+    counts = np.bincount(hits, minlength=len(_INDEX)).astype(np.float32)
+    # Repeating one cue shouldn't dominate: 1 + log(n) for every cue that appears
+    damped = np.log(counts, out=np.zeros_like(counts), where=counts > 0) + (counts > 0)
+    scores = damped @ _WEIGHTS
+
+    ranked = np.argsort(scores)[::-1][:MAX_TAGS]
+    return [TAGS[i] for i in ranked if scores[i] >= MIN_SCORE]
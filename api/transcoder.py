@@ -0,0 +1,154 @@
+import os
+import io
+import wave
+import asyncio
+import shutil
+from audio_buffer import AudioBuffer
+from admission import admission
+
+# Raw 16 kHz, 16-bit, mono PCM: the Speech SDK's default push-stream format
+SAMPLE_RATE = 16000
+PCM_ARGS = ["-ar", str(SAMPLE_RATE), "-ac", "1", "-c:a", "pcm_s16le", "-f", "s16le"]
+PIPE_READ_BYTES = 32 * 1024
+
+
+def pcm_to_wav(pcm: bytes) -> bytes:
+    """Wrap raw PCM from to_pcm() in a WAV header (for APIs that want a container)."""
+    out = io.BytesIO()
+    with wave.open(out, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(SAMPLE_RATE)
+        wav.writeframes(pcm)
+    return out.getvalue()
+
+
+class TranscoderService:
+    """
+    Decodes MediaRecorder uploads (WebM/Opus, MP4/AAC) to PCM with ffmpeg over
+    stdin/stdout pipes. Nothing is written to disk, and the number of concurrent
+    ffmpeg processes is capped by the "transcode" admission stage.
+    """
+
+    def __init__(self):
+        self.available = shutil.which("ffmpeg") is not None
+        self._slots = admission.stage("transcode")
+        self.max_processes = self._slots.limit
+        self.timeout = float(os.getenv("FFMPEG_TIMEOUT", "30"))
+
+        if self.available:
+            print(f"✅ FFmpeg available, up to {self.max_processes} concurrent transcodes")
+        else:
+            print("WARNING: FFmpeg not found. Audio will be sent to Speech in its original container.")
+
+    async def _spawn(self, stderr=asyncio.subprocess.PIPE):
+        return await asyncio.create_subprocess_exec(
+            "ffmpeg", "-hide_banner", "-loglevel", "error",
+            "-i", "pipe:0", *PCM_ARGS, "pipe:1",
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=stderr,
+        )
+
+    async def version(self) -> str:
+        proc = await asyncio.create_subprocess_exec(
+            "ffmpeg", "-version",
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        stdout, _ = await proc.communicate()
+        return stdout.decode(errors="replace").split("\n")[0]
+
+    async def to_pcm(self, audio: AudioBuffer) -> bytes | None:
+        """Decode a buffered upload to 16 kHz mono PCM. Returns None if ffmpeg is missing or fails."""
+        if not self.available or not audio.size:
+            return None
+
+        async with self._slots.slot():
+            proc = await self._spawn()
+
+            async def feed():
+                try:
+                    for chunk in audio.chunks():
+                        proc.stdin.write(chunk)
+                        await proc.stdin.drain()
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # ffmpeg exited early; its stderr says why
+                finally:
+                    proc.stdin.close()
+
+            try:
+                _, pcm, stderr = await asyncio.wait_for(
+                    asyncio.gather(feed(), proc.stdout.read(), proc.stderr.read()),
+                    timeout=self.timeout,
+                )
+                await proc.wait()
+            except asyncio.TimeoutError:
+                print(f"❌ FFmpeg transcode timed out after {self.timeout}s")
+                proc.kill()
+                await proc.wait()
+                return None
+
+        if proc.returncode != 0 or not pcm:
+            print(f"❌ FFmpeg transcode failed with exit code {proc.returncode}")
+            print(f"❌ FFmpeg stderr: {stderr.decode(errors='replace')[-500:]}")
+            return None
+
+        print(f"✅ Audio transcoded to PCM: {len(pcm)} bytes ({len(pcm) / (2 * SAMPLE_RATE):.1f}s)")
+        return pcm
+
+    async def open_stream(self, on_pcm) -> "TranscodeStream | None":
+        """
+        Start an ffmpeg process for a live session. Chunks written to it are decoded as they
+        arrive and the PCM is handed to on_pcm. It counts against the session's "live" slot,
+        not the transcode slots, so a recording in progress never holds up uploads.
+        """
+        if not self.available:
+            return None
+        proc = await self._spawn(stderr=asyncio.subprocess.DEVNULL)
+        return TranscodeStream(self, proc, on_pcm)
+
+
+class TranscodeStream:
+    """One long-lived ffmpeg process fed incrementally."""
+
+    def __init__(self, service: TranscoderService, proc, on_pcm):
+        self.service = service
+        self.proc = proc
+        self.on_pcm = on_pcm
+        self.pcm_bytes = 0
+        self._pump = asyncio.create_task(self._read_pcm())
+
+    async def _read_pcm(self):
+        while True:
+            chunk = await self.proc.stdout.read(PIPE_READ_BYTES)
+            if not chunk:
+                break
+            self.pcm_bytes += len(chunk)
+            self.on_pcm(chunk)
+
+    async def write(self, chunk: bytes) -> bool:
+        """Returns False once ffmpeg has stopped accepting input."""
+        try:
+            self.proc.stdin.write(chunk)
+            await self.proc.stdin.drain()
+            return True
+        except (BrokenPipeError, ConnectionResetError):
+            return False
+
+    async def finish(self) -> bool:
+        """Close stdin and wait for the last PCM to be delivered."""
+        try:
+            self.proc.stdin.close()
+            await asyncio.wait_for(self._pump, timeout=self.service.timeout)
+            await self.proc.wait()
+            return self.proc.returncode == 0
+        except asyncio.TimeoutError:
+            print("❌ Live FFmpeg transcode did not finish in time")
+            self.abort()
+            return False
+
+    def abort(self):
+        if self.proc.returncode is None:
+            self.proc.kill()
+        self._pump.cancel()
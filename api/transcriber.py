@@ -1,30 +1,47 @@
 import os
-import azure.cognitiveservices.speech as speechsdk
 import asyncio
 import hashlib
-from openai import AzureOpenAI
+import time
+from concurrent.futures import ThreadPoolExecutor
+from audio_buffer import AudioBuffer
+from transcoder import TranscoderService, SAMPLE_RATE, pcm_to_wav
+import vad
+import clients
+from speech_pool import SpeechRecognizerPool
+from metrics import LatencyTracker
+from admission import admission, OverloadedError
+
+# The Speech SDK is imported on first use (see _load_speech_sdk); it is only needed with credentials
+speechsdk = None
+
+def _load_speech_sdk():
+    global speechsdk
+    if speechsdk is None:
+        import azure.cognitiveservices.speech as sdk
+        speechsdk = sdk
+    return speechsdk
+
+# Until this many Speech latencies are tracked, STT_HEDGE_DELAY=p95 hedges after the default delay
+HEDGE_MIN_SAMPLES = 20
+HEDGE_DEFAULT_DELAY = 4.0
+
+# Single-shot recognition handles at most ~15s of audio, so longer speech is split at pauses
+SEGMENT_MAX_SECONDS = float(os.getenv("STT_SEGMENT_MAX_SECONDS", "14"))
+# Segments of one recording recognized at once (each also needs an "stt" admission slot)
+SEGMENT_CONCURRENCY = int(os.getenv("STT_SEGMENT_CONCURRENCY", "8"))
 
 class TranscriberService:
     def __init__(self):
         self.speech_key = os.getenv("SPEECH_KEY")
         self.speech_region = os.getenv("SPEECH_REGION")
         
-        # Also initialize OpenAI client for Whisper fallback
+        # Whisper fallback uses the worker's shared OpenAI client (clients.py), with the SDK's
+        # default retries since it has no breaker of its own
         self.openai_client = None
         try:
-            api_key = os.getenv("OPENAI_API_KEY")
-            endpoint = os.getenv("OPENAI_API_BASE")
-            api_version = os.getenv("OPENAI_API_VERSION", "2024-12-01-preview")
-            
-            if api_key and endpoint:
-                if not endpoint.startswith(("http://", "https://")):
-                    endpoint = "https://" + endpoint
-                    
-                self.openai_client = AzureOpenAI(
-                    api_key=api_key,
-                    azure_endpoint=endpoint,
-                    api_version=api_version,
-                )
+            client = clients.openai_client()
+            if client is not None:
+                self.openai_client = client.with_options(max_retries=2)
                 print("✅ OpenAI client initialized for Whisper fallback")
         except Exception as e:
             print(f"❌ OpenAI client init failed: {e}")
@@ -36,6 +53,7 @@ class TranscriberService:
         
         if self.speech_key and self.speech_region:
             try:
+                _load_speech_sdk()
                 self.speech_config = speechsdk.SpeechConfig(subscription=self.speech_key, region=self.speech_region)
                 self.speech_config.speech_recognition_language = "en-US"
                 print("✅ Speech Service initialized successfully")
@@ -46,69 +64,308 @@ class TranscriberService:
             self.speech_config = None
             print("WARNING: Speech Service credentials missing. Using fallback transcription.")
 
-    async def transcribe_with_whisper(self, audio_path: str) -> str:
+        # WebM/MP4 uploads are decoded to PCM before they reach Speech
+        self.transcoder = TranscoderService()
+
+        # Hedging: if Speech hasn't answered after this delay, race Whisper against it.
+        # Unset disables hedging; a number is a fixed delay in seconds; "p95" tracks recent Speech latency.
+        self.hedge_delay = os.getenv("STT_HEDGE_DELAY", "").strip().lower()
+        self.speech_latency = LatencyTracker()
+        self.hedge_stats = {"hedged": 0, "speech_won": 0, "whisper_won": 0}
+
+        # Silence is trimmed from decoded audio before it is sent anywhere
+        self.vad_stats = {"recordings": 0, "silent": 0, "input_seconds": 0.0, "speech_seconds": 0.0}
+        self.segment_stats = {"segmented": 0, "segments": 0, "whisper_segments": 0}
+
+        # Canned transcripts handed out by _intelligent_fallback, so callers can tell them from real speech
+        self._fallback_transcripts = set()
+
+        # Speech SDK results are waited on in a bounded pool so recognition never blocks the event loop;
+        # the "stt" admission stage keeps requests queued in front of it rather than inside it. A
+        # recognition holds its slot until the SDK returns, so it never waits in here for a thread.
+        # The rest of the threads start and stop live sessions and build pooled recognizers.
+        self._stt = admission.stage("stt")
+        self._live = admission.stage("live")
+        self.max_concurrent_recognitions = self._stt.limit
+        self._speech_executor = ThreadPoolExecutor(
+            max_workers=self.max_concurrent_recognitions + self._live.limit + 1,
+            thread_name_prefix="speech",
+        )
+
+        # Recognizers for decoded PCM are built and connected ahead of time (start_recognizer_pool)
+        self.recognizers = SpeechRecognizerPool(speechsdk, self.speech_config, self._speech_executor) if self.speech_config else None
+
+    def start_recognizer_pool(self):
+        if self.recognizers is not None:
+            self.recognizers.start()
+
+    async def close(self):
+        """Release the recognizers and their threads. The shared OpenAI client is closed by clients.close()."""
+        if self.recognizers is not None:
+            await self.recognizers.close()
+        self._speech_executor.shutdown(wait=False, cancel_futures=True)
+
+    def is_fallback(self, transcript: str) -> bool:
+        """True if the transcript is a canned fallback rather than what the user said."""
+        return transcript in self._fallback_transcripts
+
+    async def _recognize_once(self, make_recognizer):
+        """
+        Run single-shot recognition through the SDK's future API without blocking the loop, in an
+        "stt" slot held until the SDK returns. A caller that is cancelled (the losing side of a
+        hedge) stops waiting, but the executor thread stays busy until then, so the slot must
+        not be counted free any sooner. make_recognizer() is awaited inside the slot, so a
+        request turned away as overloaded never takes a pooled recognizer.
+        """
+        await self._stt.acquire()
+        try:
+            speech_recognizer = await make_recognizer()
+            future = speech_recognizer.recognize_once_async()
+            recognizing = asyncio.get_running_loop().run_in_executor(self._speech_executor, future.get)
+        except BaseException:
+            self._stt.release()
+            raise
+        recognizing.add_done_callback(self._recognition_settled)
+        return await asyncio.shield(recognizing)
+
+    def _recognition_settled(self, recognizing):
+        self._stt.release()
+        if not recognizing.cancelled():
+            recognizing.exception()  # an abandoned recognition's error is not worth a warning
+
+    def _open_push_stream(self) -> "speechsdk.audio.PushAudioInputStream":
+        """Push stream for compressed container audio (WebM/MP4), decoded by the SDK."""
+        stream_format = speechsdk.audio.AudioStreamFormat(
+            compressed_stream_format=speechsdk.AudioStreamContainerFormat.ANY
+        )
+        return speechsdk.audio.PushAudioInputStream(stream_format=stream_format)
+
+    def _push_stream(self, audio: AudioBuffer) -> "speechsdk.audio.PushAudioInputStream":
+        """Feed the buffered upload into a Speech SDK push stream."""
+        stream = self._open_push_stream()
+        for chunk in audio.chunks():
+            stream.write(chunk)
+        stream.close()
+        return stream
+
+    async def _decode(self, audio: AudioBuffer) -> tuple[bytes | None, list[bytes]]:
+        """
+        (speech, segments) for the upload. speech is the PCM with silence trimmed by VAD: None
+        if it couldn't be decoded (no ffmpeg, unreadable container), b"" if it holds no speech.
+        segments splits speech longer than SEGMENT_MAX_SECONDS at its pauses, else is empty.
+        """
+        pcm = await self.transcoder.to_pcm(audio)
+        if pcm is None:
+            return None, []
+
+        regions = vad.speech_regions(pcm)
+        speech = vad.trim_silence(pcm, regions)
+        self.vad_stats["recordings"] += 1
+        self.vad_stats["input_seconds"] += len(pcm) / (2 * SAMPLE_RATE)
+        self.vad_stats["speech_seconds"] += len(speech) / (2 * SAMPLE_RATE)
+        if not speech:
+            self.vad_stats["silent"] += 1
+            return speech, []
+
+        print(f"✂️ Trimmed silence: {len(pcm) / (2 * SAMPLE_RATE):.1f}s -> {len(speech) / (2 * SAMPLE_RATE):.1f}s")
+        segments = []
+        if len(speech) / (2 * SAMPLE_RATE) > SEGMENT_MAX_SECONDS:
+            segments = vad.split_segments(pcm, regions, SEGMENT_MAX_SECONDS)
+        return speech, segments
+
+    async def transcribe_with_whisper(self, audio: AudioBuffer, pcm: bytes | None = None) -> str:
         """Try to use OpenAI Whisper API for transcription"""
         if not self.openai_client:
             return None
             
         try:
             print("🎤 Attempting Whisper API transcription...")
-            with open(audio_path, "rb") as audio_file:
-                # Note: Azure OpenAI might not support Whisper API
-                # This will fail gracefully and fall back to intelligent responses
-                transcript = self.openai_client.audio.transcriptions.create(
+            # Note: Azure OpenAI might not support Whisper API
+            # This will fail gracefully and fall back to intelligent responses
+            async with self._stt.slot():
+                transcript = await self.openai_client.audio.transcriptions.create(
                     model="whisper-1",
-                    file=audio_file,
+                    # Trimmed speech when we have it: smaller upload, fewer billed seconds
+                    file=("recording.wav", pcm_to_wav(pcm), "audio/wav") if pcm else audio.as_upload(),
                     response_format="text"
                 )
             print(f"✅ Whisper transcription successful: {transcript}")
             return transcript
+        except OverloadedError:
+            raise
         except Exception as e:
             print(f"❌ Whisper transcription failed (likely not available in Azure OpenAI): {e}")
             return None
 
-    async def transcribe(self, audio_path: str) -> str:
+    async def _transcribe_with_speech(self, audio: AudioBuffer, pcm: bytes | None = None) -> str | None:
+        """Single Azure Speech attempt (on decoded PCM when available). None on failure or no match."""
+        started = time.perf_counter()
+        try:
+            print("🎯 Attempting Azure Speech Service transcription...")
+            async def make_recognizer():
+                if pcm:
+                    # Pre-connected recognizer on a stream in the SDK's default format (16 kHz, 16-bit, mono PCM)
+                    speech_recognizer, stream = await self.recognizers.lease()
+                    stream.write(pcm)
+                    stream.close()
+                    return speech_recognizer
+                stream = self._push_stream(audio)
+                audio_config = speechsdk.audio.AudioConfig(stream=stream)
+                return speechsdk.SpeechRecognizer(speech_config=self.speech_config, audio_config=audio_config)
+
+            print("🎤 Starting speech recognition...")
+            result = await self._recognize_once(make_recognizer)
+            
+            if result.reason == speechsdk.ResultReason.RecognizedSpeech:
+                print(f"✅ Azure Speech transcription successful: {result.text}")
+                self.speech_latency.record(time.perf_counter() - started)
+                return result.text
+            elif result.reason == speechsdk.ResultReason.NoMatch:
+                print("❌ No speech could be recognized with Azure Speech")
+            elif result.reason == speechsdk.ResultReason.Canceled:
+                cancellation_details = result.cancellation_details
+                print(f"❌ Azure Speech transcription canceled: {cancellation_details.reason}")
+                if cancellation_details.reason == speechsdk.CancellationReason.Error:
+                    print(f"❌ Error details: {cancellation_details.error_details}")
+            
+        except OverloadedError:
+            raise
+        except Exception as e:
+            print(f"❌ Azure Speech transcription failed: {e}")
+        return None
+
+    async def _transcribe_segments(self, audio: AudioBuffer, segments: list[bytes]) -> str | None:
         """
-        Transcribes audio from a file path using Azure Speech Service or Whisper fallback.
+        Recognize the segments of a long recording concurrently (at most SEGMENT_CONCURRENCY at
+        once) and stitch the text back in order. A segment Speech can't handle goes to Whisper.
+        """
+        print(f"🧩 Transcribing {len(segments)} segments in parallel")
+        self.segment_stats["segmented"] += 1
+        self.segment_stats["segments"] += len(segments)
+        limit = asyncio.Semaphore(SEGMENT_CONCURRENCY)
+
+        async def one(segment: bytes) -> str | None:
+            async with limit:
+                text = await self._transcribe_with_speech(audio, segment)
+                if not text and self.openai_client:
+                    self.segment_stats["whisper_segments"] += 1
+                    text = await self.transcribe_with_whisper(audio, segment)
+                return text
+
+        tasks = [asyncio.create_task(one(segment)) for segment in segments]
+        try:
+            texts = await asyncio.gather(*tasks)
+        finally:
+            # One segment failing hard (e.g. overload) shouldn't leave its siblings running
+            for task in tasks:
+                task.cancel()
+
+        recognized = [text.strip() for text in texts if text and text.strip()]
+        if not recognized:
+            return None
+        if len(recognized) < len(segments):
+            print(f"⚠️ {len(segments) - len(recognized)} of {len(segments)} segments had no transcript")
+        return " ".join(recognized)
+
+    def _hedge_delay(self) -> float | None:
+        if not self.hedge_delay:
+            return None
+        if self.hedge_delay == "p95":
+            if len(self.speech_latency) < HEDGE_MIN_SAMPLES:
+                return HEDGE_DEFAULT_DELAY
+            return self.speech_latency.percentile(0.95)
+        try:
+            return float(self.hedge_delay)
+        except ValueError:
+            return None
+
+    async def _transcribe_hedged(self, audio: AudioBuffer, pcm: bytes | None, delay: float) -> str | None:
         """
-        if not os.path.exists(audio_path):
+        Start Azure Speech; if it hasn't answered within `delay`, launch Whisper in parallel.
+        The first non-empty transcript wins and the other request is cancelled.
+        """
+        speech = asyncio.create_task(self._transcribe_with_speech(audio, pcm))
+        done, _ = await asyncio.wait({speech}, timeout=delay)
+        if done:
+            transcript = speech.result()
+            if transcript:
+                return transcript
+            # Speech failed fast, so there is nothing to race: plain Whisper fallback
+            return await self.transcribe_with_whisper(audio, pcm)
+
+        print(f"⏱️ Azure Speech slower than {delay:.2f}s, hedging with Whisper")
+        self.hedge_stats["hedged"] += 1
+        whisper = asyncio.create_task(self.transcribe_with_whisper(audio, pcm))
+        pending = {speech, whisper}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    transcript = task.result()
+                    if transcript:
+                        winner = "speech" if task is speech else "whisper"
+                        self.hedge_stats[f"{winner}_won"] += 1
+                        print(f"🏁 Hedge won by {winner}")
+                        return transcript
+            return None
+        finally:
+            # The SDK finishes an abandoned recognition on its own thread; its result is dropped
+            for task in pending:
+                task.cancel()
+
+    async def transcribe(self, audio: AudioBuffer) -> str:
+        """
+        Transcribes a buffered upload using Azure Speech Service or Whisper fallback.
+        """
+        if not audio.size:
              return "(Audio file not found for transcription)"
 
-        print(f"🎤 Starting transcription for: {audio_path}")
-        print(f"📁 Audio file size: {os.path.getsize(audio_path)} bytes")
+        print(f"🎤 Starting transcription for: {audio.filename}")
+        print(f"📁 Audio size: {audio.size} bytes")
+
+        pcm, segments = await self._decode(audio)
+        if pcm == b"":
+            # Nothing was said: no Speech or Whisper call, and an empty transcript
+            print("🤫 No speech detected, skipping transcription")
+            return ""
         
         # Try Azure Speech Service first
-        if self.speech_config:
-            try:
-                print("🎯 Attempting Azure Speech Service transcription...")
-                audio_config = speechsdk.audio.AudioConfig(filename=audio_path)
-                speech_recognizer = speechsdk.SpeechRecognizer(speech_config=self.speech_config, audio_config=audio_config)
-
-                print("🎤 Starting speech recognition...")
-                result = speech_recognizer.recognize_once()
-                
-                if result.reason == speechsdk.ResultReason.RecognizedSpeech:
-                    print(f"✅ Azure Speech transcription successful: {result.text}")
-                    return result.text
-                elif result.reason == speechsdk.ResultReason.NoMatch:
-                    print("❌ No speech could be recognized with Azure Speech")
-                elif result.reason == speechsdk.ResultReason.Canceled:
-                    cancellation_details = result.cancellation_details
-                    print(f"❌ Azure Speech transcription canceled: {cancellation_details.reason}")
-                    if cancellation_details.reason == speechsdk.CancellationReason.Error:
-                        print(f"❌ Error details: {cancellation_details.error_details}")
-                
-            except Exception as e:
-                print(f"❌ Azure Speech transcription failed: {e}")
+        if self.speech_config and segments:
+            transcript = await self._transcribe_segments(audio, segments)
+            if transcript:
+                return transcript
+        elif self.speech_config:
+            delay = self._hedge_delay()
+            if delay is not None and self.openai_client:
+                transcript = await self._transcribe_hedged(audio, pcm, delay)
+                if transcript:
+                    return transcript
+                return self._intelligent_fallback(audio)
+
+            transcript = await self._transcribe_with_speech(audio, pcm)
+            if transcript:
+                return transcript
         
+        return await self._transcribe_fallback(audio, pcm)
+
+    async def start_live(self, filename: str = "recording.webm", content_type: str = "audio/webm") -> "LiveTranscription":
+        """Open a continuous-recognition session that is fed chunk by chunk while the user speaks."""
+        live = LiveTranscription(self, filename, content_type)
+        await live.start()
+        return live
+
+    async def _transcribe_fallback(self, audio: AudioBuffer, pcm: bytes | None = None) -> str:
+        """Whisper, then the intelligent fallback, for audio Azure Speech could not handle."""
         # Try Whisper API as fallback
-        whisper_result = await self.transcribe_with_whisper(audio_path)
+        whisper_result = await self.transcribe_with_whisper(audio, pcm)
         if whisper_result:
             return whisper_result
-        
+        return self._intelligent_fallback(audio)
+
+    def _intelligent_fallback(self, audio: AudioBuffer) -> str:
         # Enhanced intelligent fallback with more variety and realism
         print("🔄 Using enhanced intelligent transcription system...")
-        file_size = os.path.getsize(audio_path)
+        file_size = audio.size
         
         # Create more realistic and varied responses based on file characteristics
         if file_size < 15000:  # Very short recording (< 10 seconds)
@@ -140,12 +397,185 @@ class TranscriberService:
                 "I realize I've been holding my breath through so much of this year, waiting for things to feel normal again or for clarity to emerge. But today I'm trying to remember how to breathe again, how to be present with the uncertainty rather than constantly trying to escape it. There's something about acknowledging the weight of what I'm carrying that makes it feel a little lighter, even if nothing has actually changed."
             ]
         
-        # Use file characteristics to create consistent but varied responses
-        import time
-        # Combine file size, creation time, and path for more variety
-        hash_input = f"{file_size}_{int(os.path.getmtime(audio_path))}_{os.path.basename(audio_path)}"
+        # Use recording characteristics to create consistent but varied responses
+        # Combine size, arrival time, and upload name for more variety
+        hash_input = f"{file_size}_{int(time.time())}_{audio.filename}"
         hash_value = int(hashlib.md5(hash_input.encode()).hexdigest(), 16)
         selected_response = fallback_options[hash_value % len(fallback_options)]
+        self._fallback_transcripts.add(selected_response)
         
         print(f"📝 Selected enhanced response based on recording characteristics")
-        return selected_response
\ No newline at end of file
+        return selected_response
+
+
+class LiveTranscription:
+    """
+    One streaming session: audio chunks go into a Speech SDK push stream as they
+    arrive, so continuous recognition runs while the user is still speaking.
+    The chunks are also buffered so Whisper and the fallback can take over at the end.
+    """
+
+    def __init__(self, service: TranscriberService, filename: str, content_type: str):
+        self.service = service
+        self.audio = AudioBuffer(filename=filename, content_type=content_type)
+        self._segments = []
+        self._stream = None
+        self._transcode = None
+        self._recognizer = None
+        self._holds_slot = False
+        self._incomplete = False
+        self._loop = None
+        self._stopped = asyncio.Event()
+        # Optional TemporaryRecording that gets every chunk as it arrives; deleted on close()
+        self.archive = None
+
+    async def start(self):
+        if not self.service.speech_config:
+            return
+
+        # A live session lasts as long as the recording, so it takes a slot from the "live"
+        # budget (never queueing) rather than holding one of the per-request STT slots
+        if not self.service._live.try_acquire():
+            print("⚠️ Live sessions at capacity, this one will be transcribed when it ends")
+            self._incomplete = True
+            return
+        self._holds_slot = True
+
+        self._loop = asyncio.get_running_loop()
+        try:
+            # Decode chunks with a live ffmpeg process when one is free, else let the SDK decode
+            self._transcode = await self.service.transcoder.open_stream(self._push_pcm)
+            if self._transcode is not None:
+                self._stream = speechsdk.audio.PushAudioInputStream()
+            else:
+                self._stream = self.service._open_push_stream()
+            audio_config = speechsdk.audio.AudioConfig(stream=self._stream)
+            recognizer = speechsdk.SpeechRecognizer(speech_config=self.service.speech_config, audio_config=audio_config)
+            recognizer.recognized.connect(self._on_recognized)
+            recognizer.session_stopped.connect(self._on_stopped)
+            recognizer.canceled.connect(self._on_canceled)
+
+            await self._loop.run_in_executor(
+                self.service._speech_executor,
+                recognizer.start_continuous_recognition_async().get,
+            )
+            self._recognizer = recognizer
+            print("🎙️ Live recognition started")
+        except Exception as e:
+            print(f"❌ Live recognition could not start, buffering only: {e}")
+            self._abort_transcode()
+            self._stream = None
+            self._release_slot()
+
+    def _release_slot(self):
+        if self._holds_slot:
+            self._holds_slot = False
+            self.service._live.release()
+
+    def _push_pcm(self, pcm: bytes):
+        if self._stream is not None:
+            self._stream.write(pcm)
+
+    def _abort_transcode(self):
+        if self._transcode is not None:
+            self._transcode.abort()
+            self._transcode = None
+
+    # SDK callbacks arrive on Speech SDK threads
+    def _on_recognized(self, evt):
+        if evt.result.reason == speechsdk.ResultReason.RecognizedSpeech and evt.result.text:
+            self._segments.append(evt.result.text)
+
+    def _on_canceled(self, evt):
+        if evt.cancellation_details.reason == speechsdk.CancellationReason.Error:
+            print(f"❌ Live recognition canceled: {evt.cancellation_details.error_details}")
+        self._on_stopped(evt)
+
+    def _on_stopped(self, evt):
+        self._loop.call_soon_threadsafe(self._stopped.set)
+
+    async def write(self, chunk: bytes):
+        self.audio.write(chunk)
+        if self.archive is not None:
+            await self.archive.write(chunk)
+        if self._stream is None:
+            return
+        if self._transcode is None:
+            self._stream.write(chunk)
+        elif not await self._transcode.write(chunk):
+            # The rest of the recording never reaches Speech; transcribe the buffer at the end instead
+            print("❌ Live FFmpeg transcode stopped accepting audio")
+            self._abort_transcode()
+            self._stream.close()
+            self._stream = None
+            self._incomplete = True
+
+    async def finish(self, timeout: float = 10.0) -> str:
+        """Close the stream, wait for the tail of recognition, and return the transcript."""
+        if self.archive is not None:
+            self.archive.finish()
+        if self._recognizer is not None:
+            if self._transcode is not None:
+                await self._transcode.finish()
+                self._transcode = None
+            if self._stream is not None:
+                self._stream.close()
+                self._stream = None
+            try:
+                await asyncio.wait_for(self._stopped.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                print("⚠️ Live recognition did not settle in time, using what was recognized")
+            recognizer, self._recognizer = self._recognizer, None
+            await self._loop.run_in_executor(
+                self.service._speech_executor,
+                recognizer.stop_continuous_recognition_async().get,
+            )
+        self._release_slot()
+
+        if self._incomplete:
+            return await self.service.transcribe(self.audio)
+
+        transcript = " ".join(self._segments).strip()
+        if transcript:
+            print(f"✅ Live transcription complete: {transcript}")
+            return transcript
+
+        if not self.audio.size:
+            return "(Audio file not found for transcription)"
+
+        # Speech heard nothing: confirm it was silence before paying for Whisper
+        pcm, _ = await self.service._decode(self.audio)
+        if pcm == b"":
+            print("🤫 No speech detected in live session")
+            return ""
+        return await self.service._transcribe_fallback(self.audio, pcm)
+
+    def close(self):
+        """
+        Release the session. One dropped before finish() (a WebSocket that disconnects, an
+        abandoned upload) still has recognition running: its stream is ended and the recognizer
+        stopped in the background, and its slot is freed once the service has stopped. A stored
+        copy of the recording is deleted in the background either way.
+        """
+        if self.archive is not None:
+            self.archive.delete_later()
+            self.archive = None
+        self._abort_transcode()
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
+        if self._recognizer is not None:
+            recognizer, self._recognizer = self._recognizer, None
+            stopping = self._loop.run_in_executor(
+                self.service._speech_executor,
+                recognizer.stop_continuous_recognition_async().get,
+            )
+            stopping.add_done_callback(self._stopped_in_background)
+        else:
+            self._release_slot()
+        self.audio.close()
+
+    def _stopped_in_background(self, stopping):
+        if not stopping.cancelled() and stopping.exception() is not None:
+            print(f"❌ Could not stop abandoned live recognition: {stopping.exception()}")
+        self._release_slot()
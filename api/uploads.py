@@ -0,0 +1,145 @@
+import os
+import time
+import asyncio
+import secrets
+from collections import OrderedDict
+from admission import OverloadedError
+from single_flight import Flight
+
+
+class OffsetMismatch(Exception):
+    """A chunk arrived for an offset past what the session has received."""
+
+    def __init__(self, offset: int):
+        super().__init__(f"expected offset {offset}")
+        self.offset = offset
+
+
+class UploadSession:
+    """
+    One resumable upload. Chunks are appended in order straight into a live transcription
+    (which buffers them and starts transcoding/recognition immediately). Once finalized,
+    the reflection runs as a Flight, so any number of callers (including a retried finalize)
+    can follow or replay it.
+    """
+
+    def __init__(self, upload_id: str, live, max_bytes: int):
+        self.id = upload_id
+        self.live = live
+        self.max_bytes = max_bytes
+        self.touched = time.monotonic()
+        self.flight = Flight()
+        self._append_lock = asyncio.Lock()
+
+    @property
+    def task(self) -> asyncio.Task | None:
+        """The finalized pipeline's task, None until finalize."""
+        return self.flight.task
+
+    @property
+    def offset(self) -> int:
+        return self.live.audio.size
+
+    async def append(self, offset: int, chunk: bytes) -> int:
+        """Write a chunk at offset. Re-sent bytes are skipped; a gap or negative offset raises OffsetMismatch."""
+        async with self._append_lock:
+            self.touched = time.monotonic()
+            if self.task is not None or not 0 <= offset <= self.offset:
+                raise OffsetMismatch(self.offset)
+            # Overlap with what we already have (a retried request): keep only the new tail
+            chunk = chunk[self.offset - offset:]
+            if self.offset + len(chunk) > self.max_bytes:
+                raise ValueError("upload too large")
+            if chunk:
+                await self.live.write(chunk)
+            return self.offset
+
+    def start(self, pipeline):
+        """Run pipeline(session) once, recording each (event, data) it yields."""
+        if self.task is None:
+            self.flight.start(self._run(pipeline))
+        return self.task
+
+    async def _run(self, pipeline):
+        try:
+            async for event in pipeline(self):
+                yield event
+        finally:
+            self.live.close()
+
+    def follow(self):
+        """Every event so far, then new ones as they arrive, until the pipeline ends."""
+        return self.flight.follow()
+
+
+class UploadStore:
+    """Open upload sessions, in memory, expired after UPLOAD_IDLE_TTL seconds without activity."""
+
+    def __init__(self, new_id=lambda: secrets.token_urlsafe(16)):
+        self.new_id = new_id
+        self.idle_ttl = float(os.getenv("UPLOAD_IDLE_TTL", "60"))
+        self.max_sessions = int(os.getenv("UPLOAD_MAX_SESSIONS", "256"))
+        self.max_bytes = int(os.getenv("UPLOAD_MAX_BYTES", str(50 * 1024 * 1024)))
+        # One PUT's body; it may be forwarded to another worker, so it stays far below MESSAGE_LIMIT
+        self.max_chunk_bytes = int(os.getenv("UPLOAD_MAX_CHUNK_BYTES", str(8 * 1024 * 1024)))
+        # Abandoned sessions hold a live slot and a recognizer, so they are also swept on a
+        # timer: an idle worker gets no requests to sweep them
+        self.sweep_interval = max(self.idle_ttl / 2, 1.0)
+        self._sessions = OrderedDict()
+        self._task = None
+        self.stats = {"created": 0, "finalized": 0, "expired": 0}
+
+    async def start(self):
+        self._task = asyncio.create_task(self._sweep_loop())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        for session in self._sessions.values():
+            if session.task is None:
+                session.live.close()
+        self._sessions.clear()
+
+    async def _sweep_loop(self):
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            self._expire()
+
+    def _expire(self):
+        now = time.monotonic()
+        for upload_id, session in list(self._sessions.items()):
+            running = session.task is not None and not session.task.done()
+            if running or session.touched + self.idle_ttl > now:
+                continue
+            del self._sessions[upload_id]
+            if session.task is None:
+                session.live.close()
+                self.stats["expired"] += 1
+
+    async def create(self, start_live) -> UploadSession:
+        self._expire()
+        if len(self._sessions) >= self.max_sessions:
+            raise OverloadedError("upload", 5)
+        live = await start_live()
+        session = UploadSession(self.new_id(), live, self.max_bytes)
+        self._sessions[session.id] = session
+        self.stats["created"] += 1
+        return session
+
+    def get(self, upload_id: str) -> UploadSession | None:
+        # Abandoned sessions hold a live recognizer; sweep them whenever the store is used
+        self._expire()
+        session = self._sessions.get(upload_id)
+        if session is not None:
+            session.touched = time.monotonic()
+        return session
+
+    def finalize(self, session: UploadSession, pipeline):
+        if session.task is None:
+            self.stats["finalized"] += 1
+        return session.start(pipeline)
+
+    def snapshot(self) -> dict:
+        return {**self.stats, "open": len(self._sessions)}
@@ -0,0 +1,138 @@
+import os
+import numpy as np
+from transcoder import SAMPLE_RATE
+
+FRAME_MS = 30
+FRAME_SAMPLES = SAMPLE_RATE * FRAME_MS // 1000
+
+# A recording whose loudest frame stays under this is silent, and skips speech-to-text
+SILENCE_FLOOR_DB = float(os.getenv("VAD_SILENCE_FLOOR_DB", "-55"))
+
+# A frame is speech if it is this far above the recording's own noise floor...
+MARGIN_DB = float(os.getenv("VAD_MARGIN_DB", "10"))
+# ...clamped so digital silence never counts and loud, pause-free speech always does
+MIN_THRESHOLD_DB = -55.0
+MAX_THRESHOLD_DB = -35.0
+
+# Kept around every voiced stretch so word onsets and tails aren't clipped
+PAD_MS = int(os.getenv("VAD_PAD_MS", "200"))
+# With less voiced audio than this (after padding) the split is too uncertain, and the
+# whole recording goes to speech-to-text
+MIN_SPEECH_MS = int(os.getenv("VAD_MIN_SPEECH_MS", "600"))
+# Internal pauses are shortened to this: long enough to sound like a pause, short enough
+# that recognition doesn't take it for the end of the utterance
+MAX_PAUSE_MS = int(os.getenv("VAD_MAX_PAUSE_MS", "400"))
+
+
+def _samples(pcm: bytes) -> np.ndarray:
+    return np.frombuffer(pcm, dtype="<i2", count=len(pcm) // 2)
+
+
+def frame_levels(samples: np.ndarray) -> np.ndarray:
+    """RMS level of each 30 ms frame, in dBFS."""
+    frames = samples[:len(samples) // FRAME_SAMPLES * FRAME_SAMPLES].reshape(-1, FRAME_SAMPLES)
+    power = np.mean(frames.astype(np.float32) ** 2, axis=1) / (32768.0 ** 2)
+    return 10 * np.log10(power + 1e-12)
+
+
+def speech_regions(pcm: bytes) -> list[tuple[int, int]]:
+    """
+    (start, end) sample offsets of the voiced stretches of 16 kHz mono PCM, padded. Empty only
+    for a clearly silent recording (nothing above SILENCE_FLOOR_DB). Audio above the floor in
+    which no speech stands out, such as a quiet voice with no pauses, comes back whole, so
+    speech-to-text decides rather than the level detector.
+    """
+    samples = _samples(pcm)
+    levels = frame_levels(samples)
+    if not len(levels) or levels.max() < SILENCE_FLOOR_DB:
+        return []
+
+    noise_floor = np.percentile(levels, 10)
+    threshold = np.clip(noise_floor + MARGIN_DB, MIN_THRESHOLD_DB, MAX_THRESHOLD_DB)
+    voiced = levels > threshold
+
+    # Widen every voiced frame by the padding on both sides
+    pad = PAD_MS // FRAME_MS
+    if pad:
+        voiced = np.convolve(voiced, np.ones(2 * pad + 1), mode="same") > 0
+
+    # Run boundaries: +1 where a voiced run starts, -1 just after it ends
+    edges = np.diff(np.concatenate(([0], voiced.astype(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1) * FRAME_SAMPLES
+    ends = np.minimum(np.flatnonzero(edges == -1) * FRAME_SAMPLES, len(samples))
+    if ends.size and ends[-1] == len(levels) * FRAME_SAMPLES:
+        ends[-1] = len(samples)  # keep the partial frame at the end of a voiced tail
+
+    regions = list(zip(starts.tolist(), ends.tolist()))
+    voiced_samples = sum(end - start for start, end in regions)
+    if voiced_samples < SAMPLE_RATE * MIN_SPEECH_MS // 1000:
+        return [(0, len(samples))]
+    return regions
+
+
+def trim_silence(pcm: bytes, regions: list[tuple[int, int]] | None = None) -> bytes:
+    """
+    Drop leading and trailing silence and shorten long internal pauses. Returns b"" when
+    the recording has no speech at all.
+    """
+    if regions is None:
+        regions = speech_regions(pcm)
+    if not regions:
+        return b""
+
+    max_pause = SAMPLE_RATE * MAX_PAUSE_MS // 1000
+    parts = []
+    previous_end = None
+    for start, end in regions:
+        if previous_end is not None:
+            # Keep up to max_pause of the gap, taken from its middle
+            gap = start - previous_end
+            keep = min(gap, max_pause)
+            middle = previous_end + (gap - keep) // 2
+            parts.append(pcm[middle * 2:(middle + keep) * 2])
+        parts.append(pcm[start * 2:end * 2])
+        previous_end = end
+    return b"".join(parts)
+
+
+def _quietest_cut(samples: np.ndarray, lo: int, hi: int) -> int:
+    """Sample offset of the quietest frame in [lo, hi): the least damaging place to cut speech."""
+    first, last = lo // FRAME_SAMPLES, max(hi // FRAME_SAMPLES, lo // FRAME_SAMPLES + 1)
+    levels = frame_levels(samples[first * FRAME_SAMPLES:last * FRAME_SAMPLES])
+    if not len(levels):
+        return hi
+    return (first + int(np.argmin(levels))) * FRAME_SAMPLES
+
+
+def split_segments(pcm: bytes, regions: list[tuple[int, int]], max_seconds: float) -> list[bytes]:
+    """
+    Group voiced regions into trimmed segments of at most max_seconds, cutting only at pauses.
+    A single voiced stretch longer than that is cut at its quietest frame instead.
+    """
+    samples = _samples(pcm)
+    max_len = int(max_seconds * SAMPLE_RATE)
+    max_pause = SAMPLE_RATE * MAX_PAUSE_MS // 1000
+
+    pieces = []
+    for start, end in regions:
+        while end - start > max_len:
+            cut = _quietest_cut(samples, start + max_len // 2, start + max_len)
+            pieces.append((start, cut))
+            start = cut
+        pieces.append((start, end))
+
+    groups, current, length, previous_end = [], [], 0, None
+    for start, end in pieces:
+        added = end - start
+        if current:
+            added += min(start - previous_end, max_pause)
+        if current and length + added > max_len:
+            groups.append(current)
+            current, length, added = [], 0, end - start
+        current.append((start, end))
+        length += added
+        previous_end = end
+    if current:
+        groups.append(current)
+
+    return [trim_silence(pcm, group) for group in groups]
@@ -3,6 +3,10 @@
 import { useState, useRef, useEffect } from 'react';
 import { useRouter } from 'next/navigation';
 import { useRitual } from '../context/RitualContext';
+import { startChunkedUpload, ChunkedUpload } from '../lib/chunkedUpload';
+
+// How often MediaRecorder hands us a chunk to upload while recording
+const CHUNK_INTERVAL_MS = 1000;
 
 export default function AudioRecorder() {
     const [permission, setPermission] = useState<PermissionState>('prompt');
@@ -10,8 +14,9 @@ export default function AudioRecorder() {
     const [timeLeft, setTimeLeft] = useState(90);
     const mediaRecorder = useRef<MediaRecorder | null>(null);
     const chunks = useRef<Blob[]>([]);
+    const upload = useRef<ChunkedUpload | null>(null);
     const router = useRouter();
-    const { setAudioBlob } = useRitual();
+    const { setAudioBlob, setLiveReflection } = useRitual();
 
     useEffect(() => {
         // Check initial permission status if possible (broadly supported)
@@ -34,8 +39,15 @@ export default function AudioRecorder() {
             mediaRecorder.current = new MediaRecorder(stream, options);
             chunks.current = [];
 
+            // Chunks are uploaded and transcribed on the server while the user is still speaking
+            const apiUrl = process.env.NEXT_PUBLIC_API_URL || 'http://127.0.0.1:8000';
+            upload.current = startChunkedUpload(apiUrl, options?.mimeType || 'audio/webm');
+
             mediaRecorder.current.ondataavailable = (e) => {
-                if (e.data.size > 0) chunks.current.push(e.data);
+                if (e.data.size > 0) {
+                    chunks.current.push(e.data);
+                    upload.current?.append(e.data);
+                }
             };
 
             mediaRecorder.current.onstop = () => {
@@ -43,13 +55,15 @@ export default function AudioRecorder() {
                 const fullBlob = new Blob(chunks.current, { type });
                 console.log('Recording finished, blob size:', fullBlob.size, 'type:', type);
 
-                // Save to context
+                // Save to context (the blob stays as the fallback if the chunked upload failed)
+                setLiveReflection(upload.current?.finish() ?? null);
+                upload.current = null;
                 setAudioBlob(fullBlob);
 
                 router.push('/pause');
             };
 
-            mediaRecorder.current.start();
+            mediaRecorder.current.start(CHUNK_INTERVAL_MS);
             setIsRecording(true);
         } catch (err) {
             console.error('Microphone access denied:', err);
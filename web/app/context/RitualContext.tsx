@@ -1,8 +1,9 @@
 'use client';
 
 import { createContext, useContext, useState, ReactNode } from 'react';
+import type { ReflectionEvent } from '../lib/reflectionEvents';
 
-interface ReflectionData {
+export interface ReflectionData {
     reflection: string; // ✅ FIXED: matches backend
     flashcard: {
         title: string;
@@ -16,6 +17,9 @@ interface RitualContextType {
     setAudioBlob: (blob: Blob | null) => void;
     reflectionData: ReflectionData | null;
     setReflectionData: (data: ReflectionData | null) => void;
+    // Reflection events from the chunked upload streamed while recording, if one ran
+    liveReflection: AsyncIterable<ReflectionEvent> | null;
+    setLiveReflection: (events: AsyncIterable<ReflectionEvent> | null) => void;
 }
 
 const RitualContext = createContext<RitualContextType | undefined>(undefined);
@@ -23,10 +27,18 @@ const RitualContext = createContext<RitualContextType | undefined>(undefined);
 export function RitualProvider({ children }: { children: ReactNode }) {
     const [audioBlob, setAudioBlob] = useState<Blob | null>(null);
     const [reflectionData, setReflectionData] = useState<ReflectionData | null>(null);
+    const [liveReflection, setLiveReflection] = useState<AsyncIterable<ReflectionEvent> | null>(null);
 
     return (
         <RitualContext.Provider
-            value={{ audioBlob, setAudioBlob, reflectionData, setReflectionData }}
+            value={{
+                audioBlob,
+                setAudioBlob,
+                reflectionData,
+                setReflectionData,
+                liveReflection,
+                setLiveReflection,
+            }}
         >
             {children}
         </RitualContext.Provider>
@@ -0,0 +1,107 @@
+import { readServerSentEvents, ReflectionEvent } from './reflectionEvents';
+
+// Retries per stalled chunk before the upload is given up (the pause page then sends the whole blob)
+const MAX_ATTEMPTS = 5;
+const RETRY_BASE_MS = 300;
+const RETRY_MAX_MS = 4000;
+// Largest PUT body; the server refuses bodies over UPLOAD_MAX_CHUNK_BYTES (8 MB) with a 413
+const MAX_PUT_BYTES = 4 * 1024 * 1024;
+
+const sleep = (ms: number) => new Promise((resolve) => setTimeout(resolve, ms));
+
+export interface ChunkedUpload {
+    append(chunk: Blob): void;
+    finish(): AsyncIterable<ReflectionEvent> | null;
+}
+
+// Streams MediaRecorder chunks to /uploads while the user is still speaking. Chunks are sent
+// in order, one request at a time; after a dropped request the next PUT simply starts again
+// at the last acknowledged offset and the server skips whatever it already has.
+export function startChunkedUpload(apiUrl: string, contentType: string): ChunkedUpload {
+    const parts: Blob[] = [];
+    let total = 0; // bytes recorded so far
+    let acked = 0; // bytes the server has confirmed
+    let failed = false;
+    let queue: Promise<void> = Promise.resolve();
+
+    const created: Promise<string> = fetch(`${apiUrl}/uploads`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ content_type: contentType }),
+    }).then(async (response) => {
+        if (!response.ok) throw new Error(`Upload could not start: ${response.status}`);
+        return (await response.json()).upload_id as string;
+    });
+    created.catch(() => {}); // surfaced by drain() / finish()
+
+    // Sends everything recorded but not yet acknowledged
+    const drain = async () => {
+        const uploadId = await created;
+        let attempt = 0;
+
+        while (acked < total) {
+            let response: Response | null = null;
+            try {
+                response = await fetch(`${apiUrl}/uploads/${uploadId}?offset=${acked}`, {
+                    method: 'PUT',
+                    body: new Blob(parts).slice(acked, Math.min(total, acked + MAX_PUT_BYTES)),
+                });
+            } catch {
+                response = null; // network drop: retry from the last acknowledged offset
+            }
+
+            // A 409 carries the offset the server actually has, so the next PUT resumes from there
+            if (response && (response.ok || response.status === 409)) {
+                acked = (await response.json()).offset;
+                attempt = 0;
+                continue;
+            }
+            if (response && response.status < 500 && response.status !== 429) {
+                throw new Error(`Upload rejected: ${response.status}`);
+            }
+            if (++attempt >= MAX_ATTEMPTS) throw new Error('Upload kept failing');
+            await sleep(Math.random() * Math.min(RETRY_MAX_MS, RETRY_BASE_MS * 2 ** attempt));
+        }
+    };
+
+    const flush = () => {
+        queue = queue.then(async () => {
+            if (failed) return;
+            try {
+                await drain();
+            } catch (err) {
+                failed = true;
+                console.warn('Chunked upload failed, will upload after recording:', err);
+            }
+        });
+        return queue;
+    };
+
+    return {
+        append(chunk: Blob) {
+            if (failed) return;
+            parts.push(chunk);
+            total += chunk.size;
+            flush();
+        },
+
+        // Returns null when the upload already broke, so the pause page uploads the full recording instead
+        finish() {
+            if (failed) return null;
+            return {
+                async *[Symbol.asyncIterator]() {
+                    await flush();
+                    if (failed) throw new Error('Chunked upload failed');
+
+                    const uploadId = await created;
+                    const response = await fetch(
+                        `${apiUrl}/uploads/${uploadId}/finalize/stream?size=${total}`,
+                        { method: 'POST' },
+                    );
+                    if (!response.ok) throw new Error(`API Error: ${response.status}`);
+                    yield* readServerSentEvents(response);
+                },
+            };
+        },
+    };
+}
@@ -0,0 +1,39 @@
+import type { ReflectionData } from '../context/RitualContext';
+
+// Events sent by /process-audio/stream and /uploads/{id}/finalize/stream (SSE)
+// while the reflection is generated
+export type ReflectionEvent =
+    | { event: 'reflection'; data: { text: string } }
+    | { event: 'flashcard'; data: ReflectionData['flashcard'] }
+    | { event: 'done'; data: ReflectionData }
+    | { event: 'error'; data: { detail: string } };
+
+// Parses a text/event-stream response body into reflection events
+export async function* readServerSentEvents(response: Response): AsyncGenerator<ReflectionEvent> {
+    if (!response.body) throw new Error('Streaming not supported');
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+
+        let boundary = buffer.indexOf('\n\n');
+        while (boundary !== -1) {
+            const block = buffer.slice(0, boundary);
+            buffer = buffer.slice(boundary + 2);
+            boundary = buffer.indexOf('\n\n');
+
+            let event = 'message';
+            let data = '';
+            for (const line of block.split('\n')) {
+                if (line.startsWith('event:')) event = line.slice(6).trim();
+                else if (line.startsWith('data:')) data += line.slice(5).trim();
+            }
+            if (data) yield { event, data: JSON.parse(data) } as ReflectionEvent;
+        }
+    }
+}
@@ -93,11 +93,12 @@
 
 import { useEffect, useRef, useState } from 'react';
 import { useRouter } from 'next/navigation';
-import { useRitual } from '../context/RitualContext';
+import { useRitual, ReflectionData } from '../context/RitualContext';
+import { readServerSentEvents, ReflectionEvent } from '../lib/reflectionEvents';
 
 export default function PausePage() {
   const router = useRouter();
-  const { audioBlob, setReflectionData, setAudioBlob } = useRitual();
+  const { audioBlob, setReflectionData, setAudioBlob, liveReflection, setLiveReflection } = useRitual();
   const [pulse, setPulse] = useState(false);
 
   // 🔒 Execution lock (prevents double API calls)
@@ -112,28 +113,77 @@ export default function PausePage() {
     const processReflection = async () => {
       setPulse(true);
 
+      const empty: ReflectionData = {
+        reflection: '',
+        flashcard: { title: '', bullets: [] },
+        confidence: 0,
+      };
+      let draft = empty;
+      const progress = { navigated: false, finished: false };
+
+      // Show the reflection page as soon as the first words arrive, then keep filling it in
+      const applyEvent = (event: ReflectionEvent) => {
+        if (event.event === 'error') {
+          throw new Error(event.data.detail);
+        } else if (event.event === 'reflection') {
+          draft = { ...draft, reflection: draft.reflection + event.data.text };
+        } else if (event.event === 'flashcard') {
+          draft = { ...draft, flashcard: event.data };
+        } else {
+          draft = event.data;
+          progress.finished = true;
+        }
+
+        setReflectionData(draft);
+        if (!progress.navigated && draft.reflection) {
+          progress.navigated = true;
+          router.push('/reflection');
+        }
+      };
+
+      const follow = async (events: AsyncIterable<ReflectionEvent>) => {
+        for await (const event of events) applyEvent(event);
+      };
+
       try {
-        const formData = new FormData();
-        formData.append('file', audioBlob, 'recording.webm');
+        // The live session already transcribed while recording; just follow its reflection
+        if (liveReflection) {
+          try {
+            await follow(liveReflection);
+          } catch (err) {
+            console.warn('Live reflection failed, uploading recording instead:', err);
+          }
+        }
 
-        const apiUrl =
-          process.env.NEXT_PUBLIC_API_URL || 'http://127.0.0.1:8000';
+        if (!progress.finished) {
+          draft = empty;
 
-        const response = await fetch(`${apiUrl}/process-audio`, {
-          method: 'POST',
-          body: formData,
-        });
+          const formData = new FormData();
+          formData.append('file', audioBlob, 'recording.webm');
+
+          const apiUrl =
+            process.env.NEXT_PUBLIC_API_URL || 'http://127.0.0.1:8000';
+
+          const response = await fetch(`${apiUrl}/process-audio/stream`, {
+            method: 'POST',
+            body: formData,
+          });
 
-        if (!response.ok) {
-          throw new Error(`API Error: ${response.status}`);
+          if (!response.ok) {
+            throw new Error(`API Error: ${response.status}`);
+          }
+
+          await follow(readServerSentEvents(response));
         }
 
-        const data = await response.json();
+        if (!progress.finished) {
+          throw new Error('Reflection stream ended early');
+        }
 
-        setReflectionData(data);
         setAudioBlob(null);
+        setLiveReflection(null);
 
-        router.push('/reflection');
+        if (!progress.navigated) router.push('/reflection');
       } catch (err) {
         console.error('Reflection failed:', err);
 
@@ -147,12 +197,12 @@ export default function PausePage() {
           confidence: 0.1,
         });
 
-        router.push('/reflection');
+        if (!progress.navigated) router.push('/reflection');
       }
     };
 
     processReflection();
-  }, [audioBlob, router, setReflectionData, setAudioBlob]);
+  }, [audioBlob, liveReflection, router, setReflectionData, setAudioBlob, setLiveReflection]);
 
   return (
     <div className="flex-1 flex flex-col items-center justify-center fade-in h-full">